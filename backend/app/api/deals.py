@@ -1,28 +1,26 @@
 # backend/app/api/deals.py
-from fastapi import APIRouter, Depends, HTTPException, Body, Query
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Request
 from app.dependencies import get_user_id
 from app.database import db
-from app.schemas import DealUpdate, DealResponse, DealCreateResponse, DealTypeEnum
+from app.schemas import DealUpdate, DealResponse, DealCreateResponse, DealTypeEnum, DealBatchUpdate
 from app.middleware.validation import validate_request_data, ValidationError, SecurityError
-from typing import List, Optional, Dict, Any
+from app.responses import trusted_response, project_row
+from app.monitoring.tracing import tracer
+from app.circuit_breaker import CircuitOpenError
+from app.deal_import import DealImportConfig, ImportFormatError, detect_format, import_registry, iter_records
+from app.deal_export import DealExportConfig, iter_deal_pages, stream_export
+from app.deal_projections import DEAL_COLUMNS, DEAL_PROFILE_FIELDS, PROJECTIONS, flatten_profile, resolve_projection
+from pydantic import ValidationError as ModelValidationError
+from typing import List, Optional, Dict, Any, Tuple
+import json
 import logging
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Updated DEAL_SELECT_FIELDS to include new columns, analytics fields, duration and company type fields
-DEAL_SELECT_FIELDS = (
-    "id,user_id,status,status_labels,created_at,deal_nickname,deal_terms_url,deal_terms_file_name,"
-    "deal_terms_file_type,deal_terms_file_size,deal_duration_years,deal_duration_months,"
-    "deal_duration_total_months,payor_name,payor_type,contact_name,contact_email,contact_phone,"
-    "payor_company_size,payor_industries,activities,obligations,grant_exclusivity,uses_school_ip,"
-    "licenses_nil,compensation_cash,compensation_cash_schedule,compensation_goods,compensation_other,"
-    "is_group_deal,is_paid_to_llc,athlete_social_media,social_media_confirmed,social_media_confirmed_at,"
-    "deal_type,clearinghouse_prediction,valuation_prediction,brand_partner,clearinghouse_result,"
-    "actual_compensation,valuation_range,fmv,submission_type,deal_duration_years,deal_duration_months,deal_duration_total_months,"
-    "payor_company_size,payor_industries"
-)
+# All readable deal columns (the detail projection), each listed once
+DEAL_SELECT_FIELDS = PROJECTIONS["detail"].select
 
 
 def _safe_number(value) -> float:
@@ -97,6 +95,43 @@ def validate_file_metadata(file_type: str, file_size: int) -> bool:
     
     return True
 
+# Fields that change a deal's FMV, and the columns needed to recompute it
+FMV_RELATED_FIELDS = {
+    'compensation_cash', 'compensation_goods', 'compensation_other',
+    'valuation_prediction', 'deal_type'
+}
+FMV_SELECT_FIELDS = "deal_type,compensation_cash,compensation_goods,compensation_other,valuation_prediction"
+
+def prepare_deal_update(deal_id: int, update_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate, sanitize and complete a deal update (raises ValidationError, SecurityError or HTTPException)."""
+    # Convert enum to string if present
+    if 'deal_type' in update_data and hasattr(update_data['deal_type'], 'value'):
+        update_data['deal_type'] = update_data['deal_type'].value
+
+    # Comprehensive input validation and sanitization
+    try:
+        update_data = validate_request_data(update_data, 'deal')
+    except (ValidationError, SecurityError) as e:
+        logger.warning(f"Validation failed for deal {deal_id}: {e.detail}")
+        raise e
+
+    # Auto-set social_media_confirmed_at when social_media_confirmed is True
+    if update_data.get('social_media_confirmed') is True:
+        update_data['social_media_confirmed_at'] = 'now()'
+    
+    # Auto-calculate total_months when duration fields are provided
+    years = update_data.get('deal_duration_years')
+    months = update_data.get('deal_duration_months')
+    if years is not None and months is not None:
+        total_months = years * 12 + months
+        if total_months == 0:
+            raise HTTPException(status_code=400, detail="Duration must be at least 1 month")
+        if total_months > 120:
+            raise HTTPException(status_code=400, detail="Total duration cannot exceed 10 years")
+        update_data['deal_duration_total_months'] = total_months
+
+    return update_data
+
 @router.post("/deals", response_model=DealCreateResponse, summary="Create a new draft deal")
 async def create_draft_deal(
     deal_data: Optional[Dict[str, Any]] = Body(default={}),
@@ -121,7 +156,7 @@ async def create_draft_deal(
                 "deal_type": deal_type
             }
             
-            data = db.client.from_("deals").insert(insert_data).execute()
+            data = db.run_query("create_deal", db.client.from_("deals").insert(insert_data))
             
             if not data.data:
                 raise HTTPException(status_code=500, detail="Failed to create draft deal.")
@@ -157,31 +192,7 @@ async def update_deal(
         if not update_data:
             raise HTTPException(status_code=400, detail="No update data provided.")
 
-        # Convert enum to string if present
-        if 'deal_type' in update_data and hasattr(update_data['deal_type'], 'value'):
-            update_data['deal_type'] = update_data['deal_type'].value
-
-        # Comprehensive input validation and sanitization
-        try:
-            update_data = validate_request_data(update_data, 'deal')
-        except (ValidationError, SecurityError) as e:
-            logger.warning(f"Validation failed for deal {deal_id}: {e.detail}")
-            raise e
-
-        # Auto-set social_media_confirmed_at when social_media_confirmed is True
-        if update_data.get('social_media_confirmed') is True:
-            update_data['social_media_confirmed_at'] = 'now()'
-        
-        # Auto-calculate total_months when duration fields are provided
-        years = update_data.get('deal_duration_years')
-        months = update_data.get('deal_duration_months')
-        if years is not None and months is not None:
-            total_months = years * 12 + months
-            if total_months == 0:
-                raise HTTPException(status_code=400, detail="Duration must be at least 1 month")
-            if total_months > 120:
-                raise HTTPException(status_code=400, detail="Total duration cannot exceed 10 years")
-            update_data['deal_duration_total_months'] = total_months
+        update_data = prepare_deal_update(deal_id, update_data)
 
         # Instrumentation: log sanitized keys
         try:
@@ -191,16 +202,12 @@ async def update_deal(
             pass
 
         # If compensation or deal_type fields are being updated, compute FMV server-side
-        fmv_related_keys = {
-            'compensation_cash', 'compensation_goods', 'compensation_other',
-            'valuation_prediction', 'deal_type'
-        }
-        if any(key in update_data for key in fmv_related_keys):
+        if any(key in update_data for key in FMV_RELATED_FIELDS):
             try:
                 # Fetch current values to merge and compute accurately
-                existing_resp = db.client.from_("deals").select(
-                    "deal_type,compensation_cash,compensation_goods,compensation_other,valuation_prediction"
-                ).eq("id", deal_id).eq("user_id", user_id).execute()
+                existing_resp = db.run_query("get_deal_fmv_fields", db.client.from_("deals").select(
+                    FMV_SELECT_FIELDS
+                ).eq("id", deal_id).eq("user_id", user_id))
                 existing = existing_resp.data[0] if existing_resp.data else {}
                 merged = {**existing, **update_data}
                 update_data['fmv'] = compute_fmv_value(merged)
@@ -213,7 +220,8 @@ async def update_deal(
             logger.info(f"[update_deal] deal_id={deal_id} updated_fields={list(updated_deal.keys())}")
         except Exception:
             pass
-        return DealResponse(**updated_deal)
+        # Row comes straight back from Postgres - skip response_model revalidation
+        return trusted_response(updated_deal, DealResponse)
         
     except (ValidationError, SecurityError):
         raise  # Re-raise validation errors as-is
@@ -223,6 +231,231 @@ async def update_deal(
         logger.error(f"Error updating deal {deal_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+def _batch_error(deal_id: int, status_code: int, detail: Any) -> Dict[str, Any]:
+    return {"id": deal_id, "status": "error", "status_code": status_code, "detail": detail}
+
+@router.patch("/deals/batch", summary="Update several deals at once")
+async def update_deals_batch(
+    batch: DealBatchUpdate,
+    user_id: str = Depends(get_user_id)
+):
+    """Apply per-deal changes in bulk, returning one result per item in request order.
+
+    Each item is validated on its own. Ownership and FMV inputs are read in one
+    query, deals receiving identical changes share one UPDATE, and the user's
+    deal cache is invalidated once for the whole batch.
+    """
+    try:
+        results: List[Optional[Dict[str, Any]]] = [None] * len(batch.items)
+        # deal id -> (position in the batch, sanitized update data)
+        pending: Dict[int, Tuple[int, Dict[str, Any]]] = {}
+        seen = set()
+        for position, item in enumerate(batch.items):
+            try:
+                if item.id in seen:
+                    raise HTTPException(status_code=400, detail="Deal appears more than once in the batch")
+                seen.add(item.id)
+                update_data = DealUpdate(**item.changes).dict(exclude_unset=True)
+                if not update_data:
+                    raise HTTPException(status_code=400, detail="No update data provided.")
+                pending[item.id] = (position, prepare_deal_update(item.id, update_data))
+            except ModelValidationError as e:
+                results[position] = _batch_error(item.id, 422, e.errors())
+            except HTTPException as e:
+                results[position] = _batch_error(item.id, e.status_code, e.detail)
+
+        if pending:
+            needs_fmv = any(FMV_RELATED_FIELDS & data.keys() for _, data in pending.values())
+            existing = await db.get_deals_by_ids(
+                user_id, list(pending), f"id,{FMV_SELECT_FIELDS}" if needs_fmv else "id"
+            )
+
+            # Deals receiving identical changes are written with a single UPDATE ... WHERE id IN (...)
+            groups: Dict[str, Tuple[List[int], Dict[str, Any]]] = {}
+            for deal_id, (position, update_data) in pending.items():
+                if deal_id not in existing:
+                    results[position] = _batch_error(deal_id, 404, "Deal not found")
+                    continue
+                if FMV_RELATED_FIELDS & update_data.keys():
+                    try:
+                        update_data['fmv'] = compute_fmv_value({**existing[deal_id], **update_data})
+                    except Exception as e:
+                        logger.warning(f"[update_deals_batch] FMV compute failed for deal {deal_id}: {e}")
+                key = json.dumps(update_data, sort_keys=True, default=str)
+                groups.setdefault(key, ([], update_data))[0].append(deal_id)
+
+            updated, failed = await db.update_deals_with_cache_invalidation(user_id, list(groups.values()))
+            for deal_id, row in updated.items():
+                results[pending[deal_id][0]] = {
+                    "id": deal_id, "status": "updated", "deal": project_row(row, DealResponse)
+                }
+            for deal_id, message in failed.items():
+                logger.error(f"[update_deals_batch] Error updating deal {deal_id}: {message}")
+                results[pending[deal_id][0]] = _batch_error(deal_id, 500, "Internal server error")
+
+        updated_count = sum(1 for result in results if result["status"] == "updated")
+        logger.info(f"[update_deals_batch] user_id={user_id} items={len(results)} updated={updated_count}")
+        # Rows come straight back from Postgres - skip response_model revalidation
+        return trusted_response({
+            "results": results,
+            "updated": updated_count,
+            "failed": len(results) - updated_count
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating deals in batch: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+def build_imported_deal(user_id: str, row_number: int, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one imported row like a deal update and turn it into an insertable deal"""
+    # Round-trip through JSON so nested models and datetimes become plain JSON values
+    deal = json.loads(DealUpdate(**row).json(exclude_unset=True))
+    deal = prepare_deal_update(row_number, deal)
+    deal["deal_type"] = deal.get("deal_type") or "simple"
+    deal["status"] = deal.get("status") or "draft"
+    deal["fmv"] = compute_fmv_value(deal)
+    deal["user_id"] = user_id
+    return deal
+
+@router.post("/deals/import", summary="Bulk import deals from CSV or NDJSON")
+async def import_deals(
+    request: Request,
+    file_format: Optional[str] = Query(None, alias="format", regex="^(csv|ndjson)$"),
+    import_id: Optional[str] = Query(None, regex=r"^[A-Za-z0-9_-]{1,64}$"),
+    user_id: str = Depends(get_user_id)
+):
+    """Stream a CSV (header row) or NDJSON body into the user's deals.
+
+    The body is parsed as it arrives; each row is validated like a deal update,
+    gets its FMV computed, and is inserted in bulk chunks of DEAL_IMPORT_CHUNK_SIZE
+    rows, so memory stays bounded by one chunk. Progress can be polled at
+    ``GET /api/deals/import/{import_id}`` while the upload runs.
+    """
+    file_format = detect_format(file_format, request.headers.get("content-type", ""))
+    if file_format is None:
+        raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson")
+    try:
+        progress = import_registry.create(user_id, file_format, import_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    await import_registry.publish(progress, db.cache_manager)
+
+    config = DealImportConfig
+    chunk: List[Dict[str, Any]] = []
+    chunk_rows: List[int] = []
+
+    async def flush():
+        if not chunk:
+            return
+        try:
+            progress.inserted += await db.insert_deals(chunk)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.error(f"[import_deals] Chunk insert failed for rows {chunk_rows[0]}-{chunk_rows[-1]}: {e}")
+            progress.fail(chunk_rows[0], f"Insert failed for rows {chunk_rows[0]}-{chunk_rows[-1]}", count=len(chunk))
+        progress.chunks += 1
+        chunk.clear()
+        chunk_rows.clear()
+        await import_registry.publish(progress, db.cache_manager)
+        logger.info(f"[import_deals] import_id={progress.import_id} rows={progress.rows} inserted={progress.inserted} failed={progress.failed}")
+
+    try:
+        async for row_number, row, error in iter_records(file_format, request.stream()):
+            if row_number > config.MAX_ROWS:
+                raise ImportFormatError(f"Imports are limited to {config.MAX_ROWS} rows")
+            progress.rows += 1
+            if error is None:
+                try:
+                    chunk.append(build_imported_deal(user_id, row_number, row))
+                    chunk_rows.append(row_number)
+                except ModelValidationError as e:
+                    error = e.errors()
+                except HTTPException as e:
+                    error = e.detail
+            if error is not None:
+                progress.fail(row_number, error)
+            if len(chunk) >= config.CHUNK_SIZE:
+                await flush()
+        await flush()
+    except ImportFormatError as e:
+        # Rows before the bad input are kept; the summary says where it stopped
+        try:
+            await flush()
+        except CircuitOpenError:
+            progress.finish("failed", "Database unavailable")
+            raise
+        progress.finish("aborted", str(e))
+    except CircuitOpenError:
+        progress.finish("failed", "Database unavailable")
+        raise
+    except Exception as e:
+        logger.error(f"Error importing deals: {str(e)}")
+        progress.finish("failed", "Internal server error")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    else:
+        progress.finish()
+    finally:
+        # Chunks inserted before a failure are kept, so the cached lists are stale either way
+        if progress.inserted:
+            await db.invalidate_deal_cache(user_id)
+        await import_registry.publish(progress, db.cache_manager)
+
+    return trusted_response(progress.to_dict(), status_code=200 if progress.status == "completed" else 400)
+
+@router.get("/deals/import/{import_id}", summary="Get the progress of a deal import")
+async def get_import_progress(import_id: str, user_id: str = Depends(get_user_id)):
+    """Progress of a running or recently finished import, from whichever worker runs it."""
+    progress = await import_registry.lookup(import_id, user_id, db.cache_manager)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return trusted_response(progress)
+
+EXPORT_FIELDS = DEAL_COLUMNS
+
+def _export_fmv(deal: Dict[str, Any]) -> None:
+    try:
+        deal['fmv'] = compute_fmv_value(deal)
+    except Exception:
+        # Keep existing fmv if computation fails
+        pass
+
+@router.get("/deals/export", summary="Export all of a user's deals as CSV or NDJSON")
+async def export_deals(
+    user_id: str = Depends(get_user_id),
+    file_format: str = Query("csv", alias="format", regex="^(csv|ndjson)$"),
+    status: Optional[str] = Query(None),
+    deal_type: Optional[str] = Query(None)
+):
+    """Stream every matching deal, oldest first, as a download.
+
+    Deals are read in keyset pages of DEAL_EXPORT_PAGE_SIZE rows and serialized
+    page by page, so memory stays constant however many deals the user has.
+    In CSV, JSONB columns are written as JSON text cells (the format the import accepts).
+    """
+    if file_format not in DealExportConfig.MEDIA_TYPES:
+        raise HTTPException(status_code=422, detail="format must be csv or ndjson")
+
+    async def fetch_page(after_id: Optional[int], limit: int) -> List[Dict[str, Any]]:
+        return await db.get_deals_after(user_id, DEAL_SELECT_FIELDS, after_id, limit, status, deal_type)
+
+    try:
+        # Read the first page before answering so database errors still get a proper status
+        first_page = await fetch_page(None, DealExportConfig.PAGE_SIZE)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        logger.error(f"Error exporting deals: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    pages = iter_deal_pages(fetch_page, first_page=first_page)
+    return StreamingResponse(
+        stream_export(file_format, EXPORT_FIELDS, pages, transform=_export_fmv),
+        media_type=DealExportConfig.MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="deals.{file_format}"', "Cache-Control": "no-store"}
+    )
+
 # New endpoints for prediction storage
 @router.put("/deals/{deal_id}/clearinghouse-prediction", summary="Store clearinghouse prediction")
 async def store_clearinghouse_prediction(
@@ -235,6 +468,8 @@ async def store_clearinghouse_prediction(
         update_data = {"clearinghouse_prediction": prediction_data}
         updated_deal = await db.update_deal_with_cache_invalidation(deal_id, user_id, update_data)
         return {"message": "Clearinghouse prediction stored successfully", "deal_id": deal_id}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error storing clearinghouse prediction for deal {deal_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -257,28 +492,37 @@ async def store_valuation_prediction(
         update_data = {"valuation_prediction": prediction_data, "fmv": round(estimated, 2)}
         updated_deal = await db.update_deal_with_cache_invalidation(deal_id, user_id, update_data)
         return {"message": "Valuation prediction stored successfully", "deal_id": deal_id}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error storing valuation prediction for deal {deal_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Force redeployment - GET endpoint for individual deals
 @router.get("/deals/{deal_id}", response_model=DealResponse, summary="Get a specific deal")
-async def get_deal(deal_id: int, user_id: str = Depends(get_user_id)):
+async def get_deal(
+    deal_id: int,
+    user_id: str = Depends(get_user_id),
+    fields: Optional[str] = Query(None, description="Comma-separated deal columns to return (id is always included)")
+):
     """Get a specific deal by ID with user authorization."""
     try:
-        data = db.client.from_("deals").select(DEAL_SELECT_FIELDS).eq("id", deal_id).eq("user_id", user_id).execute()
+        projection = resolve_projection("detail", fields)
+        data = db.run_query("get_deal", db.client.from_("deals").select(projection.select).eq("id", deal_id).eq("user_id", user_id))
         
         if not data.data:
             raise HTTPException(status_code=404, detail="Deal not found")
         
         deal = data.data[0]
         # Compute FMV dynamically for response
-        try:
-            computed_fmv = compute_fmv_value(deal)
-            deal['fmv'] = computed_fmv
-        except Exception:
-            pass
-        return DealResponse(**deal)
+        if projection.computes_fmv:
+            try:
+                computed_fmv = compute_fmv_value(deal)
+                deal['fmv'] = computed_fmv
+            except Exception:
+                pass
+        # Row comes straight from Postgres - skip response_model revalidation
+        return trusted_response(projection.project(deal))
     except HTTPException:
         raise
     except Exception as e:
@@ -297,7 +541,7 @@ async def get_prediction(
             raise HTTPException(status_code=400, detail="Invalid prediction type")
         
         # Get the deal with prediction data
-        response = db.client.from_("deals").select(f"id,{prediction_type}_prediction").eq("id", deal_id).eq("user_id", user_id).execute()
+        response = db.run_query("get_prediction", db.client.from_("deals").select(f"id,{prediction_type}_prediction").eq("id", deal_id).eq("user_id", user_id))
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Deal not found")
@@ -323,12 +567,23 @@ async def get_deals(
     limit: int = Query(20, ge=1, le=100),
     status: Optional[str] = Query(None),
     deal_type: Optional[str] = Query(None),
-    sort_by: str = Query("created_at", pattern="^(created_at|fmv|compensation_cash)$"),
-    sort_order: str = Query("desc", pattern="^(asc|desc)$")
+    sort_by: str = Query("created_at", regex="^(created_at|fmv|compensation_cash)$"),
+    sort_order: str = Query("desc", regex="^(asc|desc)$"),
+    view: str = Query("list", regex="^(summary|list|detail|analytics)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated deal columns to return (overrides view)"),
+    profile: str = Query("flatten", regex="^(flatten|included)$")
 ) -> Dict[str, Any]:
-    """Get deals with optimized pagination, filtering, and caching."""
+    """Get deals with optimized pagination, filtering, and caching.
+
+    ``view=summary`` selects only the columns a deals table needs; ``fields`` picks columns explicitly.
+    Every deal belongs to the caller, so the profile is read once (cached) instead of joined per row:
+    ``profile=included`` returns it as ``included.profile``, ``profile=flatten`` (legacy) copies it onto
+    each deal of the default list view only, so an explicit ``view`` or ``fields`` is returned as asked.
+    """
     try:
-        # Use optimized paginated query with caching and profile joining
+        projection = resolve_projection(view, fields)
+
+        # Use optimized paginated query with caching; the profile is added below
         result = await db.get_deals_paginated_with_profile(
             user_id=user_id,
             page=page,
@@ -336,22 +591,42 @@ async def get_deals(
             status=status,
             deal_type=deal_type,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            fields=projection.select,
+            projection=projection.cache_key,
+            join_profile=False
         )
 
-        # Compute FMV for each deal in the response to ensure correctness
-        try:
-            deals = result.get('deals', []) or []
-            for deal in deals:
-                try:
-                    deal['fmv'] = compute_fmv_value(deal)
-                except Exception:
-                    # Keep existing fmv if computation fails
-                    pass
-        except Exception as e:
-            logger.warning(f"[get_deals] Failed to compute FMV for response list: {e}")
+        # Shape rows by the projection (new dicts, so cached results are never mutated)
+        deals = projection.project_rows(result.get('deals', []) or [])
+        result = {**result, "deals": deals}
+
+        flatten = profile == "flatten" and view == "list" and fields is None
+        if profile == "included" or flatten:
+            user_profile = await db.get_profile_cached(user_id) or {}
+            if profile == "included":
+                result["included"] = {"profile": {name: user_profile.get(name) for name in DEAL_PROFILE_FIELDS}}
+            else:
+                for deal in deals:
+                    flatten_profile(deal, user_profile)
+
+        # Compute FMV for each deal in the response to ensure correctness;
+        # without the FMV inputs (e.g. view=summary) the stored fmv column is returned
+        if projection.computes_fmv:
+            try:
+                with tracer.start_span("deals.compute_fmv", {"deals.count": len(deals)}):
+                    for deal in deals:
+                        try:
+                            deal['fmv'] = compute_fmv_value(deal)
+                        except Exception:
+                            # Keep existing fmv if computation fails
+                            pass
+            except Exception as e:
+                logger.warning(f"[get_deals] Failed to compute FMV for response list: {e}")
 
-        return result
+        return trusted_response(result)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching deals: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -362,7 +637,7 @@ async def delete_deal(deal_id: int, user_id: str = Depends(get_user_id)):
     try:
         with db.transaction():
             # First verify the deal belongs to the user
-            data = db.client.from_("deals").select("id").eq("id", deal_id).eq("user_id", user_id).execute()
+            data = db.run_query("check_deal_owner", db.client.from_("deals").select("id").eq("id", deal_id).eq("user_id", user_id))
 
             if not data.data:
                 raise HTTPException(
@@ -371,7 +646,7 @@ async def delete_deal(deal_id: int, user_id: str = Depends(get_user_id)):
                 )
 
             # Delete the deal
-            data = db.client.from_("deals").delete().eq("id", deal_id).eq("user_id", user_id).execute()
+            data = db.run_query("delete_deal", db.client.from_("deals").delete().eq("id", deal_id).eq("user_id", user_id))
 
             return {"message": "Deal deleted successfully"}
     except Exception as e:
@@ -17,6 +17,8 @@ async def get_schools(division: Optional[str] = None):
         # Use cached version for better performance
         schools = await db.get_schools_cached(division)
         return schools or []
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching schools: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch schools")
@@ -101,12 +103,14 @@ async def get_social_media(user_id: str = Depends(get_user_id)):
     """Get all social media platforms for the authenticated user."""
     try:
         # CRITICAL: Validate user permissions (cursor rule)
-        data = supabase.from_("social_media_platforms").select("*").eq("user_id", user_id).execute()
+        data = db.run_query("get_social_media", supabase.from_("social_media_platforms").select("*").eq("user_id", user_id))
         
         if not data.data:
             return []
             
         return data.data
+    except HTTPException:
+        raise
     except Exception as e:
         # CRITICAL: Never log sensitive data (cursor rule)
         logger.error(f"Error fetching social media for user: {str(e)}")
@@ -130,7 +134,7 @@ async def update_social_media(
             raise e
         
         # Delete existing social media platforms for this user
-        supabase.from_("social_media_platforms").delete().eq("user_id", user_id).execute()
+        db.run_query("delete_social_media", supabase.from_("social_media_platforms").delete().eq("user_id", user_id))
         
         # Insert new social media platforms
         new_platforms = []
@@ -146,19 +150,19 @@ async def update_social_media(
         
         # Insert all platforms at once
         if new_platforms:
-            insert_result = supabase.from_("social_media_platforms").insert(new_platforms).execute()
+            insert_result = db.run_query("insert_social_media", supabase.from_("social_media_platforms").insert(new_platforms))
             
             if not insert_result.data:
                 raise HTTPException(status_code=500, detail="Failed to save social media data")
         
         # Update profile completion status
-        supabase.from_("profiles").update({
+        db.run_query("update_profile_social_status", supabase.from_("profiles").update({
             "social_media_completed": True,
             "social_media_completed_at": "now()"
-        }).eq("id", user_id).execute()
+        }).eq("id", user_id))
         
         # Return updated social media data
-        updated_data = supabase.from_("social_media_platforms").select("*").eq("user_id", user_id).execute()
+        updated_data = db.run_query("get_social_media", supabase.from_("social_media_platforms").select("*").eq("user_id", user_id))
         return updated_data.data or []
         
     except (ValidationError, SecurityError):
@@ -186,7 +190,7 @@ async def delete_social_media_platform(
             )
         
         # Delete the platform
-        result = supabase.from_("social_media_platforms").delete().eq("user_id", user_id).eq("platform", platform).execute()
+        result = db.run_query("delete_social_media_platform", supabase.from_("social_media_platforms").delete().eq("user_id", user_id).eq("platform", platform))
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Social media platform not found")
@@ -13,6 +13,12 @@ import asyncio
 import logging
 from functools import wraps
 import os
+import time
+from app.monitoring.tracing import tracer
+from app.monitoring.timing import timed
+from app.monitoring.multiprocess import metrics_store
+from app.monitoring.metrics import metrics_collector
+from app.circuit_breaker import redis_breaker
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +44,26 @@ class CacheConfig:
     # Cache sizes
     MAX_CACHE_SIZE = 1000  # Maximum items per cache type
 
+def _instrumented(operation: str):
+    """Wrap a CacheManager operation in a tracing span and the Server-Timing cache bucket.
+
+    Reads are also counted in ``cache_operations_total`` by hit/miss, which the
+    cache_hit_rate alert rule divides.
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            key = args[0] if args else kwargs.get("key_type", kwargs.get("pattern", ""))
+            start = time.perf_counter()
+            with tracer.start_span(f"cache.{operation}", {"cache.key": key}) as span, timed("cache"):
+                result = await func(self, *args, **kwargs)
+                if operation == "get":
+                    span.set_attribute("cache.hit", result is not None)
+                    metrics_collector.record_cache_operation(operation, result is not None, time.perf_counter() - start)
+                return result
+        return wrapper
+    return decorator
+
 class CacheManager:
     """Redis-based cache manager with automatic invalidation and performance monitoring"""
     
@@ -79,6 +105,10 @@ class CacheManager:
         if self.redis_client:
             await self.redis_client.close()
     
+    def _redis_available(self) -> bool:
+        """Redis is connected and its circuit breaker admits a call (which must then be tracked)"""
+        return not self.fallback_mode and self.redis_client is not None and redis_breaker.allow()
+    
     def _serialize_data(self, data: Any) -> bytes:
         """Serialize data for Redis storage"""
         try:
@@ -115,15 +145,17 @@ class CacheManager:
             return f"{base_key}:{identifier}"
         return base_key
     
+    @_instrumented("get")
     async def get(self, key_type: str, identifier: str = "") -> Optional[Any]:
         """Get data from cache"""
-        if self.fallback_mode or not self.redis_client:
+        if not self._redis_available():
             self._stats["misses"] += 1
             return None
         
         try:
             cache_key = self._generate_cache_key(key_type, identifier)
-            cached_data = await self.redis_client.get(cache_key)
+            with redis_breaker.track():
+                cached_data = await self.redis_client.get(cache_key)
             
             if cached_data:
                 self._stats["hits"] += 1
@@ -137,9 +169,10 @@ class CacheManager:
             self._stats["errors"] += 1
             return None
     
+    @_instrumented("set")
     async def set(self, key_type: str, data: Any, identifier: str = "", ttl: Optional[int] = None) -> bool:
         """Set data in cache with TTL"""
-        if self.fallback_mode or not self.redis_client:
+        if not self._redis_available():
             return False
         
         try:
@@ -150,7 +183,8 @@ class CacheManager:
             if ttl is None:
                 ttl = getattr(self.config, f"TTL_{key_type.upper()}", 3600)
             
-            await self.redis_client.setex(cache_key, ttl, serialized_data)
+            with redis_breaker.track():
+                await self.redis_client.setex(cache_key, ttl, serialized_data)
             self._stats["cache_operations"] += 1
             return True
             
@@ -159,14 +193,16 @@ class CacheManager:
             self._stats["errors"] += 1
             return False
     
+    @_instrumented("delete")
     async def delete(self, key_type: str, identifier: str = "") -> bool:
         """Delete data from cache"""
-        if self.fallback_mode or not self.redis_client:
+        if not self._redis_available():
             return False
         
         try:
             cache_key = self._generate_cache_key(key_type, identifier)
-            result = await self.redis_client.delete(cache_key)
+            with redis_breaker.track():
+                result = await self.redis_client.delete(cache_key)
             self._stats["cache_operations"] += 1
             return result > 0
             
@@ -175,19 +211,21 @@ class CacheManager:
             self._stats["errors"] += 1
             return False
     
+    @_instrumented("invalidate_pattern")
     async def invalidate_pattern(self, pattern: str) -> int:
         """Invalidate all keys matching a pattern"""
-        if self.fallback_mode or not self.redis_client:
+        if not self._redis_available():
             return 0
         
         try:
             # Find keys matching pattern
             keys = []
-            async for key in self.redis_client.scan_iter(match=pattern):
-                keys.append(key)
+            with redis_breaker.track():
+                async for key in self.redis_client.scan_iter(match=pattern):
+                    keys.append(key)
+                deleted = await self.redis_client.delete(*keys) if keys else 0
             
             if keys:
-                deleted = await self.redis_client.delete(*keys)
                 self._stats["cache_operations"] += 1
                 logger.info(f"Invalidated {deleted} cache entries matching pattern: {pattern}")
                 return deleted
@@ -198,26 +236,42 @@ class CacheManager:
             self._stats["errors"] += 1
             return 0
     
+    def snapshot_stats(self) -> Dict[str, int]:
+        """Get a copy of the cache counters for cross-worker aggregation"""
+        return dict(self._stats)
+    
+    @staticmethod
+    def merge_stats(snapshots: List[Dict[str, int]]) -> Dict[str, int]:
+        """Sum cache counters from several workers"""
+        merged = {"hits": 0, "misses": 0, "errors": 0, "cache_operations": 0}
+        for snapshot in snapshots:
+            for key in merged:
+                merged[key] += snapshot.get(key, 0)
+        return merged
+    
     async def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache performance statistics"""
-        total_requests = self._stats["hits"] + self._stats["misses"]
-        hit_rate = (self._stats["hits"] / total_requests * 100) if total_requests > 0 else 0
+        stats = metrics_store.aggregate("cache", local=self._stats)
+        total_requests = stats["hits"] + stats["misses"]
+        hit_rate = (stats["hits"] / total_requests * 100) if total_requests > 0 else 0
         
         redis_info = {}
-        if not self.fallback_mode and self.redis_client:
+        if self._redis_available():
             try:
-                redis_info = await self.redis_client.info()
+                with redis_breaker.track():
+                    redis_info = await self.redis_client.info()
             except Exception as e:
                 logger.warning(f"Failed to get Redis info: {e}")
         
         return {
             "hit_rate": round(hit_rate, 2),
-            "total_hits": self._stats["hits"],
-            "total_misses": self._stats["misses"],
-            "total_errors": self._stats["errors"],
-            "cache_operations": self._stats["cache_operations"],
+            "total_hits": stats["hits"],
+            "total_misses": stats["misses"],
+            "total_errors": stats["errors"],
+            "cache_operations": stats["cache_operations"],
             "fallback_mode": self.fallback_mode,
             "redis_connected": not self.fallback_mode,
+            "circuit_breaker": redis_breaker.state.value,
             "redis_info": {
                 "used_memory_human": redis_info.get("used_memory_human", "N/A"),
                 "connected_clients": redis_info.get("connected_clients", "N/A"),
@@ -306,6 +360,7 @@ async def init_cache_system():
     global cache_manager
     cache_manager = CacheManager()
     await cache_manager.init_redis()
+    metrics_store.register("cache", cache_manager.snapshot_stats, CacheManager.merge_stats)
     return cache_manager
 
 async def cleanup_cache_system():
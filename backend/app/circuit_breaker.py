@@ -0,0 +1,191 @@
+"""
+Circuit breakers for FairPlay NIL backend
+Fail fast on a dependency (Supabase, Redis) whose recent calls are erroring or slow
+"""
+
+import os
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+from fastapi import HTTPException
+from app.monitoring.metrics import metrics_collector
+from app.monitoring.rolling import RingBuffer
+
+logger = logging.getLogger(__name__)
+
+class CircuitBreakerConfig:
+    """Circuit breaker thresholds"""
+
+    # Calls are judged over a rolling window of per-second slots
+    WINDOW_SECONDS = int(os.getenv("CIRCUIT_WINDOW_SECONDS", "30"))
+    MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "20"))
+
+    # Trip when the error rate or the average latency in the window reaches these
+    ERROR_RATE_THRESHOLD = float(os.getenv("CIRCUIT_ERROR_RATE", "0.5"))
+    LATENCY_THRESHOLDS = {
+        "supabase": float(os.getenv("CIRCUIT_SUPABASE_LATENCY", "2.0")),
+        "redis": float(os.getenv("CIRCUIT_REDIS_LATENCY", "0.5")),
+    }
+    DEFAULT_LATENCY_THRESHOLD = 2.0
+
+    # How long an open breaker rejects calls before letting a trial call through
+    OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+    HALF_OPEN_MAX_CALLS = 1
+
+class CircuitState(Enum):
+    """Circuit breaker states"""
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+_STATE_VALUES = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+class CircuitOpenError(HTTPException):
+    """Dependency unavailable because its circuit breaker is open"""
+    def __init__(self, breaker: str, retry_after: int):
+        super().__init__(
+            status_code=503,
+            detail=f"Service temporarily unavailable ({breaker})",
+            headers={"Retry-After": str(retry_after)}
+        )
+        self.breaker = breaker
+
+class CircuitBreaker:
+    """Closed -> open on error rate or latency, open -> half-open after a cooldown,
+    half-open -> closed on a successful trial call (or back to open on a failed one).
+    """
+
+    def __init__(self, name: str, latency_threshold: Optional[float] = None,
+                 is_failure: Callable[[Exception], bool] = lambda error: True):
+        self.name = name
+        self.config = CircuitBreakerConfig()
+        self.latency_threshold = latency_threshold or self.config.LATENCY_THRESHOLDS.get(
+            name, self.config.DEFAULT_LATENCY_THRESHOLD
+        )
+        self.is_failure = is_failure
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        self.last_trip_reason: Optional[str] = None
+        self._window = RingBuffer(1, self.config.WINDOW_SECONDS)
+        self._half_open_calls = 0
+        self._trial_started_at = 0.0
+        self._lock = threading.Lock()
+
+        self._state_gauge = metrics_collector.registry.gauge(
+            "circuit_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ("breaker",)
+        ).labels(name)
+        self._rejected = metrics_collector.registry.counter(
+            "circuit_breaker_rejected_total", "Calls rejected by an open circuit breaker", ("breaker",)
+        ).labels(name)
+        self._state_gauge.set(0)
+
+    def _transition(self, state: CircuitState, reason: str = ""):
+        previous, self.state = self.state, state
+        self._state_gauge.set(_STATE_VALUES[state])
+        if state is CircuitState.OPEN:
+            self.opened_at = time.monotonic()
+            self.last_trip_reason = reason
+            logger.warning(f"Circuit breaker {self.name} opened: {reason}")
+        elif previous is not state:
+            logger.info(f"Circuit breaker {self.name} {previous.value} -> {state.value}")
+
+    def retry_after(self) -> int:
+        """Seconds until an open breaker lets a trial call through"""
+        remaining = self.config.OPEN_SECONDS - (time.monotonic() - self.opened_at)
+        return max(1, int(remaining + 0.999))
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead; admitted calls must be reported with ``record``"""
+        with self._lock:
+            if self.state is CircuitState.CLOSED:
+                return True
+            if self.state is CircuitState.OPEN:
+                if time.monotonic() - self.opened_at < self.config.OPEN_SECONDS:
+                    self._rejected.inc()
+                    return False
+                self._transition(CircuitState.HALF_OPEN)
+            if self._half_open_calls >= self.config.HALF_OPEN_MAX_CALLS:
+                # A trial call that never reported back must not wedge the breaker
+                if time.monotonic() - self._trial_started_at < self.config.OPEN_SECONDS:
+                    self._rejected.inc()
+                    return False
+                self._half_open_calls = 0
+            self._half_open_calls += 1
+            self._trial_started_at = time.monotonic()
+            return True
+
+    def record(self, success: bool, duration: float):
+        """Report the outcome of an admitted call"""
+        with self._lock:
+            if self.state is CircuitState.HALF_OPEN:
+                self._half_open_calls = max(0, self._half_open_calls - 1)
+                if success and duration < self.latency_threshold:
+                    self._window = RingBuffer(1, self.config.WINDOW_SECONDS)
+                    self._transition(CircuitState.CLOSED)
+                else:
+                    self._transition(CircuitState.OPEN, "trial call failed" if not success else
+                                     f"trial call took {duration * 1000:.0f}ms")
+                return
+            if self.state is CircuitState.OPEN:
+                return  # admitted before the breaker opened
+
+            now = time.time()
+            self._window.add(now, duration, 200 if success else 500)
+            totals = self._window.totals(now, self.config.WINDOW_SECONDS)
+            count = totals["count"]
+            if count < self.config.MIN_CALLS:
+                return
+            error_rate = totals["errors"] / count
+            avg_latency = totals["duration"] / count
+            if error_rate >= self.config.ERROR_RATE_THRESHOLD:
+                self._transition(CircuitState.OPEN, f"error rate {error_rate:.0%} over {count} calls")
+            elif avg_latency >= self.latency_threshold:
+                self._transition(CircuitState.OPEN, f"average latency {avg_latency * 1000:.0f}ms over {count} calls")
+
+    @contextmanager
+    def track(self):
+        """Record the outcome and duration of the wrapped call (already admitted)"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            # Cancellation (e.g. a timeout) counts as a failure
+            self.record(isinstance(e, Exception) and not self.is_failure(e), time.perf_counter() - start)
+            raise
+        self.record(True, time.perf_counter() - start)
+
+    @contextmanager
+    def guard(self):
+        """Admit and track the wrapped call, raising CircuitOpenError while the breaker is open"""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+        with self.track():
+            yield
+
+    def get_status(self) -> Dict[str, Any]:
+        totals = self._window.totals(time.time(), self.config.WINDOW_SECONDS)
+        count = totals["count"]
+        return {
+            "state": self.state.value,
+            "window_calls": count,
+            "window_error_rate": round(totals["errors"] / count, 4) if count else 0.0,
+            "window_avg_latency_ms": round(totals["duration"] / count * 1000, 2) if count else 0.0,
+            "latency_threshold_ms": round(self.latency_threshold * 1000, 2),
+            "last_trip_reason": self.last_trip_reason,
+            "retry_after_seconds": self.retry_after() if self.state is CircuitState.OPEN else 0,
+            "rejected_total": int(self._rejected.get())
+        }
+
+def _is_supabase_failure(error: Exception) -> bool:
+    """PostgREST errors carrying a Postgres/request error code mean the call reached a healthy
+    database and was rejected (constraint, bad filter), so they do not count against the breaker"""
+    code = getattr(error, "code", None)
+    return not (isinstance(code, str) and code.startswith(("22", "23", "42", "PGRST1")))
+
+# Global circuit breaker instances
+supabase_breaker = CircuitBreaker("supabase", is_failure=_is_supabase_failure)
+redis_breaker = CircuitBreaker("redis")
+circuit_breakers = {"supabase": supabase_breaker, "redis": redis_breaker}
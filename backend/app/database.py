@@ -1,25 +1,78 @@
 # backend/app/database.py
 import os
 import time
+import hashlib
 from typing import Optional, Dict, Any, List, Tuple
 from supabase import create_client, Client
+from postgrest import ReturnMethod
 import logging
 from contextlib import contextmanager
 from datetime import datetime
 import asyncio
+import re
+import orjson
+from app.monitoring.tracing import tracer
+from app.monitoring.timing import timed
+from app.monitoring.multiprocess import metrics_store
+from app.monitoring.metrics import metrics_collector
+from app.circuit_breaker import supabase_breaker, CircuitOpenError
+from app.deal_projections import DEAL_PROFILE_FIELDS, PROJECTIONS, flatten_profile
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_FILTER_VALUE = re.compile(r"^(not\.)?([a-z]+)\..*$", re.DOTALL)
+
+def query_shape(query) -> str:
+    """Literal-free description of a PostgREST query, e.g. ``GET deals?id=eq.?&select=id,status``"""
+    method = getattr(query, "http_method", "?")
+    table = str(getattr(query, "path", "")).rstrip("/").rsplit("/", 1)[-1]
+    params = getattr(query, "params", None)
+    items = params.multi_items() if hasattr(params, "multi_items") else []
+    parts = []
+    for key, value in items:
+        if key == "select":
+            value = re.sub(r"\s+", "", value)
+        elif key != "order":
+            value = _FILTER_VALUE.sub(lambda m: f"{m.group(1) or ''}{m.group(2)}.?", value) if "." in value else "?"
+        parts.append(f"{key}={value}")
+    return f"{method} {table}" + (f"?{'&'.join(parts)}" if parts else "")
+
+def result_rows(result: Any) -> int:
+    """Row count of a query result (list results or the paginated deals payload)"""
+    data = getattr(result, "data", result)
+    if data is None:
+        return 0
+    if isinstance(data, list):
+        return len(data)
+    if isinstance(data, dict) and isinstance(data.get("deals"), list):
+        return len(data["deals"])
+    return 1 if data else 0
+
+def result_bytes(result: Any) -> int:
+    """JSON payload size in bytes of a query result; serializes the whole result"""
+    data = getattr(result, "data", result)
+    if data is None:
+        return 0
+    try:
+        return len(orjson.dumps(data, default=str))
+    except TypeError:
+        return 0
+
 class QueryPerformanceMonitor:
     """Monitor and log query performance"""
     
     def __init__(self):
         self._query_stats = {}
-        self._slow_query_threshold = 1.0  # 1 second
+        self._slow_query_threshold = float(os.getenv("SLOW_QUERY_THRESHOLD_SECONDS", "1.0"))
+        # Sizing a result serializes it, so only 1 in N results is measured (and scaled by N)
+        self._bytes_sample_every = max(1, int(os.getenv("QUERY_BYTES_SAMPLE_EVERY", "10")))
+        self._results_seen = 0
     
-    def record_query(self, query_type: str, duration: float, success: bool = True):
+    def record_query(self, query_type: str, duration: float, success: bool = True,
+                     rows: Optional[int] = None, payload_bytes: Optional[int] = None,
+                     shape: Optional[str] = None):
         """Record query performance metrics"""
         if query_type not in self._query_stats:
             self._query_stats[query_type] = {
@@ -27,26 +80,75 @@ class QueryPerformanceMonitor:
                 "total_duration": 0.0,
                 "avg_duration": 0.0,
                 "slow_queries": 0,
-                "errors": 0
+                "errors": 0,
+                "total_rows": 0,
+                "total_bytes": 0
             }
         
         stats = self._query_stats[query_type]
         stats["total_count"] += 1
+        stats["total_rows"] += rows or 0
+        stats["total_bytes"] += payload_bytes or 0
         
         if success:
             stats["total_duration"] += duration
             stats["avg_duration"] = stats["total_duration"] / stats["total_count"]
             
-            if duration > self._slow_query_threshold:
+            if self.is_slow(duration):
                 stats["slow_queries"] += 1
-                logger.warning(f"Slow query detected: {query_type} took {duration:.2f}s")
+                logger.warning(
+                    f"Slow query detected: {query_type} took {duration:.2f}s "
+                    f"(rows={rows}, bytes={payload_bytes}, shape={shape or query_type})"
+                )
         else:
             stats["errors"] += 1
+        
+        metrics_collector.record_database_query(query_type, duration, success, rows, payload_bytes)
+    
+    def is_slow(self, duration: float) -> bool:
+        """Whether a query duration crosses the slow-query threshold"""
+        return duration > self._slow_query_threshold
+
+    def payload_bytes(self, result: Any, duration: float) -> Optional[int]:
+        """Payload size to record: exact for slow queries (they are logged), otherwise
+        a 1-in-QUERY_BYTES_SAMPLE_EVERY estimate, or None when this result is not sampled"""
+        if self.is_slow(duration):
+            return result_bytes(result)
+        self._results_seen += 1
+        if self._results_seen % self._bytes_sample_every:
+            return None
+        return result_bytes(result) * self._bytes_sample_every
     
     def get_stats(self) -> Dict[str, Any]:
         """Get query performance statistics"""
         return self._query_stats
     
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a copy of the query statistics for cross-worker aggregation"""
+        return {query_type: dict(stats) for query_type, stats in self._query_stats.items()}
+    
+    @staticmethod
+    def merge_stats(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Sum query statistics from several workers and recompute averages"""
+        merged = {}
+        for snapshot in snapshots:
+            for query_type, stats in snapshot.items():
+                target = merged.setdefault(query_type, {
+                    "total_count": 0,
+                    "total_duration": 0.0,
+                    "avg_duration": 0.0,
+                    "slow_queries": 0,
+                    "errors": 0,
+                    "total_rows": 0,
+                    "total_bytes": 0
+                })
+                for field in ("total_count", "total_duration", "slow_queries", "errors", "total_rows", "total_bytes"):
+                    target[field] += stats.get(field, 0)
+        for stats in merged.values():
+            if stats["total_count"]:
+                stats["avg_duration"] = stats["total_duration"] / stats["total_count"]
+        return merged
+    
     def reset_stats(self):
         """Reset query statistics"""
         self._query_stats = {}
@@ -123,33 +225,46 @@ class DatabaseClient:
         return self._client
 
     async def execute_with_monitoring(self, query_type: str, query_func, use_cache: bool = False, cache_key: str = None, cache_ttl: int = None):
-        """Execute a query with performance monitoring and optional caching"""
-        start_time = time.time()
-        
-        # Try cache first if enabled
-        if use_cache and self.cache_manager and cache_key:
-            cached_result = await self.cache_manager.get("query", cache_key)
-            if cached_result is not None:
-                duration = time.time() - start_time
-                self.performance_monitor.record_query(f"{query_type}_cached", duration)
-                return cached_result
-        
-        try:
-            result = query_func()
-            duration = time.time() - start_time
-            self.performance_monitor.record_query(query_type, duration, success=True)
-            
-            # Cache the result if caching is enabled
-            if use_cache and self.cache_manager and cache_key and result:
-                await self.cache_manager.set("query", result, cache_key, cache_ttl)
+        """Execute a query with performance monitoring and optional caching.
+
+        Raises CircuitOpenError (503) without calling Supabase while its breaker is open.
+        """
+        with tracer.start_span("db.query", {"db.query_type": query_type}) as span:
+            start_time = time.time()
             
-            return result
+            # Try cache first if enabled
+            if use_cache and self.cache_manager and cache_key:
+                cached_result = await self.cache_manager.get("query", cache_key)
+                if cached_result is not None:
+                    duration = time.time() - start_time
+                    self.performance_monitor.record_query(f"{query_type}_cached", duration)
+                    span.set_attribute("db.cached", True)
+                    return cached_result
             
-        except Exception as e:
-            duration = time.time() - start_time
-            self.performance_monitor.record_query(query_type, duration, success=False)
-            logger.error(f"Query failed ({query_type}): {str(e)}")
-            raise
+            try:
+                with timed("db"), supabase_breaker.guard():
+                    result = query_func()
+                duration = time.time() - start_time
+                rows = result_rows(result)
+                payload_bytes = self.performance_monitor.payload_bytes(result, duration)
+                span.set_attribute("db.rows", rows)
+                self.performance_monitor.record_query(query_type, duration, success=True,
+                                                      rows=rows, payload_bytes=payload_bytes)
+                
+                # Cache the result if caching is enabled
+                if use_cache and self.cache_manager and cache_key and result:
+                    await self.cache_manager.set("query", result, cache_key, cache_ttl)
+                
+                return result
+                
+            except CircuitOpenError:
+                span.set_attribute("db.circuit_open", True)
+                raise
+            except Exception as e:
+                duration = time.time() - start_time
+                self.performance_monitor.record_query(query_type, duration, success=False)
+                logger.error(f"Query failed ({query_type}): {str(e)}")
+                raise
 
     async def get_profile_cached(self, user_id: str) -> Dict[str, Any]:
         """Get a user profile with caching"""
@@ -245,39 +360,43 @@ class DatabaseClient:
 
     async def get_deals_paginated_with_profile(self, user_id: str, page: int = 1, limit: int = 20, 
                                              status: Optional[str] = None, deal_type: Optional[str] = None,
-                                             sort_by: str = "created_at", sort_order: str = "desc") -> Dict[str, Any]:
-        """Get paginated deals with profile information joined for analytics"""
+                                             sort_by: str = "created_at", sort_order: str = "desc",
+                                             fields: str = PROJECTIONS["list"].select,
+                                             projection: str = "list",
+                                             join_profile: bool = True) -> Dict[str, Any]:
+        """Get paginated deals with profile information joined for analytics
+
+        ``fields`` is the deal select string and ``projection`` names it in the cache key.
+        With ``join_profile=False`` the rows are returned without profile data; every
+        deal on the page belongs to ``user_id``, so callers can fetch the profile once.
+        """
         
-        # Build cache key
-        cache_key = f"deals_with_profile:{user_id}:{page}:{limit}:{status}:{deal_type}:{sort_by}:{sort_order}"
+        # Build cache key; the variant part is hashed so the key stays under the cache's
+        # hashing limit and keeps the user id readable for per-user invalidation
+        variant = (f"{page}:{limit}:{status}:{deal_type}:{sort_by}:{sort_order}:"
+                   f"{projection}:{'joined' if join_profile else 'deals_only'}")
+        cache_key = f"deals_with_profile:{user_id}:{hashlib.md5(variant.encode()).hexdigest()}"
         cache_ttl = 60  # 1 minute for deals with profile data
         
         def query_func():
             # First get total count for pagination
-            count_query = self.client.table('deals').select("*", count="exact").eq('user_id', user_id)
+            # HEAD request: only the count comes back, not the matching rows
+            count_query = self.client.table('deals').select("id", count="exact", head=True).eq('user_id', user_id)
             if status:
                 count_query = count_query.eq('status', status)
             if deal_type:
                 count_query = count_query.eq('deal_type', deal_type)
             
-            count_response = count_query.execute()
+            with tracer.start_span("db.count", {"db.table": "deals"}):
+                count_response = count_query.execute()
             total_count = count_response.count or 0
             
             # Calculate pagination
             pagination_meta = PaginationHelper.calculate_pagination(page, limit, total_count)
             
             # Get deals with profile data joined - fixed to use 'sports' (plural) and include more profile fields
-            deals_query = self.client.table('deals').select(f"""
-                id,user_id,status,status_labels,created_at,deal_nickname,deal_terms_url,deal_terms_file_name,
-                deal_terms_file_type,deal_terms_file_size,payor_name,payor_type,contact_name,
-                contact_email,contact_phone,activities,obligations,grant_exclusivity,
-                uses_school_ip,licenses_nil,compensation_cash,compensation_goods,
-                compensation_other,is_group_deal,is_paid_to_llc,athlete_social_media,
-                social_media_confirmed,social_media_confirmed_at,deal_type,clearinghouse_prediction,
-                valuation_prediction,brand_partner,clearinghouse_result,actual_compensation,
-                valuation_range,fmv,
-                profiles!deals_user_id_fkey(full_name,university,sports,division,gender,email,phone,role,avatar_url)
-            """).eq('user_id', user_id)
+            select_fields = f"{fields},profiles!deals_user_id_fkey({','.join(DEAL_PROFILE_FIELDS)})" if join_profile else fields
+            deals_query = self.client.table('deals').select(select_fields).eq('user_id', user_id)
             
             # Apply filters
             if status:
@@ -294,59 +413,15 @@ class DatabaseClient:
             # Apply pagination
             deals_query = PaginationHelper.apply_pagination(deals_query, page, limit)
             
-            deals_response = deals_query.execute()
+            with tracer.start_span("db.select", {"db.table": "deals"}) as span:
+                deals_response = deals_query.execute()
+                span.set_attribute("db.rows", len(deals_response.data or []))
             deals = deals_response.data or []
             
             # Flatten the profile data into the deal objects and add field mappings for frontend compatibility
-            for deal in deals:
-                if deal.get('profiles'):
-                    profile = deal['profiles']
-                    # Map profile data to deal fields
-                    deal['university'] = profile.get('university')
-                    deal['full_name'] = profile.get('full_name')
-                    deal['division'] = profile.get('division')
-                    deal['gender'] = profile.get('gender')
-                    deal['email'] = profile.get('email')
-                    deal['phone'] = profile.get('phone')
-                    deal['role'] = profile.get('role')
-                    deal['avatar_url'] = profile.get('avatar_url')
-                    
-                    # Handle sports array (convert to string for frontend compatibility)
-                    sports_data = profile.get('sports')
-                    if sports_data:
-                        if isinstance(sports_data, list):
-                            deal['sport'] = ', '.join(sports_data) if sports_data else ''
-                            deal['sports'] = sports_data
-                        else:
-                            # If it's already a string, use it
-                            deal['sport'] = sports_data
-                            deal['sports'] = [sports_data] if sports_data else []
-                    else:
-                        deal['sport'] = ''
-                        deal['sports'] = []
-                    
-                    # Add frontend-expected field mappings
-                    deal['athlete_name'] = profile.get('full_name', '')
-                    deal['school'] = profile.get('university', '')
-                    deal['description'] = deal.get('deal_nickname', '')
-                    
-                    # Remove the nested profiles object to keep the response clean
-                    del deal['profiles']
-                else:
-                    # Provide defaults if no profile data
-                    deal['university'] = ''
-                    deal['sport'] = ''
-                    deal['sports'] = []
-                    deal['athlete_name'] = ''
-                    deal['school'] = ''
-                    deal['description'] = deal.get('deal_nickname', '')
-                    deal['full_name'] = ''
-                    deal['division'] = ''
-                    deal['gender'] = ''
-                    deal['email'] = ''
-                    deal['phone'] = ''
-                    deal['role'] = ''
-                    deal['avatar_url'] = ''
+            if join_profile:
+                for deal in deals:
+                    flatten_profile(deal, deal.pop('profiles', None))
             
             return {
                 "deals": deals,
@@ -388,11 +463,111 @@ class DatabaseClient:
         result = await self.execute_with_monitoring("update_deal", query_func)
         
         # Invalidate user's deal cache
-        if self.cache_manager:
-            await self.cache_manager.invalidate_pattern(f"fairplay_cache:query:user_{user_id}_*")
+        await self.invalidate_deal_cache(user_id)
         
         return result
 
+    async def invalidate_deal_cache(self, user_id: str) -> int:
+        """Drop every cached deal list page of a user (plain and profile-joined lists)"""
+        if not self.cache_manager:
+            return 0
+        invalidated = 0
+        for pattern in (f"fairplay_cache:query:user_{user_id}_*",
+                        f"fairplay_cache:query:deals_with_profile:{user_id}:*"):
+            invalidated += await self.cache_manager.invalidate_pattern(pattern)
+        return invalidated
+
+    async def get_deals_by_ids(self, user_id: str, deal_ids: List[int], fields: str) -> Dict[int, Dict[str, Any]]:
+        """Fetch several of a user's deals in one query, keyed by id (deals of other users are absent)"""
+        def query_func():
+            response = self.client.table('deals').select(fields).in_("id", deal_ids).eq("user_id", user_id).execute()
+            return response.data or []
+
+        rows = await self.execute_with_monitoring("get_deals_by_ids", query_func)
+        return {row["id"]: row for row in rows}
+
+    async def get_deals_after(self, user_id: str, fields: str, after_id: Optional[int], limit: int,
+                              status: Optional[str] = None, deal_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Keyset page of a user's deals: the first ``limit`` rows by id with id > after_id"""
+        def query_func():
+            query = self.client.table('deals').select(fields).eq("user_id", user_id)
+            if after_id is not None:
+                query = query.gt("id", after_id)
+            if status:
+                query = query.eq("status", status)
+            if deal_type:
+                query = query.eq("deal_type", deal_type)
+            return query.order("id").limit(limit).execute().data or []
+
+        return await self.execute_with_monitoring("export_deals_page", query_func)
+
+    async def update_deals_with_cache_invalidation(
+        self, user_id: str, updates: List[Tuple[List[int], Dict[str, Any]]]
+    ) -> Tuple[Dict[int, Dict[str, Any]], Dict[int, str]]:
+        """Apply ``(deal_ids, update_data)`` groups, one UPDATE per group, then invalidate the user's
+        deal cache once. Returns updated rows by id and an error message for each id that failed."""
+        updated: Dict[int, Dict[str, Any]] = {}
+        failed: Dict[int, str] = {}
+        for deal_ids, update_data in updates:
+            def query_func(deal_ids=deal_ids, update_data=update_data):
+                response = self.client.table('deals').update(update_data).in_("id", deal_ids).eq("user_id", user_id).execute()
+                return response.data or []
+
+            try:
+                rows = await self.execute_with_monitoring("update_deals_batch", query_func)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                failed.update((deal_id, str(e)) for deal_id in deal_ids)
+                continue
+            for row in rows:
+                updated[row["id"]] = row
+            failed.update((deal_id, "Deal update failed") for deal_id in deal_ids if deal_id not in updated)
+
+        if updated:
+            await self.invalidate_deal_cache(user_id)
+
+        return updated, failed
+
+    async def insert_deals(self, rows: List[Dict[str, Any]]) -> int:
+        """Bulk insert deals in one request; columns a row leaves out take their defaults"""
+        def query_func():
+            self.client.table('deals').insert(
+                rows, returning=ReturnMethod.minimal, default_to_null=False
+            ).execute()
+            return len(rows)
+
+        return await self.execute_with_monitoring("import_deals", query_func)
+
+    def run_query(self, query_type: str, query):
+        """Execute a PostgREST query builder through the same instrumentation as execute_with_monitoring.
+
+        For routers that build queries on ``db.client`` directly; the query
+        shape (table, filters, selected columns) goes into the slow-query log.
+        """
+        with tracer.start_span("db.query", {"db.query_type": query_type}) as span:
+            start_time = time.time()
+            try:
+                with timed("db"), supabase_breaker.guard():
+                    response = query.execute()
+            except CircuitOpenError:
+                span.set_attribute("db.circuit_open", True)
+                raise
+            except Exception as e:
+                duration = time.time() - start_time
+                self.performance_monitor.record_query(query_type, duration, success=False)
+                logger.error(f"Query failed ({query_type}): {str(e)}")
+                raise
+            duration = time.time() - start_time
+            rows = result_rows(response)
+            payload_bytes = self.performance_monitor.payload_bytes(response, duration)
+            span.set_attribute("db.rows", rows)
+            # Only pay for building the shape when it will be logged
+            shape = query_shape(query) if self.performance_monitor.is_slow(duration) else None
+            self.performance_monitor.record_query(query_type, duration, success=True, rows=rows,
+                                                  payload_bytes=payload_bytes, shape=shape)
+            return response
+
     def get_profile(self, user_id: str) -> Dict[str, Any]:
         """Get a user profile (synchronous version for backwards compatibility)."""
         try:
@@ -417,7 +592,7 @@ class DatabaseClient:
 
     async def get_performance_stats(self) -> Dict[str, Any]:
         """Get database performance statistics"""
-        query_stats = self.performance_monitor.get_stats()
+        query_stats = metrics_store.aggregate("queries", local=self.performance_monitor.get_stats())
         
         # Add cache stats if available
         cache_stats = {}
@@ -435,8 +610,8 @@ class DatabaseClient:
         start_time = time.time()
         
         try:
-            # Test basic connectivity
-            response = self.client.table('profiles').select("id").limit(1).execute()
+            # Test basic connectivity (the Supabase client is synchronous - run it off the loop)
+            response = await asyncio.to_thread(self.client.table('profiles').select("id").limit(1).execute)
             duration = time.time() - start_time
             
             return {
@@ -455,5 +630,6 @@ class DatabaseClient:
 
 # Create a singleton instance
 db = DatabaseClient()
+metrics_store.register("queries", db.performance_monitor.snapshot, QueryPerformanceMonitor.merge_stats)
 # Export the client for backward compatibility
 supabase: Client = db.client
\ No newline at end of file
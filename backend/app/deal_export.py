@@ -0,0 +1,96 @@
+"""
+Streaming deal export for FairPlay NIL backend
+Keyset-paginated reads serialized to CSV/NDJSON one page at a time
+"""
+
+import io
+import os
+import csv
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+class DealExportConfig:
+    """Deal export settings"""
+
+    # Rows per keyset page; bounds memory to one page regardless of deal count
+    PAGE_SIZE = int(os.getenv("DEAL_EXPORT_PAGE_SIZE", "500"))
+
+    MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+# fetch_page(after_id, limit) -> rows ordered by id with id > after_id
+PageFetcher = Callable[[Optional[int], int], Awaitable[List[Dict[str, Any]]]]
+
+async def iter_deal_pages(fetch_page: PageFetcher, page_size: Optional[int] = None,
+                          first_page: Optional[List[Dict[str, Any]]] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Walk a user's deals by ``id > last_id`` pages, fetching the next page only when asked.
+
+    Keyset pages stay equally cheap however deep the export goes (no OFFSET scan)
+    and do not skip or repeat rows when deals are added or removed meanwhile.
+    """
+    page_size = page_size or DealExportConfig.PAGE_SIZE
+    page = first_page if first_page is not None else await fetch_page(None, page_size)
+    while page:
+        yield page
+        if len(page) < page_size:
+            return
+        page = await fetch_page(page[-1]["id"], page_size)
+
+# Leading characters that make spreadsheet apps evaluate a cell as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def flatten_value(value: Any) -> Any:
+    """JSONB arrays/objects become compact JSON text so they fit in one CSV cell.
+
+    Text that would be read as a formula gets a leading ``'`` so it displays as typed.
+    """
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value, default=str).decode()
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def csv_header(fields: Sequence[str]) -> bytes:
+    # BOM so spreadsheet apps open the file as UTF-8
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\r\n").writerow(fields)
+    return b"\xef\xbb\xbf" + buffer.getvalue().encode()
+
+def csv_rows(fields: Sequence[str], rows: List[Dict[str, Any]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\r\n")
+    writer.writerows([flatten_value(row.get(field)) for field in fields] for row in rows)
+    return buffer.getvalue().encode()
+
+def ndjson_rows(fields: Sequence[str], rows: List[Dict[str, Any]]) -> bytes:
+    return b"".join(orjson.dumps({field: row.get(field) for field in fields}, default=str) + b"\n" for row in rows)
+
+async def stream_export(file_format: str, fields: Sequence[str],
+                        pages: AsyncIterator[List[Dict[str, Any]]],
+                        transform: Optional[Callable[[Dict[str, Any]], None]] = None) -> AsyncIterator[bytes]:
+    """Serialize pages as they are fetched; one encoded page is in flight at a time.
+
+    The response awaits each chunk's send before asking for the next page, so a
+    slow client slows down the database reads instead of growing a buffer.
+    """
+    encode = csv_rows if file_format == "csv" else ndjson_rows
+    if file_format == "csv":
+        yield csv_header(fields)
+    total = 0
+    try:
+        async for page in pages:
+            if transform is not None:
+                for row in page:
+                    transform(row)
+            total += len(page)
+            yield encode(fields, page)
+    except Exception as e:
+        # Headers are already sent; ending the body early is all that is left
+        logger.error(f"[deal_export] Export aborted after {total} rows: {e}")
+        raise
+    logger.info(f"[deal_export] Exported {total} rows as {file_format}")
@@ -0,0 +1,231 @@
+"""
+Streaming deal import for FairPlay NIL backend
+Incremental CSV/NDJSON parsing of a request body and per-import progress tracking
+"""
+
+import os
+import csv
+import json
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class DealImportConfig:
+    """Deal import limits"""
+
+    # Rows per bulk insert; bounds memory to one chunk of rows regardless of upload size
+    CHUNK_SIZE = int(os.getenv("DEAL_IMPORT_CHUNK_SIZE", "200"))
+    MAX_ROWS = int(os.getenv("DEAL_IMPORT_MAX_ROWS", "10000"))
+
+    # Longest single line (or multi-line quoted CSV record) accepted
+    MAX_RECORD_BYTES = 1024 * 1024
+
+    # Row errors kept per import; later errors are only counted
+    MAX_REPORTED_ERRORS = 100
+
+    # Finished imports kept for progress lookups (running imports are never evicted)
+    MAX_TRACKED_IMPORTS = 100
+
+    # How long progress published to the shared cache stays readable by other workers
+    PROGRESS_TTL_SECONDS = int(os.getenv("DEAL_IMPORT_PROGRESS_TTL", "3600"))
+
+    FORMATS = ("csv", "ndjson")
+    CONTENT_TYPES = {"text/csv": "csv", "application/x-ndjson": "ndjson", "application/jsonl": "ndjson"}
+
+class ImportFormatError(Exception):
+    """Input that cannot be parsed any further (the import stops)"""
+
+# (row number, parsed row, error message for a row that could not be parsed)
+Record = Tuple[int, Dict[str, Any], Optional[str]]
+
+def detect_format(file_format: Optional[str], content_type: str) -> Optional[str]:
+    """Format from an explicit ``format`` value or the Content-Type; None if unsupported"""
+    if file_format:
+        return file_format if file_format in DealImportConfig.FORMATS else None
+    return DealImportConfig.CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_bytes: int = DealImportConfig.MAX_RECORD_BYTES) -> AsyncIterator[str]:
+    """Decode a byte stream into lines without holding more than one partial line"""
+    buffer = b""
+    first = True
+    async for chunk in chunks:
+        buffer += chunk
+        if b"\n" in chunk:
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                text = _decode(line, first)
+                first = False
+                yield text
+        if len(buffer) > max_bytes:
+            raise ImportFormatError(f"Line exceeds {max_bytes} bytes")
+    if buffer:
+        yield _decode(buffer, first)
+
+def _decode(line: bytes, first: bool) -> str:
+    try:
+        text = line.decode("utf-8-sig" if first else "utf-8")
+    except UnicodeDecodeError:
+        raise ImportFormatError("Input is not valid UTF-8")
+    return text[:-1] if text.endswith("\r") else text
+
+def _csv_value(value: str) -> Any:
+    """CSV cells are text; JSON arrays and objects (goods, labels, activities) are decoded"""
+    value = value.strip()
+    if value[:1] in ("[", "{"):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return value
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    """Rows keyed by the header line; empty cells are left out so they stay unset"""
+    header: Optional[List[str]] = None
+    pending: List[str] = []
+    pending_bytes = 0
+    quotes = 0
+    number = 0
+    async for line in lines:
+        pending.append(line)
+        pending_bytes += len(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            # Inside a quoted field that continues on the next line
+            if pending_bytes > DealImportConfig.MAX_RECORD_BYTES:
+                raise ImportFormatError(f"CSV record exceeds {DealImportConfig.MAX_RECORD_BYTES} bytes")
+            continue
+        record = "\n".join(pending)
+        pending, pending_bytes, quotes = [], 0, 0
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip() for name in values]
+            if not all(header) or len(set(header)) != len(header):
+                raise ImportFormatError("CSV header must have unique, non-empty column names")
+            continue
+        number += 1
+        if len(values) != len(header):
+            yield number, {}, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield number, {name: _csv_value(value) for name, value in zip(header, values) if value.strip()}, None
+    if pending:
+        raise ImportFormatError("Unterminated quoted field at end of input")
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    """One JSON object per line; blank lines are skipped"""
+    number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, {}, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield number, {}, "Each line must be a JSON object"
+            continue
+        yield number, row, None
+
+def iter_records(file_format: str, chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    lines = iter_lines(chunks)
+    return iter_csv_records(lines) if file_format == "csv" else iter_ndjson_records(lines)
+
+class ImportProgress:
+    """Counters for one import, readable while it runs"""
+
+    def __init__(self, import_id: str, user_id: str, file_format: str):
+        self.import_id = import_id
+        self.user_id = user_id
+        self.format = file_format
+        self.status = "running"
+        self.rows = 0
+        self.inserted = 0
+        self.failed = 0
+        self.chunks = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.detail: Optional[str] = None
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    def fail(self, row: Optional[int], detail: Any, count: int = 1):
+        self.failed += count
+        if len(self.errors) < DealImportConfig.MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "detail": detail})
+
+    def finish(self, status: str = "completed", detail: Optional[str] = None):
+        self.status = status
+        self.detail = detail
+        self.finished_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            "import_id": self.import_id,
+            "format": self.format,
+            "status": self.status,
+            "detail": self.detail,
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "chunks": self.chunks,
+            "rows_per_second": round(self.rows / elapsed, 1) if elapsed > 0 else 0.0,
+            "duration_ms": round(elapsed * 1000, 2),
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+class ImportRegistry:
+    """Recent imports of this worker by (user_id, import_id), bounded to MAX_TRACKED_IMPORTS.
+
+    Progress is also published to the shared cache (Redis) so a poll that lands
+    on another worker still finds the import.
+    """
+
+    def __init__(self):
+        self._imports: "OrderedDict[Tuple[str, str], ImportProgress]" = OrderedDict()
+
+    def create(self, user_id: str, file_format: str, import_id: Optional[str] = None) -> ImportProgress:
+        """Register a new import; a client-chosen id lets it poll progress while uploading"""
+        import_id = import_id or uuid.uuid4().hex
+        key = (user_id, import_id)
+        existing = self._imports.get(key)
+        if existing is not None and existing.status == "running":
+            raise ValueError(f"Import {import_id} is already running")
+        progress = ImportProgress(import_id, user_id, file_format)
+        self._imports.pop(key, None)
+        self._imports[key] = progress
+        excess = len(self._imports) - DealImportConfig.MAX_TRACKED_IMPORTS
+        if excess > 0:
+            # Oldest finished imports go first; running ones are still being polled
+            finished = [key for key, tracked in self._imports.items() if tracked.status != "running"]
+            for key in finished[:excess]:
+                del self._imports[key]
+        return progress
+
+    def get(self, import_id: str, user_id: str) -> Optional[ImportProgress]:
+        return self._imports.get((user_id, import_id))
+
+    async def publish(self, progress: ImportProgress, cache) -> None:
+        """Share a progress snapshot with the other workers; a no-op without a cache"""
+        if cache is not None:
+            await cache.set("import", progress.to_dict(), f"{progress.user_id}:{progress.import_id}",
+                            DealImportConfig.PROGRESS_TTL_SECONDS)
+
+    async def lookup(self, import_id: str, user_id: str, cache) -> Optional[Dict[str, Any]]:
+        """Progress from this worker, else the snapshot last published by the worker running it"""
+        progress = self.get(import_id, user_id)
+        if progress is not None:
+            return progress.to_dict()
+        if cache is None:
+            return None
+        return await cache.get("import", f"{user_id}:{import_id}")
+
+# Global import registry
+import_registry = ImportRegistry()
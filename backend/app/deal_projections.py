@@ -0,0 +1,137 @@
+"""
+Deal projections for FairPlay NIL backend
+Named column sets (summary/list/detail/analytics), validated sparse fieldsets and profile shapes for deal reads
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from app.schemas import DealAnalyticsResponse, DealListResponse, DealResponse, DealSummaryResponse
+
+# Every deal column a client may read, leading with the identifying ones
+_LEADING_COLUMNS = ("id", "user_id", "created_at", "status")
+DEAL_COLUMNS: Tuple[str, ...] = _LEADING_COLUMNS + tuple(
+    name for name in DealResponse.__fields__ if name not in _LEADING_COLUMNS
+)
+
+# Each named projection selects exactly its response model's fields
+PROJECTION_MODELS: Dict[str, Type[BaseModel]] = {
+    "summary": DealSummaryResponse,
+    "list": DealListResponse,
+    "detail": DealResponse,
+    "analytics": DealAnalyticsResponse,
+}
+
+# Columns compute_fmv_value reads; without them the stored fmv is returned as is
+FMV_INPUT_COLUMNS = frozenset({
+    "deal_type", "compensation_cash", "compensation_goods", "compensation_other", "valuation_prediction"
+})
+
+# Profile columns shown alongside a user's deals
+DEAL_PROFILE_FIELDS = ("full_name", "university", "sports", "division", "gender", "email", "phone", "role", "avatar_url")
+
+def flatten_profile(deal: Dict[str, Any], profile: Optional[Dict[str, Any]]) -> None:
+    """Copy profile fields onto a deal with the aliases the frontend expects (legacy list shape)"""
+    if profile:
+        # Map profile data to deal fields
+        deal['university'] = profile.get('university')
+        deal['full_name'] = profile.get('full_name')
+        deal['division'] = profile.get('division')
+        deal['gender'] = profile.get('gender')
+        deal['email'] = profile.get('email')
+        deal['phone'] = profile.get('phone')
+        deal['role'] = profile.get('role')
+        deal['avatar_url'] = profile.get('avatar_url')
+        
+        # Handle sports array (convert to string for frontend compatibility)
+        sports_data = profile.get('sports')
+        if sports_data:
+            if isinstance(sports_data, list):
+                deal['sport'] = ', '.join(sports_data) if sports_data else ''
+                deal['sports'] = sports_data
+            else:
+                # If it's already a string, use it
+                deal['sport'] = sports_data
+                deal['sports'] = [sports_data] if sports_data else []
+        else:
+            deal['sport'] = ''
+            deal['sports'] = []
+        
+        # Add frontend-expected field mappings
+        deal['athlete_name'] = profile.get('full_name', '')
+        deal['school'] = profile.get('university', '')
+        deal['description'] = deal.get('deal_nickname', '')
+    else:
+        # Provide defaults if no profile data
+        deal['university'] = ''
+        deal['sport'] = ''
+        deal['sports'] = []
+        deal['athlete_name'] = ''
+        deal['school'] = ''
+        deal['description'] = deal.get('deal_nickname', '')
+        deal['full_name'] = ''
+        deal['division'] = ''
+        deal['gender'] = ''
+        deal['email'] = ''
+        deal['phone'] = ''
+        deal['role'] = ''
+        deal['avatar_url'] = ''
+
+class ProjectionError(HTTPException):
+    """Unknown projection name or field in a fieldset"""
+    def __init__(self, detail: str):
+        super().__init__(status_code=422, detail=detail)
+
+class DealProjection(NamedTuple):
+    """Resolved column set for one deal read"""
+    name: str
+    columns: Tuple[str, ...]
+
+    @property
+    def select(self) -> str:
+        """Supabase select string"""
+        return ",".join(self.columns)
+
+    @property
+    def cache_key(self) -> str:
+        return self.name if self.name in PROJECTION_MODELS else f"fields={self.select}"
+
+    @property
+    def computes_fmv(self) -> bool:
+        return "fmv" in self.columns and FMV_INPUT_COLUMNS <= set(self.columns)
+
+    def project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape a row like the projection's response model (missing columns become null)"""
+        return {name: row.get(name) for name in self.columns}
+
+    def project_rows(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self.project(row) for row in rows]
+
+def _model_columns(model: Type[BaseModel]) -> Tuple[str, ...]:
+    names = set(model.__fields__)
+    return tuple(name for name in DEAL_COLUMNS if name in names)
+
+PROJECTIONS: Dict[str, DealProjection] = {
+    name: DealProjection(name, _model_columns(model)) for name, model in PROJECTION_MODELS.items()
+}
+
+def resolve_projection(view: str = "detail", fields: Optional[str] = None) -> DealProjection:
+    """Pick a named projection, or build one from a comma-separated ``fields`` list.
+
+    ``fields`` wins over ``view``; ``id`` is always included and columns are put in
+    canonical order, so equivalent fieldsets share a cache key.
+    """
+    if fields is None:
+        projection = PROJECTIONS.get(view)
+        if projection is None:
+            raise ProjectionError(f"Unknown view '{view}'. Allowed views: {', '.join(PROJECTIONS)}")
+        return projection
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = sorted(requested.difference(DEAL_COLUMNS))
+    if unknown:
+        raise ProjectionError(f"Unknown fields: {', '.join(unknown)}")
+    requested.add("id")
+    return DealProjection("fields", tuple(name for name in DEAL_COLUMNS if name in requested))
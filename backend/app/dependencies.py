@@ -7,6 +7,7 @@ import logging
 import jwt
 from datetime import datetime
 import os
+import hmac
 from typing import Optional
 
 # Setup basic logging
@@ -51,6 +52,8 @@ async def get_user_id(request: Request, token: str = Depends(oauth2_scheme)) ->
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
+        # Picked up by the metrics middleware for active-user counting
+        request.state.user_id = user_id
         return user_id
     except jwt.ExpiredSignatureError:
         logger.warning("Token has expired")
@@ -88,4 +91,17 @@ async def get_user_role(request: Request, token: str = Depends(oauth2_scheme)) -
         return user_role
     except Exception as e:
         logger.warning(f"Failed to get user role: {e}")
-        return "athlete"  # Default role
\ No newline at end of file
+        return "athlete"  # Default role
+
+async def require_admin(request: Request) -> None:
+    """
+    Dependency guarding operational endpoints (profiling, memory snapshots).
+    Requires the X-Admin-Token header to match ADMIN_API_TOKEN; the endpoints
+    are disabled entirely when ADMIN_API_TOKEN is not set.
+    """
+    expected = os.getenv("ADMIN_API_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin endpoints are disabled")
+    provided = request.headers.get("X-Admin-Token", "")
+    if not hmac.compare_digest(provided.encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
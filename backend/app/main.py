@@ -1,15 +1,30 @@
 # backend/app/main.py
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from app.api import profile, deals, errors
 from app.database import supabase, db
 from app.middleware.rate_limiting import RateLimitMiddleware
 from app.middleware.error_handling import ErrorHandlingMiddleware
+from app.middleware.tracing import TracingMiddleware
+from app.middleware.server_timing import ServerTimingMiddleware
 from app.cache import init_cache_system, cleanup_cache_system, get_cache_manager
 from app.monitoring.health import health_monitor
 from app.monitoring.metrics import metrics_collector, prometheus_exporter
 from app.monitoring.dashboard import monitoring_dashboard
+from app.monitoring.dashboard_stream import dashboard_stream
+from app.monitoring.tracing import tracer
+from app.monitoring.multiprocess import metrics_store
+from app.monitoring.loop_monitor import loop_monitor
+from app.monitoring.profiler import sampling_profiler, ProfilerBusyError, to_collapsed, to_speedscope
+from app.monitoring.memory import memory_profiler, SnapshotNotFoundError, TracingNotStartedError
+from app.monitoring.slo import slo_tracker
+from app.monitoring.lane import monitoring_lane, monitoring_server
+from app.dependencies import require_admin
+from app.circuit_breaker import circuit_breakers, supabase_breaker, CircuitState
+import asyncio
+from app.responses import FastJSONResponse
 from contextlib import asynccontextmanager
 import os
 import time
@@ -23,6 +38,9 @@ logger = logging.getLogger(__name__)
 # Global rate limiter instance
 rate_limiter = None
 
+# Process start time for the liveness probe
+STARTED_AT = time.time()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handle application lifespan with rate limiter and cache system setup"""
@@ -37,6 +55,36 @@ async def lifespan(app: FastAPI):
     cache_manager = await init_cache_system()
     db.set_cache_manager(cache_manager)
     
+    # Initialize tracing exporter
+    tracer.configure_from_env()
+    if tracer.exporter:
+        await tracer.exporter.start()
+    
+    # Start sharing metrics with other workers (no-op unless METRICS_MULTIPROC_DIR is set)
+    await metrics_store.start()
+    
+    # Sample event loop lag (LOOP_MONITOR_DEBUG=true also captures blocking stacks)
+    if loop_monitor.config.ENABLED:
+        await loop_monitor.start()
+    
+    # Export RSS/heap gauges continuously
+    await memory_profiler.start()
+    
+    # Run health probes in the background; health endpoints serve cached results
+    await health_monitor.start()
+    
+    # Serve Prometheus scrapes on MONITORING_PORT from a separate thread (disabled when unset)
+    monitoring_server.start()
+    
+    # Export SLO burn rates as gauges for the alert rules
+    await slo_tracker.start()
+    
+    # Evaluate alert rules against the metrics registry in the background
+    await monitoring_dashboard.alert_manager.start()
+    
+    # Push dashboard deltas to SSE subscribers (idle while nobody is connected)
+    await dashboard_stream.start()
+    
     logger.info(f"CORS allow_origin_regex configured: {ORIGIN_REGEX}")
     logger.info("--- Application Startup Complete ---")
     
@@ -45,10 +93,21 @@ async def lifespan(app: FastAPI):
     # Cleanup
     if rate_limiter:
         await rate_limiter.close_redis()
+    await dashboard_stream.stop()
+    await monitoring_dashboard.alert_manager.stop()
+    await slo_tracker.stop()
+    monitoring_server.stop()
+    monitoring_lane.shutdown()
+    await health_monitor.stop()
+    await loop_monitor.stop()
+    await memory_profiler.stop()
+    await metrics_store.stop()
     await cleanup_cache_system()
+    if tracer.exporter:
+        await tracer.exporter.shutdown()
     logger.info("--- Application Shutdown Complete ---")
 
-app = FastAPI(title="FairPlay NIL API", lifespan=lifespan)
+app = FastAPI(title="FairPlay NIL API", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # --- DEFINITIVE CORS FIX v8 ---
 # This regular expression matches:
@@ -69,7 +128,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Token-Expired", "WWW-Authenticate", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "X-RateLimit-Window"]
+    expose_headers=["X-Token-Expired", "WWW-Authenticate", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "X-RateLimit-Window", "X-Request-ID", "traceparent", "Server-Timing"]
 )
 
 # Add error handling middleware (early in stack to catch all exceptions)
@@ -77,22 +136,34 @@ app.add_middleware(
 async def error_handling_middleware(request: Request, call_next):
     """Error handling middleware to catch unhandled exceptions"""
     error_handler = ErrorHandlingMiddleware()
-    return await error_handler(request, call_next)
+    with tracer.start_span("middleware.error_handling"):
+        return await error_handler(request, call_next)
 
 # Add rate limiting middleware
 @app.middleware("http")
 async def rate_limit_middleware(request, call_next):
     """Rate limiting middleware wrapper"""
     global rate_limiter
-    if rate_limiter:
-        return await rate_limiter(request, call_next)
-    else:
-        return await call_next(request)
+    with tracer.start_span("middleware.rate_limit"):
+        if rate_limiter:
+            return await rate_limiter(request, call_next)
+        else:
+            return await call_next(request)
 
 # Add metrics collection middleware
 @app.middleware("http")
 async def metrics_middleware(request: Request, call_next):
     """Middleware to collect metrics on all requests"""
+    with tracer.start_span("middleware.metrics"):
+        return await _collect_request_metrics(request, call_next)
+
+def _endpoint_label(request: Request) -> str:
+    """Route template for metric labels (e.g. /api/deals/{deal_id}) to keep label cardinality bounded"""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+async def _collect_request_metrics(request: Request, call_next):
+    """Record duration and error metrics around the downstream handler"""
     start_time = time.time()
     
     # Extract user role from headers or token if available
@@ -108,18 +179,24 @@ async def metrics_middleware(request: Request, call_next):
         
         # Record metrics
         metrics_collector.record_request_duration(
-            endpoint=request.url.path,
+            endpoint=_endpoint_label(request),
             method=request.method,
             status_code=response.status_code,
             duration=duration,
             user_role=user_role
         )
+        slo_tracker.record(_endpoint_label(request), request.method, response.status_code, duration)
+        
+        # Count the authenticated user towards active-user windows
+        user_id = getattr(request.state, "user_id", None)
+        if user_id:
+            metrics_collector.record_user_activity(user_id, user_role, "request")
         
         # Record error if status code indicates an error
         if response.status_code >= 400:
             error_type = "client_error" if response.status_code < 500 else "server_error"
             metrics_collector.record_error_rate(
-                endpoint=request.url.path,
+                endpoint=_endpoint_label(request),
                 error_type=error_type,
                 user_role=user_role
             )
@@ -130,21 +207,38 @@ async def metrics_middleware(request: Request, call_next):
         # Record error metrics for exceptions
         duration = time.time() - start_time
         metrics_collector.record_request_duration(
-            endpoint=request.url.path,
+            endpoint=_endpoint_label(request),
             method=request.method,
             status_code=500,
             duration=duration,
             user_role=user_role
         )
+        slo_tracker.record(_endpoint_label(request), request.method, 500, duration)
         
         metrics_collector.record_error_rate(
-            endpoint=request.url.path,
+            endpoint=_endpoint_label(request),
             error_type="exception",
             user_role=user_role
         )
         
         raise e
 
+# Add Server-Timing middleware outside rate limiting so the limiter's Redis time is reported
+server_timing_handler = ServerTimingMiddleware()
+
+@app.middleware("http")
+async def server_timing_middleware(request: Request, call_next):
+    """Server-Timing middleware wrapper"""
+    return await server_timing_handler(request, call_next)
+
+# Add tracing middleware last so it is outermost and its root span covers every other middleware
+tracing_handler = TracingMiddleware()
+
+@app.middleware("http")
+async def tracing_middleware(request: Request, call_next):
+    """Tracing middleware wrapper"""
+    return await tracing_handler(request, call_next)
+
 # This routing setup is correct and follows FastAPI best practices.
 app.include_router(profile.router, prefix="/api")
 app.include_router(deals.router, prefix="/api")
@@ -165,6 +259,34 @@ async def health_check():
         "timestamp": db_health["timestamp"]
     }
 
+@app.get("/health/live")
+def liveness_check():
+    """Liveness probe: answers from memory without touching any dependency"""
+    return {
+        "status": "alive",
+        "uptime_seconds": round(time.time() - STARTED_AT, 1),
+        "pid": os.getpid()
+    }
+
+@app.get("/health/ready")
+def readiness_check():
+    """Readiness probe from circuit breaker state.
+    
+    Not ready (503) while the Supabase breaker is open; an open Redis breaker
+    only degrades readiness since the cache falls back to the database.
+    """
+    dependencies = {name: breaker.get_status() for name, breaker in circuit_breakers.items()}
+    ready = supabase_breaker.state is not CircuitState.OPEN
+    degraded = any(status["state"] != CircuitState.CLOSED.value for status in dependencies.values())
+    return FastJSONResponse(
+        {
+            "status": "not_ready" if not ready else "degraded" if degraded else "ready",
+            "dependencies": dependencies,
+            "timestamp": time.time()
+        },
+        status_code=200 if ready else 503
+    )
+
 @app.get("/health/comprehensive")
 async def comprehensive_health_check():
     """Comprehensive health check for all services"""
@@ -180,6 +302,10 @@ async def health_trends():
     """Get health trends analysis"""
     return health_monitor.get_health_trends()
 
+def _json_response(build) -> FastJSONResponse:
+    """Build and serialize a monitoring payload together (runs in the monitoring lane)"""
+    return FastJSONResponse(build())
+
 @app.get("/metrics")
 async def get_basic_metrics():
     """Get basic database performance metrics"""
@@ -188,24 +314,107 @@ async def get_basic_metrics():
 @app.get("/metrics/performance")
 async def get_performance_metrics():
     """Get comprehensive performance metrics"""
-    return metrics_collector.get_performance_metrics()
+    return await monitoring_lane.run(_json_response, lambda: prometheus_exporter.collector().get_performance_metrics())
 
 @app.get("/metrics/prometheus")
 async def get_prometheus_metrics():
     """Get metrics in Prometheus format"""
-    prometheus_text = prometheus_exporter.generate_prometheus_metrics()
+    prometheus_text = await monitoring_lane.run(prometheus_exporter.generate_prometheus_metrics)
     return PlainTextResponse(prometheus_text, media_type="text/plain")
 
 @app.get("/metrics/json")
 async def get_json_metrics():
     """Get metrics in JSON format"""
-    return prometheus_exporter.generate_json_metrics()
+    return await monitoring_lane.run(_json_response, prometheus_exporter.generate_json_metrics)
+
+@app.get("/metrics/lane")
+async def get_monitoring_lane_stats():
+    """Get monitoring lane occupancy and rejections"""
+    return monitoring_lane.get_stats()
+
+@app.get("/metrics/event-loop")
+async def get_event_loop_metrics():
+    """Get event loop lag and captured blocking stacks"""
+    return loop_monitor.get_stats()
 
 @app.get("/monitoring/dashboard")
 async def get_monitoring_dashboard(force_refresh: bool = False):
     """Get comprehensive monitoring dashboard data"""
     return await monitoring_dashboard.get_dashboard_data(force_refresh)
 
+@app.get("/monitoring/dashboard/stream")
+async def stream_dashboard():
+    """Server-Sent Events feed of the dashboard.
+    
+    Sends a full ``snapshot`` event on connect, then ``delta`` events holding
+    JSON merge patches (RFC 7396) to apply to it.
+    """
+    # Reserve the slot before responding; a client that disconnects before the
+    # stream starts is released by the background task
+    queue = dashboard_stream.try_reserve()
+    if queue is None:
+        raise HTTPException(status_code=503, detail="Too many dashboard stream subscribers")
+    return StreamingResponse(
+        dashboard_stream.subscribe(queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(dashboard_stream.release, queue)
+    )
+
+@app.get("/monitoring/profile", dependencies=[Depends(require_admin)])
+async def profile_process(
+    seconds: float = Query(10, gt=0, le=60),
+    interval_ms: float = Query(10, ge=1, le=1000),
+    format: str = Query("collapsed", regex="^(collapsed|speedscope)$")
+):
+    """Sample all thread stacks for N seconds (admin only, one profile at a time)"""
+    try:
+        result = await sampling_profiler.profile(seconds, interval_ms / 1000)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    if format == "speedscope":
+        return to_speedscope(result)
+    return PlainTextResponse(to_collapsed(result), media_type="text/plain")
+
+@app.get("/monitoring/memory", dependencies=[Depends(require_admin)])
+async def memory_status():
+    """Get tracemalloc status, current RSS/heap usage and stored snapshots"""
+    return memory_profiler.get_status()
+
+@app.post("/monitoring/memory/start", dependencies=[Depends(require_admin)])
+async def start_memory_tracing(frames: int = Query(1, ge=1, le=25)):
+    """Start tracemalloc"""
+    memory_profiler.start_tracing(frames)
+    return memory_profiler.get_status()
+
+@app.post("/monitoring/memory/stop", dependencies=[Depends(require_admin)])
+async def stop_memory_tracing():
+    """Stop tracemalloc and discard snapshots"""
+    memory_profiler.stop_tracing()
+    return memory_profiler.get_status()
+
+@app.post("/monitoring/memory/snapshots/{name}", dependencies=[Depends(require_admin)])
+async def take_memory_snapshot(name: str):
+    """Take a named tracemalloc snapshot"""
+    try:
+        return await asyncio.to_thread(memory_profiler.take_snapshot, name)
+    except TracingNotStartedError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.get("/monitoring/memory/diff", dependencies=[Depends(require_admin)])
+async def diff_memory_snapshots(
+    base: str,
+    target: str,
+    top: int = Query(20, ge=1, le=100),
+    group_by: str = Query("lineno", regex="^(lineno|filename)$")
+):
+    """Top-N allocation growth between two named snapshots"""
+    try:
+        return await asyncio.to_thread(memory_profiler.compare, base, target, top, group_by)
+    except SnapshotNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 @app.get("/monitoring/alerts")
 async def get_active_alerts():
     """Get active alerts"""
@@ -218,17 +427,37 @@ async def get_active_alerts():
 
 @app.post("/monitoring/alerts/test")
 async def test_alert_system():
-    """Test alert system (for development/testing)"""
+    """Evaluate the alert rules now (for development/testing)"""
     # This would normally be restricted in production
-    health_data = await health_monitor.get_comprehensive_health()
-    metrics_data = metrics_collector.get_performance_metrics()
-    
-    new_alerts = monitoring_dashboard.alert_manager.check_alerts(health_data, metrics_data)
+    new_alerts = await monitoring_dashboard.alert_manager.evaluate_async()
     
     return {
         "test_completed": True,
         "new_alerts": len(new_alerts),
-        "alert_details": [alert.__dict__ for alert in new_alerts]
+        "alert_details": [alert.__dict__ for alert in new_alerts],
+        "evaluation": monitoring_dashboard.alert_manager.last_evaluation
+    }
+
+@app.get("/monitoring/alerts/rules")
+async def get_alert_rules():
+    """Loaded alert rules with per-rule evaluation cost"""
+    return monitoring_dashboard.alert_manager.get_rules()
+
+@app.post("/monitoring/alerts/rules/reload", dependencies=[Depends(require_admin)])
+async def reload_alert_rules():
+    """Reload alert rules from ALERT_RULES_FILE without restarting"""
+    try:
+        count = monitoring_dashboard.alert_manager.reload_rules()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"reloaded": True, "rules": count}
+
+@app.get("/monitoring/slo")
+async def get_slo_status():
+    """SLO burn rates per window and error budget remaining, across all workers"""
+    return {
+        "period_days": slo_tracker.config.PERIOD_DAYS,
+        "slos": await monitoring_lane.run(slo_tracker.refresh)
     }
 
 @app.get("/cache/stats")
@@ -15,6 +15,8 @@ from contextlib import asynccontextmanager
 import jwt
 import os
 from datetime import datetime, timedelta
+from app.monitoring.tracing import tracer
+from app.monitoring.timing import timed
 
 logger = logging.getLogger(__name__)
 
@@ -200,7 +202,7 @@ class RateLimitMiddleware:
     async def __call__(self, request: Request, call_next):
         """Middleware function to be used with FastAPI"""
         # Skip rate limiting for health checks and internal endpoints
-        if request.url.path in ["/health", "/metrics", "/docs", "/redoc", "/openapi.json"]:
+        if request.url.path in ["/health", "/health/live", "/health/ready", "/metrics", "/docs", "/redoc", "/openapi.json"]:
             return await call_next(request)
         
         # Get authorization token
@@ -211,7 +213,9 @@ class RateLimitMiddleware:
         endpoint = request.url.path
         
         # Check rate limit
-        is_allowed, rate_info = await self.check_rate_limit(user_id, user_role, endpoint)
+        with tracer.start_span("rate_limit.check", {"rate_limit.role": user_role}) as span, timed("ratelimit"):
+            is_allowed, rate_info = await self.check_rate_limit(user_id, user_role, endpoint)
+            span.set_attribute("rate_limit.allowed", is_allowed)
         
         if not is_allowed:
             logger.warning(f"Rate limit exceeded for user {user_id} ({user_role}) on {endpoint}")
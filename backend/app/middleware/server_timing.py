@@ -0,0 +1,27 @@
+"""
+Server-Timing middleware for FairPlay NIL backend
+Emits the per-request db/cache/validate/ratelimit breakdown as a Server-Timing header
+"""
+
+import time
+from fastapi import Request
+from app.monitoring.timing import ServerTimingConfig, start_request_timings
+
+class ServerTimingMiddleware:
+    """Attach a timing accumulator to each request and report it on the response"""
+
+    def __init__(self):
+        self.config = ServerTimingConfig()
+
+    async def __call__(self, request: Request, call_next):
+        """Middleware function to be used with FastAPI"""
+        if not self.config.ENABLED:
+            return await call_next(request)
+
+        start = time.perf_counter()
+        # Downstream middleware and handlers run in a copy of this context,
+        # so they add to the same accumulator object
+        timings = start_request_timings()
+        response = await call_next(request)
+        response.headers[self.config.HEADER] = timings.to_header(total=time.perf_counter() - start)
+        return response
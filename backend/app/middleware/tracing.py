@@ -0,0 +1,42 @@
+"""
+Tracing middleware for FairPlay NIL backend
+Opens the root span for each request and propagates the request ID and trace context
+"""
+
+import logging
+from fastapi import Request
+from app.monitoring.tracing import tracer, get_request_id, TracingConfig
+
+logger = logging.getLogger(__name__)
+
+class TracingMiddleware:
+    """Root span per request with X-Request-ID and W3C traceparent propagation"""
+
+    def __init__(self):
+        self.config = TracingConfig()
+
+    async def __call__(self, request: Request, call_next):
+        """Middleware function to be used with FastAPI"""
+        with tracer.start_trace(
+            f"{request.method} {request.url.path}",
+            request_id=request.headers.get(self.config.REQUEST_ID_HEADER),
+            traceparent=request.headers.get("traceparent"),
+            attributes={"http.method": request.method, "http.target": request.url.path},
+        ) as span:
+            request_id = get_request_id()
+            request.state.request_id = request_id
+
+            response = await call_next(request)
+
+            # Use the route template once routing has resolved it (e.g. /api/deals/{deal_id})
+            route = request.scope.get("route")
+            if route is not None and hasattr(route, "path"):
+                span.set_attribute("http.route", route.path)
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.record_exception(RuntimeError(f"HTTP {response.status_code}"))
+
+            response.headers[self.config.REQUEST_ID_HEADER] = request_id
+            if tracer.enabled:
+                response.headers["traceparent"] = tracer.traceparent(span)
+            return response
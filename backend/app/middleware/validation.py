@@ -9,6 +9,7 @@ from typing import Any, Dict, List, Optional, Union
 from fastapi import HTTPException, Request
 from pydantic import BaseModel, ValidationError
 import logging
+from app.monitoring.timing import timed
 
 logger = logging.getLogger(__name__)
 
@@ -303,11 +304,12 @@ validator = InputValidator()
 
 def validate_request_data(data: Dict[str, Any], data_type: str) -> Dict[str, Any]:
     """Main validation function for request data"""
-    if data_type == 'deal':
-        return validator.validate_deal_data(data)
-    elif data_type == 'profile':
-        return validator.validate_profile_data(data)
-    elif data_type == 'social_media':
-        return validator.validate_social_media_data(data)
-    else:
-        return validator.sanitize_dict(data) 
\ No newline at end of file
+    with timed("validate"):
+        if data_type == 'deal':
+            return validator.validate_deal_data(data)
+        elif data_type == 'profile':
+            return validator.validate_profile_data(data)
+        elif data_type == 'social_media':
+            return validator.validate_social_media_data(data)
+        else:
+            return validator.sanitize_dict(data) 
\ No newline at end of file
@@ -3,14 +3,22 @@ Production Monitoring Package for FairPlay NIL
 Provides comprehensive monitoring, health checks, and observability
 """
 
-from .health import HealthChecker, SystemHealthMonitor
-from .metrics import MetricsCollector, PrometheusExporter
-from .dashboard import MonitoringDashboard
+import importlib
 
-__all__ = [
-    'HealthChecker',
-    'SystemHealthMonitor', 
-    'MetricsCollector',
-    'PrometheusExporter',
-    'MonitoringDashboard'
-] 
\ No newline at end of file
+# Exports are resolved lazily so that low-level modules (database, cache,
+# middleware) can import app.monitoring.tracing / app.monitoring.metrics
+# without pulling in health.py, which itself imports the database and cache.
+_EXPORTS = {
+    'HealthChecker': '.health',
+    'SystemHealthMonitor': '.health',
+    'MetricsCollector': '.metrics',
+    'PrometheusExporter': '.metrics',
+    'MonitoringDashboard': '.dashboard',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,308 @@
+"""
+Alert Rules for FairPlay NIL
+Declarative threshold rules over metric registry series, with for-duration, hysteresis and escalation
+"""
+
+import os
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+class AlertRulesConfig:
+    """Alert rule evaluation configuration"""
+
+    EVAL_INTERVAL_SECONDS = float(os.getenv("ALERT_EVAL_INTERVAL", "15"))
+
+    # Optional JSON file of rules ({"rules": [...]}) replacing the defaults; reloaded when it changes
+    RULES_FILE = os.getenv("ALERT_RULES_FILE", "")
+
+    # Severities from lowest to highest (AlertLevel values)
+    SEVERITIES = ("info", "warning", "critical", "emergency")
+
+    SOURCES = ("gauge", "rate", "ratio", "histogram_avg")
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+@dataclass
+class AlertRule:
+    """One alert rule.
+
+    ``source`` selects how series are read from the registry:
+      - ``gauge``: current value of ``metric``
+      - ``rate``: per-second increase of counter ``metric`` over ``window_seconds``
+      - ``ratio``: increase of ``metric`` / increase of ``denominator`` over the window
+      - ``histogram_avg``: mean observation of histogram ``metric`` over the window
+    ``match`` filters label values (a list matches any of its values) and
+    ``by`` sums series over every other label; omitted, each series is kept.
+    """
+    name: str
+    source: str
+    metric: str
+    thresholds: Dict[str, float]
+    op: str = ">"
+    match: Dict[str, Any] = field(default_factory=dict)
+    by: Optional[List[str]] = None
+    denominator: Optional[str] = None
+    denominator_match: Dict[str, Any] = field(default_factory=dict)
+    min_denominator: float = 0
+    window_seconds: float = 300
+    scale: float = 1
+    for_seconds: float = 0
+    hysteresis: float = 0
+    service: str = "application"
+    title: str = "{rule}"
+    description: str = "{rule} is {value:.1f}"
+
+    def __post_init__(self):
+        if self.source not in AlertRulesConfig.SOURCES:
+            raise ValueError(f"Rule {self.name}: unknown source {self.source!r}")
+        if self.op not in (">", "<", ">=", "<="):
+            raise ValueError(f"Rule {self.name}: unknown op {self.op!r}")
+        if not self.thresholds or any(s not in AlertRulesConfig.SEVERITIES for s in self.thresholds):
+            raise ValueError(f"Rule {self.name}: thresholds must map {AlertRulesConfig.SEVERITIES} to values")
+        if self.source == "ratio" and not self.denominator:
+            raise ValueError(f"Rule {self.name}: ratio rules need a denominator")
+        # Lowest severity first, so escalation walks upwards
+        self.thresholds = {
+            s: float(self.thresholds[s]) for s in AlertRulesConfig.SEVERITIES if s in self.thresholds
+        }
+
+    def breaches(self, value: float, threshold: float) -> bool:
+        if self.op == ">":
+            return value > threshold
+        if self.op == ">=":
+            return value >= threshold
+        if self.op == "<":
+            return value < threshold
+        return value <= threshold
+
+    def relaxed(self, threshold: float) -> float:
+        """Threshold an active alert must cross back over before it clears"""
+        return threshold - self.hysteresis if self.op.startswith(">") else threshold + self.hysteresis
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {
+        "name": "service_critical", "source": "gauge", "metric": "health_check_status",
+        "op": ">=", "thresholds": {"critical": 3}, "service": "{service}",
+        "title": "{Service} Service Critical", "description": "{service} health check is critical"
+    },
+    {
+        "name": "dependency_response_time", "source": "gauge", "metric": "health_check_response_time_ms",
+        "match": {"service": ["database", "redis"]}, "thresholds": {"warning": 500, "critical": 2000},
+        "for_seconds": 30, "hysteresis": 100, "service": "{service}",
+        "title": "{Service} Response Time High", "description": "Response time is {value:.0f}ms"
+    },
+    {
+        "name": "cpu_usage", "source": "gauge", "metric": "system_cpu_percent",
+        "thresholds": {"warning": 80, "critical": 95}, "for_seconds": 60, "hysteresis": 5,
+        "service": "system", "title": "High CPU Usage", "description": "CPU usage is at {value:.1f}%"
+    },
+    {
+        "name": "memory_usage", "source": "gauge", "metric": "system_memory_percent",
+        "thresholds": {"warning": 85, "critical": 95}, "for_seconds": 60, "hysteresis": 5,
+        "service": "system", "title": "High Memory Usage", "description": "Memory usage is at {value:.1f}%"
+    },
+    {
+        "name": "disk_usage", "source": "gauge", "metric": "system_disk_percent",
+        "thresholds": {"warning": 85, "critical": 95}, "hysteresis": 2,
+        "service": "system", "title": "High Disk Usage", "description": "Disk usage is at {value:.1f}%"
+    },
+    {
+        "name": "error_rate", "source": "ratio", "metric": "http_errors_total",
+        "denominator": "http_requests_total", "by": ["endpoint"], "scale": 100, "min_denominator": 20,
+        "window_seconds": 300, "thresholds": {"warning": 5, "critical": 10}, "for_seconds": 60, "hysteresis": 1,
+        "title": "High Error Rate on {endpoint}", "description": "Error rate is {value:.1f}%"
+    },
+    {
+        "name": "cache_hit_rate", "source": "ratio", "metric": "cache_operations_total",
+        "match": {"result": "hit"}, "denominator": "cache_operations_total", "by": [], "scale": 100,
+        "min_denominator": 50, "window_seconds": 300, "op": "<", "thresholds": {"warning": 70, "critical": 50},
+        "for_seconds": 120, "hysteresis": 5, "service": "cache",
+        "title": "Cache Hit Rate Low", "description": "Cache hit rate is {value:.1f}%"
+    },
+    # Multi-window SLO burn rates (thresholds match SLOConfig.POLICIES)
+    {
+        "name": "slo_fast_burn", "source": "gauge", "metric": "slo_multiwindow_burn_rate",
+        "match": {"policy": "fast"}, "by": ["slo"], "op": ">=", "thresholds": {"critical": 14.4},
+        "service": "slo", "title": "SLO {slo} Burning Error Budget Fast",
+        "description": "Error budget burning at {value:.1f}x over 1h and 5m"
+    },
+    {
+        "name": "slo_slow_burn", "source": "gauge", "metric": "slo_multiwindow_burn_rate",
+        "match": {"policy": "slow"}, "by": ["slo"], "op": ">=", "thresholds": {"warning": 6},
+        "service": "slo", "title": "SLO {slo} Burning Error Budget",
+        "description": "Error budget burning at {value:.1f}x over 6h and 30m"
+    },
+]
+
+def load_rules(path: str = "") -> List[AlertRule]:
+    """Rules from a JSON file (a list, or an object with a ``rules`` list), else the defaults.
+
+    Raises ValueError on an unreadable file or an invalid rule so a bad
+    reload can leave the current rules in place.
+    """
+    if not path:
+        definitions = DEFAULT_RULES
+    else:
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Cannot read alert rules from {path}: {e}")
+        definitions = data.get("rules", []) if isinstance(data, dict) else data
+    rules = []
+    for definition in definitions:
+        try:
+            rules.append(AlertRule(**definition))
+        except TypeError as e:
+            raise ValueError(f"Invalid alert rule {definition.get('name', '?')}: {e}")
+    names = [rule.name for rule in rules]
+    if len(names) != len(set(names)):
+        raise ValueError("Alert rule names must be unique")
+    return rules
+
+def _matches(labels: Dict[str, str], match: Dict[str, Any]) -> bool:
+    for name, expected in match.items():
+        value = labels.get(name)
+        if isinstance(expected, (list, tuple)):
+            if value not in [str(v) for v in expected]:
+                return False
+        elif value != str(expected):
+            return False
+    return True
+
+def select_series(registry, metric: str, match: Dict[str, Any],
+                  by: Optional[Sequence[str]]) -> Dict[LabelSet, Tuple[float, ...]]:
+    """Matching series of a registry family, summed by the ``by`` labels.
+
+    Values are tuples: ``(value,)`` for counters and gauges, ``(sum, count)`` for histograms.
+    """
+    family = registry.get(metric)
+    if family is None:
+        return {}
+    if family.type_name == "histogram":
+        raw = {key: (total, float(count)) for key, (_, total, count) in family.series().items()}
+    else:
+        raw = {key: (value,) for key, value in family.values().items()}
+    grouped: Dict[LabelSet, Tuple[float, ...]] = {}
+    for key, values in raw.items():
+        labels = dict(zip(family.label_names, key))
+        if not _matches(labels, match):
+            continue
+        group = tuple(sorted(labels.items())) if by is None else tuple((name, labels.get(name, "")) for name in by)
+        previous = grouped.get(group)
+        grouped[group] = values if previous is None else tuple(a + b for a, b in zip(previous, values))
+    return grouped
+
+class SeriesSampler:
+    """Timestamped samples of cumulative series, giving increases over a trailing window"""
+
+    def __init__(self):
+        self._samples: Dict[Tuple[Any, LabelSet], Deque[Tuple[float, Tuple[float, ...]]]] = {}
+        # selector -> time it was last sampled
+        self._sampled_at: Dict[Any, float] = {}
+
+    def increase(self, selector: Any, series: Dict[LabelSet, Tuple[float, ...]], now: float,
+                 window: float) -> Dict[LabelSet, Tuple[float, Tuple[float, ...]]]:
+        """Per series: (seconds covered, increase of each value) since the oldest sample in the window"""
+        increases = {}
+        previous_sample = self._sampled_at.get(selector)
+        if previous_sample == now:
+            previous_sample = None
+        self._sampled_at[selector] = now
+        for group, values in series.items():
+            samples = self._samples.get((selector, group))
+            if samples is None:
+                samples = self._samples[(selector, group)] = deque()
+                if previous_sample is not None:
+                    # A series that appeared since the last pass started from zero
+                    samples.append((previous_sample, tuple(0.0 for _ in values)))
+            if samples and samples[-1][0] == now:
+                samples.pop()
+            samples.append((now, values))
+            # Keep one sample at or before the window start as the baseline
+            while len(samples) > 1 and samples[1][0] <= now - window:
+                samples.popleft()
+            base_time, base_values = samples[0]
+            if base_time == now:
+                continue
+            deltas = tuple(
+                current - base if current >= base else current  # counter reset
+                for current, base in zip(values, base_values)
+            )
+            increases[group] = (now - base_time, deltas)
+        return increases
+
+    def prune(self, now: float, max_age: float):
+        """Drop series that have not been sampled recently"""
+        for key in [key for key, samples in self._samples.items() if samples[-1][0] < now - max_age]:
+            del self._samples[key]
+        for selector in [s for s, sampled_at in self._sampled_at.items() if sampled_at < now - max_age]:
+            del self._sampled_at[selector]
+
+def evaluate_rule(rule: AlertRule, registry, sampler: SeriesSampler, now: float) -> Dict[LabelSet, float]:
+    """Current value of every series a rule covers"""
+    if rule.source == "gauge":
+        series = select_series(registry, rule.metric, rule.match, rule.by)
+        return {group: values[0] * rule.scale for group, values in series.items()}
+
+    selector = (rule.metric, json.dumps(rule.match, sort_keys=True), tuple(rule.by) if rule.by is not None else None)
+    increases = sampler.increase(selector, select_series(registry, rule.metric, rule.match, rule.by),
+                                 now, rule.window_seconds)
+    if rule.source == "rate":
+        return {group: delta[0] / seconds * rule.scale for group, (seconds, delta) in increases.items()}
+    if rule.source == "histogram_avg":
+        return {
+            group: delta[0] / delta[1] * rule.scale
+            for group, (_, delta) in increases.items() if delta[1] > 0
+        }
+
+    denominator_selector = (rule.denominator, json.dumps(rule.denominator_match, sort_keys=True),
+                            tuple(rule.by) if rule.by is not None else None)
+    denominators = sampler.increase(
+        denominator_selector, select_series(registry, rule.denominator, rule.denominator_match, rule.by),
+        now, rule.window_seconds
+    )
+    values = {}
+    for group, (_, denominator) in denominators.items():
+        if denominator[0] <= 0 or denominator[0] < rule.min_denominator:
+            continue
+        numerator = increases.get(group, (0, (0.0,)))[1][0]
+        values[group] = numerator / denominator[0] * rule.scale
+    return values
+
+class RuleState:
+    """For-duration timers and active severity of one rule series"""
+
+    __slots__ = ("since", "severity", "value")
+
+    def __init__(self):
+        self.since: Dict[str, float] = {}
+        self.severity: Optional[str] = None
+        self.value: Optional[float] = None
+
+    def step(self, rule: AlertRule, value: Optional[float], now: float) -> Optional[str]:
+        """Advance with a new value (None when the series is gone); returns the severity to be active at"""
+        self.value = value
+        active_rank = rule_rank(self.severity)
+        desired = None
+        for severity, threshold in rule.thresholds.items():
+            # Severities at or below the active one hold until the value clears the hysteresis band
+            holding_threshold = rule.relaxed(threshold) if rule_rank(severity) <= active_rank else threshold
+            if value is None or not rule.breaches(value, holding_threshold):
+                self.since.pop(severity, None)
+                continue
+            started = self.since.setdefault(severity, now)
+            if rule_rank(severity) <= active_rank or now - started >= rule.for_seconds:
+                desired = severity
+        return desired
+
+def rule_rank(severity: Optional[str]) -> int:
+    return AlertRulesConfig.SEVERITIES.index(severity) if severity else -1
@@ -3,15 +3,25 @@ Monitoring Dashboard for FairPlay NIL
 Provides real-time system monitoring and alerting capabilities
 """
 
+import os
 import asyncio
 import time
-from typing import Dict, List, Any, Optional
+from collections import Counter, deque
+from itertools import islice
+from typing import Dict, List, Any, Deque, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
 import logging
 from app.monitoring.health import health_monitor, HealthStatus
 from app.monitoring.metrics import metrics_collector, prometheus_exporter
+from app.monitoring.multiprocess import metrics_store
+from app.monitoring.loop_monitor import loop_monitor
+from app.monitoring.slo import slo_tracker
+from app.monitoring.lane import monitoring_lane, MonitoringLaneBusyError
+from app.monitoring.alert_rules import (
+    AlertRule, AlertRulesConfig, RuleState, SeriesSampler, evaluate_rule, load_rules
+)
 
 logger = logging.getLogger(__name__)
 
@@ -34,298 +44,234 @@ class Alert:
     threshold: Optional[float] = None
     timestamp: Optional[str] = None
     resolved: bool = False
+    rule: Optional[str] = None
+    labels: Optional[Dict[str, str]] = None
     
     def __post_init__(self):
         if self.timestamp is None:
             self.timestamp = datetime.utcnow().isoformat()
 
+class AlertConfig:
+    """Alert manager configuration"""
+    
+    # Ring buffer capacity for fired alerts
+    HISTORY_SIZE = int(os.getenv("ALERT_HISTORY_SIZE", "1000"))
+    RECENT_ALERTS = 20
+
 class AlertManager:
-    """Manages alerts and thresholds"""
+    """Evaluates declarative alert rules against the metrics registry and tracks the resulting alerts.
     
-    def __init__(self):
+    Rules run on a background interval (``start``); each rule series keeps its
+    own for-duration timers and active severity, so alerts fire only after a
+    condition has held, escalate or de-escalate between severities, and clear
+    only once the value is back past the hysteresis band. With multi-process
+    metrics on, rules see the series merged across every worker.
+    """
+    
+    def __init__(self, registry=None, store=None):
+        self.config = AlertConfig()
+        self.rules_config = AlertRulesConfig()
+        self.registry = registry or metrics_collector.registry
+        self.store = store if store is not None or registry is not None else metrics_store
         self.active_alerts = {}
-        self.alert_history = []
-        self.thresholds = self._init_default_thresholds()
-        self.max_history_size = 1000
+        self.alert_history: Deque[Alert] = deque(maxlen=self.config.HISTORY_SIZE)
+        # Active alert counts, kept in step with active_alerts so summaries need no scan
+        self._active_by_level: Counter = Counter()
+        self._active_by_service: Counter = Counter()
+        self._fired_by_level: Counter = Counter()
+        
+        self.rules: List[AlertRule] = []
+        self._rules_mtime: Optional[float] = None
+        self._states: Dict[Tuple[str, Tuple], RuleState] = {}
+        self._sampler = SeriesSampler()
+        self._rule_stats: Dict[str, Dict[str, Any]] = {}
+        self.last_fired: List[Alert] = []
+        self.last_evaluation: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._evaluation_seconds = self.registry.histogram(
+            "alert_rule_evaluation_seconds", "Time spent evaluating one alert rule", ("rule",),
+            buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+        )
+        self.reload_rules()
     
-    def _init_default_thresholds(self) -> Dict[str, Dict[str, float]]:
-        """Initialize default alert thresholds"""
-        return {
-            "response_time": {
-                "warning": 1000,    # 1 second
-                "critical": 3000    # 3 seconds
-            },
-            "error_rate": {
-                "warning": 5.0,     # 5%
-                "critical": 10.0    # 10%
-            },
-            "cpu_usage": {
-                "warning": 80.0,    # 80%
-                "critical": 95.0    # 95%
-            },
-            "memory_usage": {
-                "warning": 85.0,    # 85%
-                "critical": 95.0    # 95%
-            },
-            "disk_usage": {
-                "warning": 85.0,    # 85%
-                "critical": 95.0    # 95%
-            },
-            "cache_hit_rate": {
-                "warning": 70.0,    # Below 70%
-                "critical": 50.0    # Below 50%
-            },
-            "database_response": {
-                "warning": 500,     # 500ms
-                "critical": 2000    # 2 seconds
-            }
-        }
+    def _activate(self, alert: Alert):
+        self.active_alerts[alert.id] = alert
+        self._active_by_level[alert.level.value] += 1
+        self._active_by_service[alert.service] += 1
+        self._fired_by_level[alert.level.value] += 1
     
-    def check_alerts(self, health_data: Dict[str, Any], metrics_data: Dict[str, Any]) -> List[Alert]:
-        """Check for alert conditions and generate alerts"""
-        new_alerts = []
-        current_time = time.time()
-        
-        # Check health-based alerts
-        for service_name, service_data in health_data.get("services", {}).items():
-            status = service_data.get("status", "unknown")
-            response_time = service_data.get("response_time_ms", 0)
-            
-            # Critical health status alert
-            if status == "critical":
-                alert_id = f"health_{service_name}_critical"
-                if alert_id not in self.active_alerts:
-                    alert = Alert(
-                        id=alert_id,
-                        level=AlertLevel.CRITICAL,
-                        title=f"{service_name.title()} Service Critical",
-                        description=service_data.get("message", "Service is in critical state"),
-                        service=service_name,
-                        metric_value=None
-                    )
-                    self.active_alerts[alert_id] = alert
-                    new_alerts.append(alert)
-            
-            # Response time alerts
-            if service_name in ["database", "redis"] and response_time > 0:
-                metric_name = f"{service_name}_response"
-                thresholds = self.thresholds.get(metric_name, {})
-                
-                if response_time > thresholds.get("critical", float('inf')):
-                    alert_id = f"response_{service_name}_critical"
-                    if alert_id not in self.active_alerts:
-                        alert = Alert(
-                            id=alert_id,
-                            level=AlertLevel.CRITICAL,
-                            title=f"{service_name.title()} Response Time Critical",
-                            description=f"Response time is {response_time:.0f}ms",
-                            service=service_name,
-                            metric_value=response_time,
-                            threshold=thresholds["critical"]
-                        )
-                        self.active_alerts[alert_id] = alert
-                        new_alerts.append(alert)
-                
-                elif response_time > thresholds.get("warning", float('inf')):
-                    alert_id = f"response_{service_name}_warning"
-                    if alert_id not in self.active_alerts:
-                        alert = Alert(
-                            id=alert_id,
-                            level=AlertLevel.WARNING,
-                            title=f"{service_name.title()} Response Time Elevated",
-                            description=f"Response time is {response_time:.0f}ms",
-                            service=service_name,
-                            metric_value=response_time,
-                            threshold=thresholds["warning"]
-                        )
-                        self.active_alerts[alert_id] = alert
-                        new_alerts.append(alert)
-        
-        # Check system resource alerts
-        system_service = health_data.get("services", {}).get("system", {})
-        system_details = system_service.get("details", {})
-        
-        for resource in ["cpu_percent", "memory_percent", "disk_percent"]:
-            if resource in system_details:
-                value = system_details[resource]
-                metric_name = resource.replace("_percent", "_usage")
-                thresholds = self.thresholds.get(metric_name, {})
-                
-                if value > thresholds.get("critical", 100):
-                    alert_id = f"system_{resource}_critical"
-                    if alert_id not in self.active_alerts:
-                        alert = Alert(
-                            id=alert_id,
-                            level=AlertLevel.CRITICAL,
-                            title=f"High {resource.replace('_', ' ').title()}",
-                            description=f"{resource.replace('_', ' ').title()} is at {value:.1f}%",
-                            service="system",
-                            metric_value=value,
-                            threshold=thresholds["critical"]
-                        )
-                        self.active_alerts[alert_id] = alert
-                        new_alerts.append(alert)
-                
-                elif value > thresholds.get("warning", 100):
-                    alert_id = f"system_{resource}_warning"
-                    if alert_id not in self.active_alerts:
-                        alert = Alert(
-                            id=alert_id,
-                            level=AlertLevel.WARNING,
-                            title=f"Elevated {resource.replace('_', ' ').title()}",
-                            description=f"{resource.replace('_', ' ').title()} is at {value:.1f}%",
-                            service="system",
-                            metric_value=value,
-                            threshold=thresholds["warning"]
-                        )
-                        self.active_alerts[alert_id] = alert
-                        new_alerts.append(alert)
-        
-        # Check application metrics alerts
-        request_metrics = metrics_data.get("request_metrics", {})
-        
-        # Error rate alerts
-        for endpoint, error_rate in request_metrics.get("error_rates", {}).items():
-            thresholds = self.thresholds.get("error_rate", {})
-            
-            if error_rate > thresholds.get("critical", 100):
-                alert_id = f"error_rate_{endpoint}_critical"
-                if alert_id not in self.active_alerts:
-                    alert = Alert(
-                        id=alert_id,
-                        level=AlertLevel.CRITICAL,
-                        title=f"High Error Rate on {endpoint}",
-                        description=f"Error rate is {error_rate:.1f}%",
-                        service="application",
-                        metric_value=error_rate,
-                        threshold=thresholds["critical"]
-                    )
-                    self.active_alerts[alert_id] = alert
-                    new_alerts.append(alert)
-            
-            elif error_rate > thresholds.get("warning", 100):
-                alert_id = f"error_rate_{endpoint}_warning"
-                if alert_id not in self.active_alerts:
-                    alert = Alert(
-                        id=alert_id,
-                        level=AlertLevel.WARNING,
-                        title=f"Elevated Error Rate on {endpoint}",
-                        description=f"Error rate is {error_rate:.1f}%",
-                        service="application",
-                        metric_value=error_rate,
-                        threshold=thresholds["warning"]
-                    )
-                    self.active_alerts[alert_id] = alert
-                    new_alerts.append(alert)
-        
-        # Cache hit rate alerts
-        cache_metrics = metrics_data.get("cache_metrics", {})
-        hit_rate = cache_metrics.get("hit_rate", 100)
-        
-        if hit_rate < self.thresholds["cache_hit_rate"]["critical"]:
-            alert_id = "cache_hit_rate_critical"
-            if alert_id not in self.active_alerts:
-                alert = Alert(
-                    id=alert_id,
-                    level=AlertLevel.CRITICAL,
-                    title="Low Cache Hit Rate",
-                    description=f"Cache hit rate is {hit_rate:.1f}%",
-                    service="cache",
-                    metric_value=hit_rate,
-                    threshold=self.thresholds["cache_hit_rate"]["critical"]
-                )
-                self.active_alerts[alert_id] = alert
-                new_alerts.append(alert)
-        
-        elif hit_rate < self.thresholds["cache_hit_rate"]["warning"]:
-            alert_id = "cache_hit_rate_warning"
-            if alert_id not in self.active_alerts:
-                alert = Alert(
-                    id=alert_id,
-                    level=AlertLevel.WARNING,
-                    title="Cache Hit Rate Below Optimal",
-                    description=f"Cache hit rate is {hit_rate:.1f}%",
-                    service="cache",
-                    metric_value=hit_rate,
-                    threshold=self.thresholds["cache_hit_rate"]["warning"]
-                )
-                self.active_alerts[alert_id] = alert
-                new_alerts.append(alert)
-        
-        # Auto-resolve alerts that are no longer valid
-        self._auto_resolve_alerts(health_data, metrics_data)
-        
-        # Add to history
-        for alert in new_alerts:
-            self.alert_history.append(alert)
-        
-        # Limit history size
-        if len(self.alert_history) > self.max_history_size:
-            self.alert_history = self.alert_history[-self.max_history_size:]
-        
-        return new_alerts
+    def _resolve(self, alert_id: str):
+        alert = self.active_alerts.pop(alert_id, None)
+        if alert is None:
+            return
+        alert.resolved = True
+        self._active_by_level[alert.level.value] -= 1
+        self._active_by_service[alert.service] -= 1
+        if not self._active_by_service[alert.service]:
+            del self._active_by_service[alert.service]
     
-    def _auto_resolve_alerts(self, health_data: Dict[str, Any], metrics_data: Dict[str, Any]):
-        """Automatically resolve alerts when conditions are no longer met"""
-        to_resolve = []
-        
-        for alert_id, alert in self.active_alerts.items():
-            should_resolve = False
-            
-            # Check if health-based alerts should be resolved
-            if alert_id.startswith("health_"):
-                service_name = alert_id.split("_")[1]
-                service_data = health_data.get("services", {}).get(service_name, {})
-                status = service_data.get("status", "unknown")
-                if status != "critical":
-                    should_resolve = True
-            
-            # Check if response time alerts should be resolved
-            elif alert_id.startswith("response_"):
-                service_name = alert_id.split("_")[1]
-                service_data = health_data.get("services", {}).get(service_name, {})
-                response_time = service_data.get("response_time_ms", 0)
-                
-                if "critical" in alert_id and alert.threshold:
-                    if response_time <= alert.threshold:
-                        should_resolve = True
-                elif "warning" in alert_id and alert.threshold:
-                    if response_time <= alert.threshold:
-                        should_resolve = True
-            
-            # Check if system resource alerts should be resolved
-            elif alert_id.startswith("system_"):
-                parts = alert_id.split("_")
-                resource = f"{parts[1]}_percent"
-                system_details = health_data.get("services", {}).get("system", {}).get("details", {})
-                value = system_details.get(resource, 0)
-                
-                if alert.threshold and value <= alert.threshold:
-                    should_resolve = True
-            
-            # Check if error rate alerts should be resolved
-            elif alert_id.startswith("error_rate_"):
-                endpoint = "_".join(alert_id.split("_")[2:-1])
-                error_rates = metrics_data.get("request_metrics", {}).get("error_rates", {})
-                error_rate = error_rates.get(endpoint, 0)
-                
-                if alert.threshold and error_rate <= alert.threshold:
-                    should_resolve = True
+    def reload_rules(self) -> int:
+        """(Re)load rules from ALERT_RULES_FILE, or the defaults; invalid files keep the current rules"""
+        path = self.rules_config.RULES_FILE
+        rules = load_rules(path)
+        self._rules_mtime = os.path.getmtime(path) if path else None
+        self.rules = rules
+        # Clear alerts whose rule no longer exists
+        names = {rule.name for rule in rules}
+        for key in [key for key in self._states if key[0] not in names]:
+            self._resolve(self._alert_id(key[0], key[1]))
+            del self._states[key]
+        logger.info(f"Loaded {len(rules)} alert rules from {path or 'defaults'}")
+        return len(rules)
+    
+    def _reload_if_changed(self):
+        path = self.rules_config.RULES_FILE
+        if not path:
+            return
+        try:
+            if os.path.getmtime(path) != self._rules_mtime:
+                self.reload_rules()
+        except (OSError, ValueError) as e:
+            logger.error(f"Alert rules reload failed, keeping current rules: {e}")
+    
+    @staticmethod
+    def _alert_id(rule_name: str, labels: Tuple) -> str:
+        return rule_name + "".join(f"|{name}={value}" for name, value in labels)
+    
+    def _build_alert(self, rule: AlertRule, labels: Dict[str, str], severity: str, value: float) -> Alert:
+        fields = {**labels, **{name.capitalize(): str(v).title() for name, v in labels.items()}}
+        
+        def render(template: str) -> str:
+            try:
+                return template.format(rule=rule.name, value=value, **fields)
+            except (KeyError, IndexError, ValueError):
+                return template
+        
+        return Alert(
+            id=self._alert_id(rule.name, tuple(labels.items())),
+            level=AlertLevel(severity),
+            title=render(rule.title),
+            description=render(rule.description),
+            service=render(rule.service),
+            metric_value=round(value, 4),
+            threshold=rule.thresholds[severity],
+            rule=rule.name,
+            labels=labels
+        )
+    
+    def _evaluation_registry(self):
+        """Registry the rules run against - merged across workers when multi-process mode is on"""
+        if self.store is None or not self.store.enabled:
+            return self.registry
+        return self.store.aggregate("metrics").registry
+    
+    def evaluate(self, now: Optional[float] = None, registry=None) -> List[Alert]:
+        """Evaluate every rule once; returns alerts fired (or re-levelled) by this pass"""
+        now = time.time() if now is None else now
+        self._reload_if_changed()
+        if registry is None:
+            registry = self._evaluation_registry()
+        fired: List[Alert] = []
+        started = time.perf_counter()
+        total_series = 0
+        
+        for rule in self.rules:
+            rule_started = time.perf_counter()
+            try:
+                values = evaluate_rule(rule, registry, self._sampler, now)
+            except Exception as e:
+                logger.error(f"Alert rule {rule.name} failed: {e}")
+                continue
             
-            # Check if cache hit rate alerts should be resolved
-            elif alert_id.startswith("cache_hit_rate_"):
-                hit_rate = metrics_data.get("cache_metrics", {}).get("hit_rate", 100)
-                if alert.threshold and hit_rate >= alert.threshold:
-                    should_resolve = True
+            series_keys = set(values) | {key[1] for key in self._states if key[0] == rule.name}
+            for labels in series_keys:
+                key = (rule.name, labels)
+                state = self._states.get(key)
+                if state is None:
+                    state = self._states[key] = RuleState()
+                value = values.get(labels)
+                severity = state.step(rule, value, now)
+                if severity != state.severity:
+                    alert_id = self._alert_id(rule.name, labels)
+                    self._resolve(alert_id)
+                    if severity is not None:
+                        alert = self._build_alert(rule, dict(labels), severity, value)
+                        self._activate(alert)
+                        self.alert_history.append(alert)
+                        fired.append(alert)
+                    state.severity = severity
+                elif severity is not None and value is not None:
+                    self.active_alerts[self._alert_id(rule.name, labels)].metric_value = round(value, 4)
+                if state.severity is None and not state.since:
+                    del self._states[key]
             
-            if should_resolve:
-                to_resolve.append(alert_id)
-        
-        # Mark alerts as resolved
-        for alert_id in to_resolve:
-            if alert_id in self.active_alerts:
-                self.active_alerts[alert_id].resolved = True
-                del self.active_alerts[alert_id]
+            duration = time.perf_counter() - rule_started
+            self._evaluation_seconds.observe(duration, (rule.name,))
+            self._rule_stats[rule.name] = {
+                "series": len(values),
+                "last_duration_ms": round(duration * 1000, 3),
+                "active": sum(1 for (name, _), state in self._states.items() if name == rule.name and state.severity)
+            }
+            total_series += len(values)
+        
+        self._sampler.prune(now, max((rule.window_seconds for rule in self.rules), default=0) * 2)
+        self.last_fired = fired
+        self.last_evaluation = {
+            "timestamp": now,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "rules": len(self.rules),
+            "series": total_series,
+            "fired": len(fired)
+        }
+        return fired
+    
+    def get_rules(self) -> Dict[str, Any]:
+        """Loaded rules with per-rule evaluation stats"""
+        return {
+            "source": self.rules_config.RULES_FILE or "defaults",
+            "interval_seconds": self.rules_config.EVAL_INTERVAL_SECONDS,
+            "last_evaluation": self.last_evaluation,
+            "rules": [
+                {**rule.to_dict(), "stats": self._rule_stats.get(rule.name, {})} for rule in self.rules
+            ]
+        }
+    
+    async def evaluate_async(self, now: Optional[float] = None) -> List[Alert]:
+        """Evaluate every rule once, merging the workers' snapshots in the monitoring lane.
+        
+        Reading and merging the snapshot files is blocking work, so only the
+        rule evaluation itself runs on the event loop.
+        """
+        registry = self.registry
+        if self.store is not None and self.store.enabled:
+            registry = await monitoring_lane.run(self._evaluation_registry)
+        return self.evaluate(now, registry)
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+    
+    async def start(self):
+        """Evaluate rules every ALERT_EVAL_INTERVAL seconds in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def _run(self):
+        while True:
+            try:
+                await self.evaluate_async()
+            except Exception as e:
+                logger.error(f"Alert evaluation failed: {e}")
+            await asyncio.sleep(self.rules_config.EVAL_INTERVAL_SECONDS)
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
     
     def get_active_alerts(self) -> List[Alert]:
         """Get all active alerts"""
@@ -333,27 +279,14 @@ class AlertManager:
     
     def get_alert_summary(self) -> Dict[str, Any]:
         """Get alert summary statistics"""
-        active_alerts = self.get_active_alerts()
-        
-        summary = {
-            "total_active": len(active_alerts),
-            "by_level": {
-                "info": 0,
-                "warning": 0,
-                "critical": 0,
-                "emergency": 0
-            },
-            "by_service": {},
-            "recent_alerts": len([a for a in self.alert_history[-20:] if not a.resolved])
+        recent = islice(reversed(self.alert_history), self.config.RECENT_ALERTS)
+        return {
+            "total_active": len(self.active_alerts),
+            "by_level": {level.value: self._active_by_level[level.value] for level in AlertLevel},
+            "by_service": dict(self._active_by_service),
+            "fired_by_level": {level.value: self._fired_by_level[level.value] for level in AlertLevel},
+            "recent_alerts": sum(1 for alert in recent if not alert.resolved)
         }
-        
-        for alert in active_alerts:
-            summary["by_level"][alert.level.value] += 1
-            if alert.service not in summary["by_service"]:
-                summary["by_service"][alert.service] = 0
-            summary["by_service"][alert.service] += 1
-        
-        return summary
 
 class MonitoringDashboard:
     """Main monitoring dashboard"""
@@ -375,10 +308,13 @@ class MonitoringDashboard:
         try:
             # Gather all monitoring data
             health_data = await health_monitor.get_comprehensive_health()
-            metrics_data = metrics_collector.get_performance_metrics()
+            # Cross-worker merges and percentile queries run in the monitoring lane, off the event loop
+            metrics_data, slo_status = await monitoring_lane.run(self._collect_metrics)
             
-            # Check for alerts
-            new_alerts = self.alert_manager.check_alerts(health_data, metrics_data)
+            # Rules are evaluated in the background; evaluate inline only if that is not running
+            if not self.alert_manager.running:
+                self.alert_manager.evaluate()
+            new_alerts = self.alert_manager.last_fired
             active_alerts = self.alert_manager.get_active_alerts()
             alert_summary = self.alert_manager.get_alert_summary()
             
@@ -395,6 +331,8 @@ class MonitoringDashboard:
                     "trends": health_monitor.get_health_trends()
                 },
                 "performance_metrics": metrics_data,
+                "event_loop": loop_monitor.get_stats(),
+                "slo": slo_status,
                 "alerts": {
                     "active": [self._alert_to_dict(alert) for alert in active_alerts],
                     "new": [self._alert_to_dict(alert) for alert in new_alerts],
@@ -410,6 +348,8 @@ class MonitoringDashboard:
             
             return dashboard_data
             
+        except MonitoringLaneBusyError:
+            raise
         except Exception as e:
             logger.error(f"Failed to generate dashboard data: {str(e)}")
             return {
@@ -418,6 +358,11 @@ class MonitoringDashboard:
                 "status": "error"
             }
     
+    @staticmethod
+    def _collect_metrics() -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Performance metrics and SLO status (blocking; runs in the monitoring lane)"""
+        return prometheus_exporter.collector().get_performance_metrics(), slo_tracker.refresh()
+    
     def _calculate_health_score(self, health_data: Dict[str, Any], metrics_data: Dict[str, Any], alert_summary: Dict[str, Any]) -> int:
         """Calculate overall system health score (0-100)"""
         score = 100
@@ -472,7 +417,9 @@ class MonitoringDashboard:
             "metric_value": alert.metric_value,
             "threshold": alert.threshold,
             "timestamp": alert.timestamp,
-            "resolved": alert.resolved
+            "resolved": alert.resolved,
+            "rule": alert.rule,
+            "labels": alert.labels
         }
     
     def _generate_quick_stats(self, health_data: Dict[str, Any], metrics_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -526,6 +473,13 @@ class MonitoringDashboard:
         if system_details.get("cpu_percent", 0) > 80:
             recommendations.append("Consider scaling up CPU resources")
         
+        # Check event loop responsiveness
+        loop_stats = loop_monitor.get_stats()
+        if loop_stats["max_lag_ms"] > loop_stats["block_threshold_ms"]:
+            recommendations.append(
+                f"Event loop stalled up to {loop_stats['max_lag_ms']:.0f}ms - move blocking calls off the loop"
+            )
+        
         # Check for critical alerts
         critical_alerts = [a for a in active_alerts if a.level == AlertLevel.CRITICAL]
         if critical_alerts:
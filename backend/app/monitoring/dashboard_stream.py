@@ -0,0 +1,184 @@
+"""
+Dashboard Event Stream for FairPlay NIL
+Computes dashboard snapshots on a fixed cadence and pushes JSON merge-patch deltas over SSE
+"""
+
+import os
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+
+import orjson
+
+from app.monitoring.dashboard import monitoring_dashboard
+
+logger = logging.getLogger(__name__)
+
+class DashboardStreamConfig:
+    """Dashboard stream configuration"""
+
+    INTERVAL_SECONDS = float(os.getenv("DASHBOARD_STREAM_INTERVAL", "5"))
+    KEEPALIVE_SECONDS = float(os.getenv("DASHBOARD_STREAM_KEEPALIVE", "15"))
+    MAX_SUBSCRIBERS = int(os.getenv("DASHBOARD_STREAM_MAX_SUBSCRIBERS", "100"))
+
+    # Events buffered per subscriber; a subscriber that falls further behind is resynced with a snapshot
+    QUEUE_SIZE = 16
+
+    # Client reconnect delay sent in the SSE ``retry`` field
+    RETRY_MS = 5000
+
+def merge_patch(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """RFC 7396 JSON merge patch that turns ``old`` into ``new`` (empty when they are equal).
+
+    Nested objects are diffed key by key; lists and scalars are replaced
+    whole, and removed keys are sent as null.
+    """
+    patch: Dict[str, Any] = {}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            nested = merge_patch(old[key], value)
+            if nested:
+                patch[key] = nested
+        elif value != old[key]:
+            patch[key] = value
+    for key in old:
+        if key not in new:
+            patch[key] = None
+    return patch
+
+def _to_json_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize to plain JSON types so snapshots compare the way clients will see them"""
+    return orjson.loads(orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS))
+
+class DashboardStream:
+    """Fans one background dashboard computation out to any number of SSE subscribers.
+
+    Each tick builds the dashboard once, diffs it against the previous tick and
+    serializes the delta once; subscribers only receive the shared bytes. The
+    task idles while nobody is subscribed.
+    """
+
+    def __init__(self, dashboard=None):
+        self.config = DashboardStreamConfig()
+        self.dashboard = dashboard or monitoring_dashboard
+        self.version = 0
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_message: Optional[Tuple[int, bytes]] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def start(self):
+        """Start the background publisher"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop publishing and end every open stream"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for queue in list(self._subscribers):
+            self._offer(queue, None)
+
+    async def _run(self):
+        while True:
+            if not self._subscribers:
+                self._wake.clear()
+                await self._wake.wait()
+            try:
+                await self.publish()
+            except Exception as e:
+                logger.error(f"Dashboard stream update failed: {str(e)}")
+            await asyncio.sleep(self.config.INTERVAL_SECONDS)
+
+    async def publish(self):
+        """Compute one dashboard snapshot and broadcast it (first time) or its delta"""
+        snapshot = _to_json_data(await self.dashboard.get_dashboard_data(force_refresh=True))
+        if self._snapshot is None:
+            self.version += 1
+            self._snapshot = snapshot
+            message = self.snapshot_message()
+        else:
+            patch = merge_patch(self._snapshot, snapshot)
+            if not patch:
+                return
+            self.version += 1
+            self._snapshot = snapshot
+            message = self._format("delta", patch)
+        for queue in list(self._subscribers):
+            self._offer(queue, message)
+
+    def snapshot_message(self) -> bytes:
+        """Full snapshot event for the current version, serialized at most once per version"""
+        if self._snapshot_message is None or self._snapshot_message[0] != self.version:
+            self._snapshot_message = (self.version, self._format("snapshot", self._snapshot))
+        return self._snapshot_message[1]
+
+    def _format(self, event: str, data: Dict[str, Any]) -> bytes:
+        return b"id: %d\nevent: %s\ndata: %s\n\n" % (self.version, event.encode(), orjson.dumps(data))
+
+    def _offer(self, queue: asyncio.Queue, message: Optional[bytes]):
+        """Queue a message; a full queue is dropped and replaced by a resync snapshot"""
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(self.snapshot_message() if message is not None else None)
+
+    def try_reserve(self) -> Optional[asyncio.Queue]:
+        """Register a subscriber now, or return None when MAX_SUBSCRIBERS are connected.
+
+        The endpoint reserves before returning its response, so concurrent connects
+        cannot all pass the cap while their streams have yet to start.
+        """
+        if len(self._subscribers) >= self.config.MAX_SUBSCRIBERS:
+            return None
+        return self._register()
+
+    def _register(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.config.QUEUE_SIZE)
+        # Queue the snapshot and register in the same step so no event is missed or duplicated
+        if self._snapshot is not None:
+            queue.put_nowait(self.snapshot_message())
+        self._subscribers.add(queue)
+        self._wake.set()
+        return queue
+
+    def release(self, queue: asyncio.Queue):
+        """Free a subscriber slot; safe to call more than once"""
+        self._subscribers.discard(queue)
+
+    async def subscribe(self, queue: Optional[asyncio.Queue] = None) -> AsyncIterator[bytes]:
+        """SSE byte stream: retry hint, current snapshot, then deltas and keepalive comments.
+
+        ``queue`` is a slot from ``try_reserve``; without one the subscriber registers on first read.
+        """
+        if queue is None:
+            queue = self._register()
+        try:
+            yield b"retry: %d\n\n" % self.config.RETRY_MS
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=self.config.KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    message = b": keepalive\n\n"
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.release(queue)
+
+# Global dashboard stream instance
+dashboard_stream = DashboardStream()
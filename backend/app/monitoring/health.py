@@ -8,15 +8,39 @@ import time
 import psutil
 import os
 import logging
-from typing import Dict, List, Any, Optional
+from collections import Counter, deque
+from itertools import islice
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Deque, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
 from dataclasses import dataclass
 from app.cache import get_cache_manager
 from app.database import db
+from app.monitoring.metrics import metrics_collector
 
 logger = logging.getLogger(__name__)
 
+class HealthCheckConfig:
+    """Background health probe configuration"""
+    
+    # Seconds between runs of each probe
+    INTERVALS = {
+        "database": float(os.getenv("HEALTH_DATABASE_INTERVAL", "15")),
+        "redis": float(os.getenv("HEALTH_REDIS_INTERVAL", "15")),
+        "system": float(os.getenv("HEALTH_SYSTEM_INTERVAL", "30")),
+        "application": float(os.getenv("HEALTH_APPLICATION_INTERVAL", "30")),
+    }
+    
+    # Each probe is cut off after this long and reported as critical
+    TIMEOUT_SECONDS = float(os.getenv("HEALTH_CHECK_TIMEOUT", "5"))
+    
+    # Ring buffer capacity for /health/history, and how many of those rounds the trends cover
+    HISTORY_SIZE = int(os.getenv("HEALTH_HISTORY_SIZE", "100"))
+    TREND_WINDOW = int(os.getenv("HEALTH_TREND_WINDOW", "20"))
+    
+    # Smoothing factor for per-service response time EWMAs (higher reacts faster)
+    EWMA_ALPHA = float(os.getenv("HEALTH_EWMA_ALPHA", "0.3"))
+
 class HealthStatus(Enum):
     """Health check status levels"""
     HEALTHY = "healthy"
@@ -163,13 +187,8 @@ class HealthChecker:
         start_time = time.time()
         
         try:
-            # Get system metrics
-            cpu_percent = psutil.cpu_percent(interval=0.1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            
-            # Check network connections
-            connections = len(psutil.net_connections())
+            # psutil sampling blocks (cpu_percent sleeps, net_connections scans sockets) - keep it off the loop
+            cpu_percent, memory, disk, connections = await asyncio.to_thread(self._sample_system_resources)
             
             # Determine health status based on resource usage
             warnings = []
@@ -221,6 +240,15 @@ class HealthChecker:
                 message=f"System resource check failed: {str(e)}"
             )
     
+    @staticmethod
+    def _sample_system_resources() -> Tuple[float, Any, Any, int]:
+        """Blocking psutil reads: CPU over 100ms, memory, disk and socket count"""
+        cpu_percent = psutil.cpu_percent(interval=0.1)
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        connections = len(psutil.net_connections())
+        return cpu_percent, memory, disk, connections
+    
     async def check_application_health(self) -> HealthResult:
         """Check application-specific health metrics"""
         start_time = time.time()
@@ -281,75 +309,255 @@ class HealthChecker:
                 message=f"Application health check failed: {str(e)}"
             )
 
+# Numeric health status for the exported gauges (alert rules compare against these)
+STATUS_VALUES = {
+    HealthStatus.HEALTHY: 0,
+    HealthStatus.DEGRADED: 1,
+    HealthStatus.UNHEALTHY: 2,
+    HealthStatus.CRITICAL: 3,
+}
+
+# System check details exported as gauges
+SYSTEM_GAUGES = ("cpu_percent", "memory_percent", "disk_percent")
+
+class ServiceTrend:
+    """Per-service status counts and response time totals over the trend window, plus a lifetime EWMA"""
+    
+    __slots__ = ("status_counts", "response_time_sum", "samples", "ewma_response_time", "last_status", "total_checks")
+    
+    def __init__(self):
+        self.status_counts: Counter = Counter()
+        self.response_time_sum = 0.0
+        self.samples = 0
+        self.ewma_response_time: Optional[float] = None
+        self.last_status: Optional[str] = None
+        self.total_checks = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "healthy_count": self.status_counts["healthy"],
+            "degraded_count": self.status_counts["degraded"],
+            "unhealthy_count": self.status_counts["unhealthy"],
+            "critical_count": self.status_counts["critical"],
+            "avg_response_time": self.response_time_sum / self.samples if self.samples else 0,
+            "ewma_response_time": round(self.ewma_response_time, 2) if self.ewma_response_time is not None else None,
+            "last_status": self.last_status,
+            "total_checks": self.total_checks
+        }
+
 class SystemHealthMonitor:
-    """Aggregate health monitoring system"""
+    """Aggregate health monitoring system.
+    
+    Once started, a background scheduler runs each probe at its own interval
+    and endpoints read the latest cached results instead of probing inline.
+    """
     
     def __init__(self):
+        self.config = HealthCheckConfig()
         self.health_checker = HealthChecker()
-        self.health_history = []
-        self.max_history_size = 100
-        
-    async def get_comprehensive_health(self) -> Dict[str, Any]:
-        """Get comprehensive health status for all services"""
-        start_time = time.time()
+        # Compact per-round entries; the trend window is the newest TREND_WINDOW of them
+        self.health_history: Deque[Dict[str, Any]] = deque(maxlen=self.config.HISTORY_SIZE)
+        self._trend_window: Deque[Dict[str, Any]] = deque(maxlen=self.config.TREND_WINDOW)
+        self._service_trends: Dict[str, ServiceTrend] = {}
+        self._overall_counts: Counter = Counter()
+        self._checks: Dict[str, Callable[[], Awaitable[HealthResult]]] = {
+            "database": self.health_checker.check_database_connection,
+            "redis": self.health_checker.check_redis_connection,
+            "system": self.health_checker.check_system_resources,
+            "application": self.health_checker.check_application_health,
+        }
+        # check name -> (latest result, time.time() when it completed)
+        self._results: Dict[str, Tuple[HealthResult, float]] = {}
         
-        # Run all health checks in parallel
-        health_tasks = [
-            self.health_checker.check_database_connection(),
-            self.health_checker.check_redis_connection(),
-            self.health_checker.check_system_resources(),
-            self.health_checker.check_application_health()
+        registry = metrics_collector.registry
+        self._status_gauge = registry.gauge(
+            "health_check_status", "Latest health check status (0 healthy, 1 degraded, 2 unhealthy, 3 critical)", ("service",)
+        )
+        self._response_gauge = registry.gauge(
+            "health_check_response_time_ms", "Latest health check response time in milliseconds", ("service",)
+        )
+        self._system_gauges = {
+            name: registry.gauge(f"system_{name}", f"Host {name.replace('_', ' ')} from the system health check")
+            for name in SYSTEM_GAUGES
+        }
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+    
+    async def start(self):
+        """Start the background probe scheduler"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Health probe scheduler started: {self.config.INTERVALS}")
+    
+    async def stop(self):
+        """Stop the background probe scheduler"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self):
+        tick = min(self.config.INTERVALS.values())
+        while True:
+            now = time.time()
+            due = [
+                name for name in self._checks
+                if name not in self._results
+                or now - self._results[name][1] >= self.config.INTERVALS.get(name, tick)
+            ]
+            if due:
+                try:
+                    results = await self.run_checks(due)
+                    # Only the probes that ran this round count towards history and trends
+                    self._record_history(self._build_summary(), [result.service for result in results])
+                except Exception as e:
+                    logger.error(f"Health probe round failed: {str(e)}")
+            await asyncio.sleep(self._seconds_until_next_due(tick))
+    
+    def _seconds_until_next_due(self, default: float) -> float:
+        now = time.time()
+        waits = [
+            self.config.INTERVALS.get(name, default) - (now - completed_at)
+            for name, (_, completed_at) in self._results.items()
         ]
-        
+        return max(0.5, min(waits) if waits else default)
+    
+    async def _run_check(self, name: str) -> HealthResult:
+        start_time = time.time()
         try:
-            health_results = await asyncio.gather(*health_tasks, return_exceptions=True)
-            
-            # Process results
-            services = {}
-            overall_status = HealthStatus.HEALTHY
-            
-            for result in health_results:
-                if isinstance(result, Exception):
-                    # Handle exceptions from health checks
-                    services["unknown"] = {
-                        "status": HealthStatus.CRITICAL.value,
-                        "message": f"Health check failed: {str(result)}",
-                        "response_time_ms": 0
-                    }
-                    overall_status = HealthStatus.CRITICAL
-                else:
-                    services[result.service] = {
-                        "status": result.status.value,
-                        "message": result.message,
-                        "response_time_ms": result.response_time_ms,
-                        "details": result.details,
-                        "timestamp": result.timestamp
-                    }
-                    
-                    # Update overall status (worst case wins)
-                    if result.status == HealthStatus.CRITICAL:
-                        overall_status = HealthStatus.CRITICAL
-                    elif result.status == HealthStatus.UNHEALTHY and overall_status != HealthStatus.CRITICAL:
-                        overall_status = HealthStatus.UNHEALTHY
-                    elif result.status == HealthStatus.DEGRADED and overall_status == HealthStatus.HEALTHY:
-                        overall_status = HealthStatus.DEGRADED
-            
-            total_duration = time.time() - start_time
-            
-            health_summary = {
-                "overall_status": overall_status.value,
-                "services": services,
-                "total_checks": len(health_tasks),
-                "health_check_duration_ms": round(total_duration * 1000, 2),
-                "timestamp": datetime.utcnow().isoformat(),
-                "version": "1.0.0"
+            return await asyncio.wait_for(self._checks[name](), timeout=self.config.TIMEOUT_SECONDS)
+        except Exception as e:
+            message = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e)
+            return HealthResult(
+                service=name,
+                status=HealthStatus.CRITICAL,
+                response_time_ms=(time.time() - start_time) * 1000,
+                message=f"Health check failed: {message}"
+            )
+    
+    async def run_checks(self, names: Optional[List[str]] = None) -> List[HealthResult]:
+        """Run the named probes (all by default) concurrently, cache and return their results"""
+        names = names or list(self._checks)
+        results = await asyncio.gather(*(self._run_check(name) for name in names))
+        completed_at = time.time()
+        for name, result in zip(names, results):
+            self._results[name] = (result, completed_at)
+            self._export_gauges(result)
+        return list(results)
+    
+    def _export_gauges(self, result: HealthResult):
+        """Publish a probe result to the metrics registry"""
+        self._status_gauge.labels(result.service).set(STATUS_VALUES[result.status])
+        self._response_gauge.labels(result.service).set(result.response_time_ms)
+        details = result.details or {}
+        for name, gauge in self._system_gauges.items():
+            if isinstance(details.get(name), (int, float)):
+                gauge.labels().set(details[name])
+    
+    def _build_summary(self) -> Dict[str, Any]:
+        """Combine the cached probe results, worst status wins"""
+        now = time.time()
+        services = {}
+        overall_status = HealthStatus.HEALTHY
+        slowest = 0.0
+        
+        for name, (result, completed_at) in self._results.items():
+            age = now - completed_at
+            services[result.service] = {
+                "status": result.status.value,
+                "message": result.message,
+                "response_time_ms": result.response_time_ms,
+                "details": result.details,
+                "timestamp": result.timestamp,
+                "age_seconds": round(age, 1),
+                "stale": age > 2 * self.config.INTERVALS.get(name, 0) + self.config.TIMEOUT_SECONDS
             }
+            slowest = max(slowest, result.response_time_ms)
             
-            # Store in history
-            self.health_history.append(health_summary)
-            if len(self.health_history) > self.max_history_size:
-                self.health_history.pop(0)
+            # Update overall status (worst case wins)
+            if result.status == HealthStatus.CRITICAL:
+                overall_status = HealthStatus.CRITICAL
+            elif result.status == HealthStatus.UNHEALTHY and overall_status != HealthStatus.CRITICAL:
+                overall_status = HealthStatus.UNHEALTHY
+            elif result.status == HealthStatus.DEGRADED and overall_status == HealthStatus.HEALTHY:
+                overall_status = HealthStatus.DEGRADED
+        
+        return {
+            "overall_status": overall_status.value,
+            "services": services,
+            "total_checks": len(services),
+            "health_check_duration_ms": round(slowest, 2),
+            "cached": self.running,
+            "timestamp": datetime.utcnow().isoformat(),
+            "version": "1.0.0"
+        }
+    
+    def _record_history(self, health_summary: Dict[str, Any], services: Optional[List[str]] = None):
+        """Append a compact entry and update the trend counters incrementally.
+        
+        ``services`` limits the entry to the probes that actually ran, so a
+        cached result is not counted again every round.
+        """
+        entry = {
+            "timestamp": health_summary["timestamp"],
+            "overall_status": health_summary["overall_status"],
+            "services": {
+                name: {"status": data["status"], "response_time_ms": data["response_time_ms"]}
+                for name, data in health_summary["services"].items()
+                if services is None or name in services
+            }
+        }
+        if len(self._trend_window) == self._trend_window.maxlen:
+            self._apply_to_trends(self._trend_window[0], -1)
+        self._trend_window.append(entry)
+        self._apply_to_trends(entry, 1)
+        self.health_history.append(entry)
+        
+        alpha = self.config.EWMA_ALPHA
+        for name, data in entry["services"].items():
+            trend = self._service_trends[name]
+            response_time = data["response_time_ms"]
+            if trend.ewma_response_time is None:
+                trend.ewma_response_time = response_time
+            else:
+                trend.ewma_response_time += alpha * (response_time - trend.ewma_response_time)
+            trend.last_status = data["status"]
+            trend.total_checks += 1
+    
+    def _apply_to_trends(self, entry: Dict[str, Any], sign: int):
+        """Add (sign=1) or remove (sign=-1) one entry's contribution to the window counters"""
+        self._overall_counts[entry["overall_status"]] += sign
+        for name, data in entry["services"].items():
+            trend = self._service_trends.get(name)
+            if trend is None:
+                trend = self._service_trends[name] = ServiceTrend()
+            trend.status_counts[data["status"]] += sign
+            trend.response_time_sum += sign * data["response_time_ms"]
+            trend.samples += sign
+    
+    async def get_comprehensive_health(self) -> Dict[str, Any]:
+        """Get comprehensive health status for all services.
+        
+        With the scheduler running this returns the cached results (probing
+        inline only for checks that have not completed yet); otherwise all
+        checks run inline as a one-off.
+        """
+        try:
+            if self.running:
+                missing = [name for name in self._checks if name not in self._results]
+                if missing:
+                    await self.run_checks(missing)
+                return self._build_summary()
             
+            await self.run_checks()
+            health_summary = self._build_summary()
+            self._record_history(health_summary)
             return health_summary
             
         except Exception as e:
@@ -363,57 +571,25 @@ class SystemHealthMonitor:
     
     def get_health_history(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent health check history"""
-        return self.health_history[-limit:] if self.health_history else []
+        return list(islice(reversed(self.health_history), limit))[::-1]
     
     def get_health_trends(self) -> Dict[str, Any]:
-        """Analyze health trends over time"""
-        if not self.health_history:
+        """Analyze health trends over the last TREND_WINDOW rounds from the running counters"""
+        if not self._trend_window:
             return {"message": "No health history available"}
         
-        # Analyze trends from recent history
-        recent_checks = self.health_history[-20:]  # Last 20 checks
-        
-        service_trends = {}
-        for check in recent_checks:
-            for service_name, service_data in check.get("services", {}).items():
-                if service_name not in service_trends:
-                    service_trends[service_name] = {
-                        "healthy_count": 0,
-                        "degraded_count": 0,
-                        "unhealthy_count": 0,
-                        "critical_count": 0,
-                        "avg_response_time": 0,
-                        "response_times": []
-                    }
-                
-                status = service_data.get("status", "unknown")
-                if status == "healthy":
-                    service_trends[service_name]["healthy_count"] += 1
-                elif status == "degraded":
-                    service_trends[service_name]["degraded_count"] += 1
-                elif status == "unhealthy":
-                    service_trends[service_name]["unhealthy_count"] += 1
-                elif status == "critical":
-                    service_trends[service_name]["critical_count"] += 1
-                
-                response_time = service_data.get("response_time_ms", 0)
-                service_trends[service_name]["response_times"].append(response_time)
-        
-        # Calculate averages
-        for service_name, trends in service_trends.items():
-            if trends["response_times"]:
-                trends["avg_response_time"] = sum(trends["response_times"]) / len(trends["response_times"])
-            del trends["response_times"]  # Remove raw data
-        
+        window_size = len(self._trend_window)
         return {
-            "analysis_period": f"Last {len(recent_checks)} checks",
-            "service_trends": service_trends,
+            "analysis_period": f"Last {window_size} checks",
+            "service_trends": {
+                name: trend.to_dict() for name, trend in self._service_trends.items() if trend.samples
+            },
             "overall_reliability": {
-                "total_checks": len(recent_checks),
-                "healthy_checks": sum(1 for check in recent_checks if check.get("overall_status") == "healthy"),
-                "degraded_checks": sum(1 for check in recent_checks if check.get("overall_status") == "degraded"),
-                "unhealthy_checks": sum(1 for check in recent_checks if check.get("overall_status") == "unhealthy"),
-                "critical_checks": sum(1 for check in recent_checks if check.get("overall_status") == "critical")
+                "total_checks": window_size,
+                "healthy_checks": self._overall_counts["healthy"],
+                "degraded_checks": self._overall_counts["degraded"],
+                "unhealthy_checks": self._overall_counts["unhealthy"],
+                "critical_checks": self._overall_counts["critical"]
             }
         }
 
@@ -0,0 +1,133 @@
+"""
+Fixed-bucket Histograms for FairPlay NIL
+Constant-memory latency distributions exported as Prometheus _bucket/_sum/_count series
+"""
+
+import os
+import threading
+import logging
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+def _parse_buckets(raw: str) -> Tuple[float, ...]:
+    return tuple(sorted(float(b) for b in raw.split(",") if b.strip()))
+
+class HistogramConfig:
+    """Histogram bucket configuration (upper bounds in seconds)"""
+
+    DEFAULT_BUCKETS = _parse_buckets(os.getenv(
+        "METRICS_HISTOGRAM_BUCKETS",
+        "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10"
+    ))
+
+def escape_label_value(value: Any) -> str:
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(label_names: Sequence[str], label_values: Sequence[Any], extra: str = "") -> str:
+    """Format a Prometheus label set, e.g. {endpoint="/api/deals",le="0.1"}"""
+    pairs = [f'{name}="{escape_label_value(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+class HistogramChild:
+    """Histogram bound to one label set"""
+
+    __slots__ = ("_histogram", "_label_values")
+
+    def __init__(self, histogram: "Histogram", label_values: Tuple[str, ...]):
+        self._histogram = histogram
+        self._label_values = label_values
+
+    def observe(self, value: float):
+        self._histogram.observe(value, self._label_values)
+
+class Histogram:
+    """Histogram with one fixed bucket array, running sum and count per label set.
+
+    Memory is proportional to the number of label sets times the number of
+    buckets, independent of how many observations are recorded.
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, label_names: Sequence[str], description: str = "",
+                 buckets: Optional[Sequence[float]] = None):
+        self.name = name
+        self.label_names = tuple(label_names)
+        self.description = description
+        self.buckets = tuple(sorted(buckets or HistogramConfig.DEFAULT_BUCKETS))
+        # label values -> [per-bucket counts (last slot is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def _new_series(self) -> List[Any]:
+        return [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+    def labels(self, *label_values: Any) -> HistogramChild:
+        """Get a handle bound to one label set"""
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {label_values}")
+        return HistogramChild(self, tuple(str(v) for v in label_values))
+
+    def observe(self, value: float, label_values: Sequence[Any] = ()):
+        """Record one observation"""
+        key = tuple(str(v) for v in label_values)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = self._new_series()
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def series(self) -> Dict[Tuple[str, ...], Tuple[List[int], float, int]]:
+        """Copy of every label set's (bucket counts, sum, count)"""
+        with self._lock:
+            return {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable state for cross-worker aggregation"""
+        return {
+            "buckets": list(self.buckets),
+            "series": [[list(key), counts, total, count] for key, (counts, total, count) in self.series().items()],
+        }
+
+    def merge_snapshot(self, snapshot: Dict[str, Any]):
+        """Add another histogram's snapshot into this one (bucket layouts must match)"""
+        if tuple(snapshot.get("buckets", ())) != self.buckets:
+            logger.warning(f"Skipping {self.name} snapshot with mismatched buckets")
+            return
+        with self._lock:
+            for key, counts, total, count in snapshot.get("series", []):
+                series = self._series.get(tuple(key))
+                if series is None:
+                    series = self._series[tuple(key)] = self._new_series()
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+                series[2] += count
+
+    def to_prometheus(self) -> List[str]:
+        """Render as Prometheus text format lines with cumulative buckets"""
+        lines = [
+            f"# HELP {self.name} {self.description or self.name}",
+            f"# TYPE {self.name} histogram",
+        ]
+        bounds = list(self.buckets) + [float("inf")]
+        for key, (counts, total, count) in sorted(self.series().items()):
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_bound(bound)}"'
+                lines.append(f"{self.name}_bucket{format_labels(self.label_names, key, le)} {cumulative}")
+            labels = format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
@@ -0,0 +1,171 @@
+"""
+Monitoring Lane for FairPlay NIL
+Runs heavy monitoring aggregations on a dedicated, capped thread pool (and optionally a separate port)
+so scrapes and dashboards do not hold the event loop that serves user requests
+"""
+
+import os
+import time
+import asyncio
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+from app.monitoring.metrics import metrics_collector, prometheus_exporter
+
+logger = logging.getLogger(__name__)
+
+class MonitoringLaneConfig:
+    """Monitoring lane configuration"""
+
+    # Threads running monitoring work; one keeps GIL contention with the event loop low
+    THREADS = int(os.getenv("MONITORING_LANE_THREADS", "1"))
+
+    # Monitoring calls running or waiting in the lane; more are rejected with 503
+    MAX_PENDING = int(os.getenv("MONITORING_LANE_MAX_PENDING", "4"))
+
+    # Optional port serving /metrics/prometheus from its own thread, off the event loop entirely
+    PORT = int(os.getenv("MONITORING_PORT", "0") or 0)
+    HOST = os.getenv("MONITORING_HOST", "0.0.0.0")
+
+class MonitoringLaneBusyError(HTTPException):
+    """Too many monitoring calls already queued in the lane"""
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            status_code=503,
+            detail="Monitoring lane is busy, retry shortly",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+class MonitoringLane:
+    """A small thread pool reserved for monitoring work, with a cap on pending calls.
+
+    User requests keep the event loop; an aggregation running here only
+    competes for the GIL, which the loop gets back every switch interval,
+    instead of blocking the loop for the whole computation. Calls beyond
+    MAX_PENDING fail fast rather than piling up behind a slow scrape.
+    """
+
+    def __init__(self, threads: Optional[int] = None, max_pending: Optional[int] = None):
+        self.config = MonitoringLaneConfig()
+        self.threads = threads or self.config.THREADS
+        self.max_pending = max_pending or self.config.MAX_PENDING
+        self.pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self._pending_gauge = metrics_collector.registry.gauge(
+            "monitoring_lane_pending", "Monitoring calls running or queued in the monitoring lane"
+        ).labels()
+        self._rejected = metrics_collector.registry.counter(
+            "monitoring_lane_rejected_total", "Monitoring calls rejected because the lane was full"
+        ).labels()
+        self._duration = metrics_collector.registry.histogram(
+            "monitoring_lane_duration_seconds", "Time monitoring calls spent in the lane, queueing included"
+        ).labels()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="monitoring-lane")
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking monitoring function in the lane; raises MonitoringLaneBusyError when full"""
+        if self.pending >= self.max_pending:
+            self._rejected.inc()
+            raise MonitoringLaneBusyError()
+        self.pending += 1
+        self._pending_gauge.set(self.pending)
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), partial(func, *args, **kwargs))
+        finally:
+            self.pending -= 1
+            self._pending_gauge.set(self.pending)
+            self._duration.observe(time.perf_counter() - start)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "threads": self.threads,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "rejected_total": int(self._rejected.get()),
+            "port": monitoring_server.port,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+class _MonitoringRequestHandler(BaseHTTPRequestHandler):
+    """Serves Prometheus scrapes and liveness without going through the ASGI app"""
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path in ("/metrics", "/metrics/prometheus"):
+            body = prometheus_exporter.generate_prometheus_metrics().encode("utf-8")
+            content_type = "text/plain; charset=utf-8"
+            status = 200
+        elif path == "/health/live":
+            body = b'{"status":"alive"}'
+            content_type = "application/json"
+            status = 200
+        else:
+            body = b'{"detail":"Not Found"}'
+            content_type = "application/json"
+            status = 404
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Monitoring port: {format % args}")
+
+class MonitoringServer:
+    """Optional HTTP listener on MONITORING_PORT, served one request at a time by its own thread"""
+
+    def __init__(self):
+        self.config = MonitoringLaneConfig()
+        self._server: Optional[HTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> Optional[int]:
+        return self._server.server_address[1] if self._server else None
+
+    def start(self, port: Optional[int] = None) -> bool:
+        """Start listening (no-op unless MONITORING_PORT or ``port`` is given).
+
+        With several workers only the first to bind serves the port.
+        """
+        port = (self.config.PORT or None) if port is None else port
+        if port is None or self._server is not None:
+            return False
+        try:
+            self._server = HTTPServer((self.config.HOST, port), _MonitoringRequestHandler)
+        except OSError as e:
+            logger.warning(f"Monitoring port {port} not started: {e}")
+            return False
+        self._thread = threading.Thread(target=self._server.serve_forever, name="monitoring-port", daemon=True)
+        self._thread.start()
+        logger.info(f"Monitoring port listening on {self.config.HOST}:{self.port}")
+        return True
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+
+# Global monitoring lane and optional monitoring port
+monitoring_lane = MonitoringLane()
+monitoring_server = MonitoringServer()
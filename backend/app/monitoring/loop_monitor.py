@@ -0,0 +1,160 @@
+"""
+Event Loop Lag Monitor for FairPlay NIL
+Samples scheduled-vs-actual wakeup delay and, in debug mode, captures the stack holding the loop
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+import traceback
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from app.monitoring.metrics import metrics_collector
+
+logger = logging.getLogger(__name__)
+
+class LoopMonitorConfig:
+    """Event loop monitor configuration"""
+
+    ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+    INTERVAL_SECONDS = float(os.getenv("LOOP_MONITOR_INTERVAL", "0.5"))
+
+    # Debug mode runs a watchdog thread that captures the loop thread's stack
+    DEBUG = os.getenv("LOOP_MONITOR_DEBUG", "false").lower() == "true"
+    BLOCK_THRESHOLD_SECONDS = float(os.getenv("LOOP_BLOCK_THRESHOLD", "0.1"))
+
+    MAX_CAPTURED_BLOCKS = 20
+    MAX_STACK_FRAMES = 30
+    RECENT_SAMPLES = 120
+
+    LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+class EventLoopMonitor:
+    """Background sampler for event loop lag with optional blocking-call capture"""
+
+    def __init__(self, interval: Optional[float] = None, debug: Optional[bool] = None,
+                 block_threshold: Optional[float] = None):
+        self.config = LoopMonitorConfig()
+        self.interval = interval or self.config.INTERVAL_SECONDS
+        self.debug = self.config.DEBUG if debug is None else debug
+        self.block_threshold = block_threshold or self.config.BLOCK_THRESHOLD_SECONDS
+
+        self._lag_histogram = metrics_collector.registry.histogram(
+            "event_loop_lag_seconds", "Delay between scheduled and actual event loop wakeups",
+            buckets=self.config.LAG_BUCKETS
+        ).labels()
+        self._blocked_total = metrics_collector.registry.counter(
+            "event_loop_blocked_total", "Event loop stalls longer than the block threshold"
+        ).labels()
+
+        self._recent_lags: Deque[float] = deque(maxlen=self.config.RECENT_SAMPLES)
+        self._blocks: Deque[Dict[str, Any]] = deque(maxlen=self.config.MAX_CAPTURED_BLOCKS)
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._captured_heartbeat: Optional[float] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        """Start sampling on the running loop (and the watchdog thread in debug mode)"""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run())
+        if self.debug:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+        logger.info(f"Event loop monitor started (interval={self.interval}s, debug={self.debug})")
+
+    async def stop(self):
+        """Stop sampling and the watchdog"""
+        self._stopping.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record_lag(max(0.0, loop.time() - scheduled))
+            self._heartbeat = time.monotonic()
+
+    def record_lag(self, lag: float):
+        """Record one wakeup delay sample"""
+        self._lag_histogram.observe(lag)
+        self._recent_lags.append(lag)
+        if lag > self.block_threshold:
+            self._blocked_total.inc()
+
+    def _watch(self):
+        """Watchdog thread: capture the loop thread's stack when the sampler misses its wakeup"""
+        poll = max(0.01, self.block_threshold / 2)
+        while not self._stopping.wait(poll):
+            heartbeat = self._heartbeat
+            stalled_for = time.monotonic() - heartbeat - self.interval
+            if stalled_for > self.block_threshold and self._captured_heartbeat != heartbeat:
+                self._captured_heartbeat = heartbeat
+                self.capture_block(stalled_for)
+
+    def capture_block(self, stalled_for: float):
+        """Record the stack of whatever is currently running on the loop thread"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = traceback.format_stack(frame)[-self.config.MAX_STACK_FRAMES:]
+        task = asyncio.current_task(self._loop) if self._loop is not None else None
+        block = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "stalled_ms": round(stalled_for * 1000, 2),
+            "task": task.get_name() if task else None,
+            "coroutine": repr(task.get_coro()) if task else None,
+            "stack": [line.rstrip() for line in stack],
+        }
+        self._blocks.append(block)
+        logger.warning(
+            f"Event loop blocked for {block['stalled_ms']}ms in {block['task'] or 'callback'}: "
+            f"{stack[-1].strip() if stack else ''}"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Recent lag summary and captured blocking stacks"""
+        lags = list(self._recent_lags)
+        blocks: List[Dict[str, Any]] = list(self._blocks)
+        return {
+            "running": self.running,
+            "debug": self.debug,
+            "interval_ms": round(self.interval * 1000, 2),
+            "block_threshold_ms": round(self.block_threshold * 1000, 2),
+            "recent_samples": len(lags),
+            "last_lag_ms": round(lags[-1] * 1000, 2) if lags else 0.0,
+            "avg_lag_ms": round(sum(lags) / len(lags) * 1000, 2) if lags else 0.0,
+            "max_lag_ms": round(max(lags) * 1000, 2) if lags else 0.0,
+            "blocked_total": int(self._blocked_total.get()),
+            "recent_blocks": blocks,
+        }
+
+# Global event loop monitor instance
+loop_monitor = EventLoopMonitor()
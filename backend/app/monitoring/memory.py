@@ -0,0 +1,176 @@
+"""
+Memory Profiling for FairPlay NIL
+tracemalloc snapshot diffs on demand plus continuously exported RSS/heap gauges
+"""
+
+import os
+import sys
+import asyncio
+import tracemalloc
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+from app.monitoring.metrics import metrics_collector
+
+logger = logging.getLogger(__name__)
+
+class MemoryProfilerConfig:
+    """Memory profiling configuration"""
+
+    GAUGE_INTERVAL_SECONDS = float(os.getenv("MEMORY_GAUGE_INTERVAL", "15"))
+    DEFAULT_TRACE_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", "1"))
+    MAX_SNAPSHOTS = 10
+    MAX_TOP = 100
+
+class SnapshotNotFoundError(Exception):
+    """Raised when a named snapshot does not exist"""
+
+class TracingNotStartedError(Exception):
+    """Raised when a snapshot is requested while tracemalloc is off"""
+
+class MemoryProfiler:
+    """Named tracemalloc snapshots with top-N diffs, and RSS/heap gauges"""
+
+    # Allocations made by the profiler machinery itself are noise in the diffs
+    _snapshot_filters = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    )
+
+    def __init__(self):
+        self.config = MemoryProfilerConfig()
+        self._snapshots: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._process = psutil.Process()
+        self._task: Optional[asyncio.Task] = None
+
+        pid_label = ("pid",)
+        self._rss = metrics_collector.registry.gauge(
+            "process_resident_memory_bytes", "Resident set size in bytes", pid_label
+        ).labels(os.getpid())
+        self._vms = metrics_collector.registry.gauge(
+            "process_virtual_memory_bytes", "Virtual memory size in bytes", pid_label
+        ).labels(os.getpid())
+        self._blocks = metrics_collector.registry.gauge(
+            "python_allocated_blocks", "Memory blocks currently allocated by the Python allocator", pid_label
+        ).labels(os.getpid())
+        self._traced = metrics_collector.registry.gauge(
+            "python_tracemalloc_traced_bytes", "Bytes currently traced by tracemalloc (0 when off)", pid_label
+        ).labels(os.getpid())
+
+    # --- tracemalloc control ---
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start_tracing(self, frames: Optional[int] = None):
+        """Start tracemalloc (more frames give better attribution but cost more memory)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames or self.config.DEFAULT_TRACE_FRAMES)
+            logger.info(f"tracemalloc started with {tracemalloc.get_traceback_limit()} frame(s)")
+
+    def stop_tracing(self):
+        """Stop tracemalloc and drop stored snapshots"""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("tracemalloc stopped")
+        self._snapshots.clear()
+
+    def take_snapshot(self, name: str) -> Dict[str, Any]:
+        """Take and store a named snapshot; the oldest is evicted beyond MAX_SNAPSHOTS"""
+        if not tracemalloc.is_tracing():
+            raise TracingNotStartedError("tracemalloc is not running")
+        snapshot = tracemalloc.take_snapshot().filter_traces(self._snapshot_filters)
+        info = {
+            "name": name,
+            "taken_at": datetime.utcnow().isoformat(),
+            "traced_bytes": sum(stat.size for stat in snapshot.statistics("filename")),
+            "rss_bytes": self._process.memory_info().rss,
+        }
+        self._snapshots.pop(name, None)
+        self._snapshots[name] = {"snapshot": snapshot, "info": info}
+        while len(self._snapshots) > self.config.MAX_SNAPSHOTS:
+            self._snapshots.popitem(last=False)
+        return info
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        return [entry["info"] for entry in self._snapshots.values()]
+
+    def compare(self, base: str, target: str, top: int = 20, group_by: str = "lineno") -> Dict[str, Any]:
+        """Top-N allocation differences from ``base`` to ``target``, grouped by file or line"""
+        for name in (base, target):
+            if name not in self._snapshots:
+                raise SnapshotNotFoundError(f"Snapshot '{name}' not found")
+        stats = self._snapshots[target]["snapshot"].compare_to(self._snapshots[base]["snapshot"], group_by)
+        top = min(top, self.config.MAX_TOP)
+        return {
+            "base": base,
+            "target": target,
+            "group_by": group_by,
+            "total_size_diff_bytes": sum(stat.size_diff for stat in stats),
+            "top": [
+                {
+                    "file": stat.traceback[0].filename,
+                    "line": stat.traceback[0].lineno if group_by == "lineno" else None,
+                    "size_diff_bytes": stat.size_diff,
+                    "size_bytes": stat.size,
+                    "count_diff": stat.count_diff,
+                    "count": stat.count,
+                }
+                for stat in stats[:top]
+            ],
+        }
+
+    # --- continuous gauges ---
+
+    def update_gauges(self) -> Dict[str, int]:
+        """Refresh the RSS/heap gauges and return the values"""
+        memory = self._process.memory_info()
+        traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        values = {
+            "rss_bytes": memory.rss,
+            "vms_bytes": memory.vms,
+            "allocated_blocks": sys.getallocatedblocks(),
+            "tracemalloc_traced_bytes": traced,
+        }
+        self._rss.set(values["rss_bytes"])
+        self._vms.set(values["vms_bytes"])
+        self._blocks.set(values["allocated_blocks"])
+        self._traced.set(traced)
+        return values
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "tracing": self.tracing,
+            "traceback_frames": tracemalloc.get_traceback_limit() if self.tracing else None,
+            "memory": self.update_gauges(),
+            "snapshots": self.list_snapshots(),
+        }
+
+    async def start(self):
+        """Start periodic gauge updates"""
+        if self._task is None:
+            self.update_gauges()
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.config.GAUGE_INTERVAL_SECONDS)
+            try:
+                self.update_gauges()
+            except Exception as e:
+                logger.warning(f"Failed to update memory gauges: {e}")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+# Global memory profiler instance
+memory_profiler = MemoryProfiler()
@@ -5,13 +5,17 @@ Provides comprehensive application metrics in Prometheus format
 
 import time
 import threading
-from collections import defaultdict, Counter
+from collections import defaultdict
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import json
 import logging
-from dataclasses import dataclass, field
 from enum import Enum
+from app.monitoring.multiprocess import metrics_store
+from app.monitoring.registry import MetricsRegistry
+from app.monitoring.sketch import QuantileSketch
+from app.monitoring.rolling import RequestWindows
+from app.monitoring.hyperloglog import ActiveUserWindows
 
 logger = logging.getLogger(__name__)
 
@@ -22,34 +26,63 @@ class MetricType(Enum):
     HISTOGRAM = "histogram"
     SUMMARY = "summary"
 
-@dataclass
-class MetricPoint:
-    """Individual metric data point"""
-    name: str
-    value: float
-    labels: Dict[str, str] = field(default_factory=dict)
-    timestamp: float = field(default_factory=time.time)
-    metric_type: MetricType = MetricType.GAUGE
-
 class MetricsCollector:
     """Core metrics collection system"""
     
     def __init__(self):
-        self._metrics = defaultdict(list)
-        self._counters = defaultdict(float)
-        self._gauges = defaultdict(float)
-        self._histograms = defaultdict(list)
-        self._summaries = defaultdict(list)
+        # Typed metric families; every family registered here is exported automatically
+        self.registry = MetricsRegistry()
+        self._requests_total = self.registry.counter(
+            "http_requests_total", "Total HTTP requests",
+            ("endpoint", "method", "status_code", "user_role")
+        )
+        self._errors_total = self.registry.counter(
+            "http_errors_total", "Total HTTP errors",
+            ("endpoint", "error_type", "user_role")
+        )
+        self._user_activities_total = self.registry.counter(
+            "user_activities_total", "User activities by role and action",
+            ("user_role", "action")
+        )
+        self._database_queries_total = self.registry.counter(
+            "database_queries_total", "Total database queries",
+            ("query_type", "status")
+        )
+        self._database_rows_total = self.registry.counter(
+            "database_query_rows_total", "Rows returned by database queries",
+            ("query_type",)
+        )
+        self._database_bytes_total = self.registry.counter(
+            "database_query_bytes_total", "JSON payload bytes returned by database queries",
+            ("query_type",)
+        )
+        self._cache_operations_total = self.registry.counter(
+            "cache_operations_total", "Total cache operations",
+            ("operation", "result")
+        )
+        self._request_duration = self.registry.histogram(
+            "http_request_duration_seconds", "HTTP request duration in seconds",
+            ("endpoint", "method", "status_code", "user_role")
+        )
+        self._query_duration = self.registry.histogram(
+            "database_query_duration_seconds", "Database query duration in seconds",
+            ("query_type", "status")
+        )
+        self._cache_duration = self.registry.histogram(
+            "cache_operation_duration_seconds", "Cache operation duration in seconds",
+            ("operation", "result")
+        )
         self._lock = threading.Lock()
         
-        # Request tracking
-        self._request_durations = defaultdict(list)
-        self._request_counts = defaultdict(int)
-        self._error_counts = defaultdict(int)
+        # Streaming percentile sketches per route and per query type (guarded by _lock)
+        self._route_sketches: Dict[str, QuantileSketch] = defaultdict(QuantileSketch)
+        self._query_sketches: Dict[str, QuantileSketch] = defaultdict(QuantileSketch)
+        
+        # Request tracking (rolling 1m/5m/1h windows per endpoint)
+        self._request_windows: Dict[str, RequestWindows] = defaultdict(RequestWindows)
         
-        # User activity tracking
-        self._user_activities = defaultdict(int)
-        self._active_users = set()
+        # Distinct active users per 5m/1h/24h window (HyperLogLog, fixed memory)
+        self._active_users = ActiveUserWindows()
         
         # System metrics tracking
         self._last_system_check = 0
@@ -57,189 +90,115 @@ class MetricsCollector:
         
     def record_request_duration(self, endpoint: str, method: str, status_code: int, duration: float, user_role: str = "unknown"):
         """Record HTTP request duration and metadata"""
+        # Record duration histogram (fixed buckets, constant memory per label set)
+        self._request_duration.observe(duration, (endpoint, method, status_code, user_role))
+        self._requests_total.labels(endpoint, method, status_code, user_role).inc()
+        
         with self._lock:
-            labels = {
-                "endpoint": endpoint,
-                "method": method,
-                "status_code": str(status_code),
-                "user_role": user_role
-            }
-            
-            # Record duration histogram
-            metric_name = "http_request_duration_seconds"
-            self._histograms[metric_name].append(MetricPoint(
-                name=metric_name,
-                value=duration,
-                labels=labels,
-                metric_type=MetricType.HISTOGRAM
-            ))
-            
-            # Track request counts
-            request_key = f"{method}_{endpoint}_{status_code}_{user_role}"
-            self._request_counts[request_key] += 1
+            self._route_sketches[endpoint].add(duration)
             
             # Track for rate calculations
-            self._request_durations[endpoint].append({
-                "duration": duration,
-                "timestamp": time.time(),
-                "status_code": status_code,
-                "user_role": user_role
-            })
-            
-            # Keep only last 1000 requests per endpoint
-            if len(self._request_durations[endpoint]) > 1000:
-                self._request_durations[endpoint] = self._request_durations[endpoint][-1000:]
+            self._request_windows[endpoint].record(duration, status_code)
     
     def record_error_rate(self, endpoint: str, error_type: str, user_role: str = "unknown"):
         """Record error occurrences"""
-        with self._lock:
-            labels = {
-                "endpoint": endpoint,
-                "error_type": error_type,
-                "user_role": user_role
-            }
-            
-            # Record error counter
-            metric_name = "http_errors_total"
-            error_key = f"{endpoint}_{error_type}_{user_role}"
-            self._error_counts[error_key] += 1
-            
-            # Store as counter metric
-            self._counters[f"{metric_name}_{error_key}"] += 1
+        self._errors_total.labels(endpoint, error_type, user_role).inc()
     
     def record_user_activity(self, user_id: str, user_role: str, action: str):
         """Record user activity metrics"""
+        self._user_activities_total.labels(user_role, action).inc()
+        
         with self._lock:
             # Track active users
             self._active_users.add(user_id)
-            
-            # Track activity by type and role
-            activity_key = f"{user_role}_{action}"
-            self._user_activities[activity_key] += 1
-            
-            labels = {
-                "user_role": user_role,
-                "action": action
-            }
-            
-            # Record activity counter
-            metric_name = "user_activities_total"
-            self._counters[f"{metric_name}_{activity_key}"] += 1
     
-    def record_database_query(self, query_type: str, duration: float, success: bool):
+    def record_database_query(self, query_type: str, duration: float, success: bool,
+                              rows: Optional[int] = None, payload_bytes: Optional[int] = None):
         """Record database query performance"""
+        status = "success" if success else "error"
+        
+        self._query_duration.observe(duration, (query_type, status))
+        self._database_queries_total.labels(query_type, status).inc()
+        if rows:
+            self._database_rows_total.labels(query_type).inc(rows)
+        if payload_bytes:
+            self._database_bytes_total.labels(query_type).inc(payload_bytes)
+        
         with self._lock:
-            labels = {
-                "query_type": query_type,
-                "status": "success" if success else "error"
-            }
-            
-            # Record query duration
-            metric_name = "database_query_duration_seconds"
-            self._histograms[metric_name].append(MetricPoint(
-                name=metric_name,
-                value=duration,
-                labels=labels,
-                metric_type=MetricType.HISTOGRAM
-            ))
-            
-            # Record query counter
-            counter_name = "database_queries_total"
-            counter_key = f"{query_type}_{labels['status']}"
-            self._counters[f"{counter_name}_{counter_key}"] += 1
+            self._query_sketches[query_type].add(duration)
     
     def record_cache_operation(self, operation: str, hit: bool, duration: float):
         """Record cache operation metrics"""
-        with self._lock:
-            labels = {
-                "operation": operation,
-                "result": "hit" if hit else "miss"
-            }
-            
-            # Record cache operation duration
-            metric_name = "cache_operation_duration_seconds"
-            self._histograms[metric_name].append(MetricPoint(
-                name=metric_name,
-                value=duration,
-                labels=labels,
-                metric_type=MetricType.HISTOGRAM
-            ))
-            
-            # Record cache hit/miss counters
-            counter_name = "cache_operations_total"
-            counter_key = f"{operation}_{labels['result']}"
-            self._counters[f"{counter_name}_{counter_key}"] += 1
+        result = "hit" if hit else "miss"
+        
+        self._cache_duration.observe(duration, (operation, result))
+        self._cache_operations_total.labels(operation, result).inc()
     
     def set_gauge(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
-        """Set a gauge metric value"""
-        with self._lock:
-            labels = labels or {}
-            gauge_key = f"{name}_{'_'.join([f'{k}_{v}' for k, v in labels.items()])}"
-            self._gauges[gauge_key] = value
+        """Set a gauge metric value (the family is declared on first use)"""
+        labels = labels or {}
+        label_names = tuple(sorted(labels))
+        self.registry.gauge(name, label_names=label_names).labels(
+            *(labels[k] for k in label_names)
+        ).set(value)
     
     def increment_counter(self, name: str, value: float = 1.0, labels: Optional[Dict[str, str]] = None):
-        """Increment a counter metric"""
-        with self._lock:
-            labels = labels or {}
-            counter_key = f"{name}_{'_'.join([f'{k}_{v}' for k, v in labels.items()])}"
-            self._counters[counter_key] += value
+        """Increment a counter metric (the family is declared on first use)"""
+        labels = labels or {}
+        label_names = tuple(sorted(labels))
+        self.registry.counter(name, label_names=label_names).labels(
+            *(labels[k] for k in label_names)
+        ).inc(value)
     
     def get_request_metrics(self) -> Dict[str, Any]:
         """Get aggregated request metrics"""
         with self._lock:
             now = time.time()
-            last_hour = now - 3600  # Last hour
-            last_minute = now - 60   # Last minute
             
             metrics = {
                 "requests_per_minute": {},
                 "requests_per_hour": {},
                 "average_response_time": {},
                 "error_rates": {},
-                "status_code_distribution": defaultdict(int)
+                "status_code_distribution": defaultdict(int),
+                "windows": {}
             }
             
-            for endpoint, requests in self._request_durations.items():
-                # Filter requests by time window
-                recent_requests = [r for r in requests if r["timestamp"] > last_hour]
-                minute_requests = [r for r in requests if r["timestamp"] > last_minute]
+            for endpoint, windows in self._request_windows.items():
+                # O(slots) reads from the ring buffers
+                hour = windows.window(3600, now)
+                if not hour["count"]:
+                    continue
                 
-                if recent_requests:
-                    # Requests per hour/minute
-                    metrics["requests_per_hour"][endpoint] = len(recent_requests)
-                    metrics["requests_per_minute"][endpoint] = len(minute_requests)
-                    
-                    # Average response time
-                    avg_duration = sum(r["duration"] for r in recent_requests) / len(recent_requests)
-                    metrics["average_response_time"][endpoint] = round(avg_duration * 1000, 2)  # Convert to ms
-                    
-                    # Status code distribution
-                    for req in recent_requests:
-                        metrics["status_code_distribution"][req["status_code"]] += 1
-                    
-                    # Error rate calculation
-                    error_requests = [r for r in recent_requests if r["status_code"] >= 400]
-                    error_rate = (len(error_requests) / len(recent_requests)) * 100
-                    metrics["error_rates"][endpoint] = round(error_rate, 2)
+                metrics["requests_per_hour"][endpoint] = hour["count"]
+                metrics["requests_per_minute"][endpoint] = windows.window(60, now)["count"]
+                metrics["average_response_time"][endpoint] = round(hour["duration"] / hour["count"] * 1000, 2)  # Convert to ms
+                metrics["error_rates"][endpoint] = round(hour["errors"] / hour["count"] * 100, 2)
+                for status_code, count in hour["statuses"].items():
+                    metrics["status_code_distribution"][status_code] += count
+                metrics["windows"][endpoint] = windows.summary(now)
             
             return metrics
     
     def get_user_metrics(self) -> Dict[str, Any]:
         """Get user activity metrics"""
         with self._lock:
+            active_users = self._active_users.counts()
             return {
-                "active_users_count": len(self._active_users),
-                "user_activities": dict(self._user_activities),
+                "active_users_count": active_users["1h"],
+                "active_users": active_users,
+                "user_activities": {
+                    f"{role}_{action}": int(count)
+                    for (role, action), count in self._user_activities_total.values().items()
+                },
                 "activity_distribution": self._calculate_activity_distribution()
             }
     
     def _calculate_activity_distribution(self) -> Dict[str, int]:
         """Calculate activity distribution by role"""
         distribution = defaultdict(int)
-        for activity_key, count in self._user_activities.items():
-            if "_" in activity_key:
-                role = activity_key.split("_")[0]
-                distribution[role] += count
+        for (role, _action), count in self._user_activities_total.values().items():
+            distribution[role] += int(count)
         return dict(distribution)
     
     def get_performance_metrics(self) -> Dict[str, Any]:
@@ -248,41 +207,37 @@ class MetricsCollector:
         user_metrics = self.get_user_metrics()
         
         with self._lock:
-            # Calculate percentiles for response times
-            all_durations = []
-            for requests in self._request_durations.values():
-                all_durations.extend([r["duration"] for r in requests])
-            
-            percentiles = {}
-            if all_durations:
-                all_durations.sort()
-                percentiles = {
-                    "p50": self._calculate_percentile(all_durations, 50),
-                    "p95": self._calculate_percentile(all_durations, 95),
-                    "p99": self._calculate_percentile(all_durations, 99)
-                }
-            
-            return {
-                "request_metrics": request_metrics,
-                "user_metrics": user_metrics,
-                "response_time_percentiles": percentiles,
-                "total_errors": sum(self._error_counts.values()),
-                "total_requests": sum(self._request_counts.values()),
-                "cache_metrics": self._get_cache_metrics()
-            }
-    
-    def _calculate_percentile(self, sorted_values: List[float], percentile: int) -> float:
-        """Calculate percentile value"""
-        if not sorted_values:
-            return 0.0
+            # Copy the sketches (O(bins) each) so quantile queries run without the lock
+            route_sketches = {k: v.copy() for k, v in self._route_sketches.items()}
+            query_sketches = {k: v.copy() for k, v in self._query_sketches.items()}
+        
+        overall = QuantileSketch()
+        for sketch in route_sketches.values():
+            overall.merge(sketch)
         
-        index = int((percentile / 100.0) * (len(sorted_values) - 1))
-        return round(sorted_values[index] * 1000, 2)  # Convert to ms
+        return {
+            "request_metrics": request_metrics,
+            "user_metrics": user_metrics,
+            "response_time_percentiles": overall.percentiles_ms(),
+            "endpoint_response_time_percentiles": {
+                endpoint: sketch.percentiles_ms() for endpoint, sketch in route_sketches.items()
+            },
+            "query_time_percentiles": {
+                query_type: sketch.percentiles_ms() for query_type, sketch in query_sketches.items()
+            },
+            "total_errors": int(self._errors_total.total()),
+            "total_requests": int(self._requests_total.total()),
+            "cache_metrics": self._get_cache_metrics()
+        }
     
     def _get_cache_metrics(self) -> Dict[str, Any]:
         """Get cache-related metrics"""
-        cache_hits = sum(1 for key in self._counters.keys() if "cache_operations_total" in key and "hit" in key)
-        cache_misses = sum(1 for key in self._counters.keys() if "cache_operations_total" in key and "miss" in key)
+        cache_hits = cache_misses = 0
+        for (_operation, result), count in self._cache_operations_total.values().items():
+            if result == "hit":
+                cache_hits += int(count)
+            else:
+                cache_misses += int(count)
         
         total_operations = cache_hits + cache_misses
         hit_rate = (cache_hits / total_operations * 100) if total_operations > 0 else 0
@@ -297,19 +252,44 @@ class MetricsCollector:
     def reset_metrics(self, older_than_hours: int = 24):
         """Reset metrics older than specified hours"""
         with self._lock:
-            cutoff_time = time.time() - (older_than_hours * 3600)
-            
-            # Clean old request data
-            for endpoint in list(self._request_durations.keys()):
-                self._request_durations[endpoint] = [
-                    r for r in self._request_durations[endpoint]
-                    if r["timestamp"] > cutoff_time
-                ]
-                if not self._request_durations[endpoint]:
-                    del self._request_durations[endpoint]
-            
-            # Reset user activities (keep current session)
-            self._active_users.clear()
+            # Request windows expire on their own; drop endpoints with no recent traffic
+            now = time.time()
+            for endpoint in list(self._request_windows.keys()):
+                if not self._request_windows[endpoint].window(3600, now)["count"]:
+                    del self._request_windows[endpoint]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a JSON-serializable copy of the collector state for cross-worker aggregation"""
+        with self._lock:
+            return {
+                "registry": self.registry.snapshot(),
+                "route_sketches": {k: v.to_dict() for k, v in self._route_sketches.items()},
+                "query_sketches": {k: v.to_dict() for k, v in self._query_sketches.items()},
+                "request_windows": {k: v.to_dict() for k, v in self._request_windows.items()},
+                "active_users": self._active_users.to_dict()
+            }
+    
+    @classmethod
+    def merge_snapshots(cls, snapshots: List[Dict[str, Any]]) -> "MetricsCollector":
+        """Build a collector holding the merged state of several worker snapshots.
+
+        Counters, histograms and sketches are summed, gauges keep the most recent write
+        and the active user sketches are unioned.
+        """
+        merged = cls()
+        for snapshot in snapshots:
+            merged.registry.merge_snapshot(snapshot.get("registry", {}))
+            for attr, key in (("_route_sketches", "route_sketches"), ("_query_sketches", "query_sketches")):
+                sketches = getattr(merged, attr)
+                for label, sketch_data in snapshot.get(key, {}).items():
+                    try:
+                        sketches[label].merge(QuantileSketch.from_dict(sketch_data))
+                    except ValueError as e:
+                        logger.warning(f"Skipping {key} snapshot for {label}: {e}")
+            for endpoint, windows in snapshot.get("request_windows", {}).items():
+                merged._request_windows[endpoint].merge_dict(windows)
+            merged._active_users.merge_dict(snapshot.get("active_users", {}))
+        return merged
 
 class PrometheusExporter:
     """Export metrics in Prometheus format"""
@@ -317,9 +297,14 @@ class PrometheusExporter:
     def __init__(self, metrics_collector: MetricsCollector):
         self.metrics_collector = metrics_collector
     
+    def collector(self) -> MetricsCollector:
+        """Get the collector to export - merged across workers when multi-process mode is on"""
+        return metrics_store.aggregate("metrics", local=self.metrics_collector)
+    
     def generate_prometheus_metrics(self) -> str:
         """Generate metrics in Prometheus exposition format"""
         lines = []
+        collector = self.collector()
         
         # Add metadata
         lines.append("# HELP fairplay_nil_info FairPlay NIL application info")
@@ -328,7 +313,7 @@ class PrometheusExporter:
         lines.append("")
         
         # Add request metrics
-        request_metrics = self.metrics_collector.get_request_metrics()
+        request_metrics = collector.get_request_metrics()
         
         # Requests per minute
         lines.append("# HELP http_requests_per_minute Number of HTTP requests per minute")
@@ -352,32 +337,35 @@ class PrometheusExporter:
         lines.append("")
         
         # User metrics
-        user_metrics = self.metrics_collector.get_user_metrics()
+        user_metrics = collector.get_user_metrics()
         
         lines.append("# HELP active_users_count Number of active users")
         lines.append("# TYPE active_users_count gauge")
         lines.append(f'active_users_count {user_metrics.get("active_users_count", 0)}')
         lines.append("")
         
+        lines.append("# HELP active_users_estimate Estimated distinct active users per window")
+        lines.append("# TYPE active_users_estimate gauge")
+        for window, count in user_metrics.get("active_users", {}).items():
+            lines.append(f'active_users_estimate{{window="{window}"}} {count}')
+        lines.append("")
+        
         # Cache metrics
-        cache_metrics = self.metrics_collector._get_cache_metrics()
+        cache_metrics = collector._get_cache_metrics()
         
         lines.append("# HELP cache_hit_rate Cache hit rate percentage")
         lines.append("# TYPE cache_hit_rate gauge")
         lines.append(f'cache_hit_rate {cache_metrics.get("hit_rate", 0)}')
         lines.append("")
         
-        lines.append("# HELP cache_operations_total Total cache operations")
-        lines.append("# TYPE cache_operations_total counter")
-        lines.append(f'cache_operations_total{{result="hit"}} {cache_metrics.get("total_hits", 0)}')
-        lines.append(f'cache_operations_total{{result="miss"}} {cache_metrics.get("total_misses", 0)}')
-        lines.append("")
+        # Every registered counter, gauge and histogram family with its labels
+        lines.extend(collector.registry.to_prometheus())
         
         return "\n".join(lines)
     
     def generate_json_metrics(self) -> Dict[str, Any]:
         """Generate metrics in JSON format"""
-        performance_metrics = self.metrics_collector.get_performance_metrics()
+        performance_metrics = self.collector().get_performance_metrics()
         
         return {
             "timestamp": datetime.utcnow().isoformat(),
@@ -388,4 +376,5 @@ class PrometheusExporter:
 
 # Global metrics collector instance
 metrics_collector = MetricsCollector()
-prometheus_exporter = PrometheusExporter(metrics_collector) 
\ No newline at end of file
+prometheus_exporter = PrometheusExporter(metrics_collector)
+metrics_store.register("metrics", metrics_collector.snapshot, MetricsCollector.merge_snapshots)
@@ -0,0 +1,151 @@
+"""
+Multi-process Metrics Aggregation for FairPlay NIL
+Each worker periodically writes a snapshot of its in-process metrics to a shared
+directory; scrapes merge the live local state with the other workers' snapshots
+"""
+
+import asyncio
+import json
+import os
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+class MultiprocessConfig:
+    """Multi-process metrics configuration"""
+
+    # Shared directory for per-worker snapshot files; empty disables aggregation
+    DIRECTORY = os.getenv("METRICS_MULTIPROC_DIR", "")
+    FLUSH_INTERVAL_SECONDS = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+    # Snapshots older than this are ignored even if the PID is still alive
+    STALE_AFTER_SECONDS = 300
+
+    FILE_PREFIX = "worker_"
+
+class MultiprocessMetricsStore:
+    """Writes this worker's metric snapshots and merges snapshots from all workers"""
+
+    def __init__(self, directory: Optional[str] = None, flush_interval: Optional[float] = None,
+                 pid: Optional[int] = None):
+        self.config = MultiprocessConfig()
+        self.directory = self.config.DIRECTORY if directory is None else directory
+        self.flush_interval = flush_interval or self.config.FLUSH_INTERVAL_SECONDS
+        self.pid = pid or os.getpid()
+        self._sources: Dict[str, Tuple[Callable[[], Any], Callable[[List[Any]], Any]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def register(self, name: str, snapshot: Callable[[], Any], merge: Callable[[List[Any]], Any]):
+        """Register a metrics source.
+
+        ``snapshot`` returns a JSON-serializable view of the local state and
+        ``merge`` combines a list of such snapshots into an aggregated view.
+        """
+        self._sources[name] = (snapshot, merge)
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"{self.config.FILE_PREFIX}{pid}.json")
+
+    def flush(self):
+        """Write this worker's snapshot atomically"""
+        if not self.enabled:
+            return
+        document = {
+            "pid": self.pid,
+            "written_at": time.time(),
+            "sources": {name: snapshot() for name, (snapshot, _) in self._sources.items()},
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(self.pid)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(document, f, default=str)
+        os.replace(tmp_path, path)
+
+    def read_other_workers(self) -> List[Dict[str, Any]]:
+        """Load snapshots written by other live workers"""
+        if not self.enabled or not os.path.isdir(self.directory):
+            return []
+
+        documents = []
+        cutoff = time.time() - self.config.STALE_AFTER_SECONDS
+        for filename in os.listdir(self.directory):
+            if not filename.startswith(self.config.FILE_PREFIX) or not filename.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, filename)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    document = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable metrics snapshot {filename}: {e}")
+                continue
+
+            pid = document.get("pid")
+            if not isinstance(pid, int) or pid == self.pid:
+                continue
+            if not psutil.pid_exists(pid):
+                # Worker exited - its counters drop out, which Prometheus treats as a reset
+                self._remove(path)
+                continue
+            if document.get("written_at", 0) < cutoff:
+                continue
+            documents.append(document)
+        return documents
+
+    def aggregate(self, name: str, local: Any = None) -> Any:
+        """Merge the live local snapshot of ``name`` with every other worker's.
+
+        With aggregation disabled, ``local`` is returned unchanged so callers
+        can pass their in-process object and skip the merge entirely.
+        Raises ValueError for an unregistered ``name`` with no ``local`` fallback.
+        """
+        if (not self.enabled or name not in self._sources) and local is not None:
+            return local
+        if name not in self._sources:
+            raise ValueError(f"Metrics source {name!r} is not registered")
+        snapshot, merge = self._sources[name]
+        snapshots = [snapshot()]
+        for document in self.read_other_workers():
+            worker_snapshot = document.get("sources", {}).get(name)
+            if worker_snapshot is not None:
+                snapshots.append(worker_snapshot)
+        return merge(snapshots)
+
+    async def start(self):
+        """Start periodic snapshot flushing"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Multi-process metrics enabled in {self.directory} (pid {self.pid})")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Failed to flush metrics snapshot: {e}")
+
+    async def stop(self):
+        """Stop flushing and remove this worker's snapshot"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self.enabled:
+            self._remove(self._path(self.pid))
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+# Global multi-process metrics store
+metrics_store = MultiprocessMetricsStore()
@@ -0,0 +1,132 @@
+"""
+Sampling Profiler for FairPlay NIL
+On-demand wall-clock stack sampling with collapsed-stack and speedscope output
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+class ProfilerConfig:
+    """Sampling profiler configuration"""
+
+    MAX_DURATION_SECONDS = float(os.getenv("PROFILER_MAX_DURATION", "60"))
+    DEFAULT_INTERVAL_SECONDS = 0.01  # 100 Hz
+    MIN_INTERVAL_SECONDS = 0.001
+    MAX_STACK_DEPTH = 128
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running"""
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+class SamplingProfiler:
+    """Samples every thread's stack via ``sys._current_frames()`` at a fixed interval.
+
+    Sampling runs in its own thread, so the event loop keeps serving requests
+    and is itself profiled. Only one profile may run at a time per process.
+    """
+
+    def __init__(self):
+        self.config = ProfilerConfig()
+        self._guard = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._guard.locked()
+
+    def sample(self, duration: float, interval: float) -> Dict[str, Any]:
+        """Blocking: sample all other threads for ``duration`` seconds"""
+        duration = min(max(duration, interval), self.config.MAX_DURATION_SECONDS)
+        interval = max(interval, self.config.MIN_INTERVAL_SECONDS)
+        if not self._guard.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            own_thread = threading.get_ident()
+            stacks: Counter = Counter()
+            samples = 0
+            started = time.perf_counter()
+            deadline = started + duration
+            while time.perf_counter() < deadline:
+                thread_names = {t.ident: t.name for t in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    stacks[(thread_names.get(thread_id, str(thread_id)),) + self._walk(frame)] += 1
+                samples += 1
+                time.sleep(interval)
+            elapsed = time.perf_counter() - started
+        finally:
+            self._guard.release()
+        logger.info(f"Profile complete: {samples} samples over {elapsed:.1f}s")
+        return {"stacks": stacks, "samples": samples, "interval": interval, "duration": elapsed}
+
+    async def profile(self, duration: float, interval: float = ProfilerConfig.DEFAULT_INTERVAL_SECONDS) -> Dict[str, Any]:
+        """Run ``sample`` off the event loop"""
+        if self.busy:
+            raise ProfilerBusyError("A profile is already running")
+        return await asyncio.to_thread(self.sample, duration, interval)
+
+    def _walk(self, frame) -> Tuple[Frame, ...]:
+        """Stack from root to leaf"""
+        frames: List[Frame] = []
+        while frame is not None and len(frames) < self.config.MAX_STACK_DEPTH:
+            code = frame.f_code
+            frames.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        frames.reverse()
+        return tuple(frames)
+
+def _frame_label(frame: Frame) -> str:
+    name, filename, line = frame
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+def to_collapsed(result: Dict[str, Any]) -> str:
+    """Brendan Gregg collapsed-stack format: ``thread;root;...;leaf count`` per line"""
+    lines = []
+    for stack, count in result["stacks"].most_common():
+        thread, frames = stack[0], stack[1:]
+        lines.append(";".join([thread] + [_frame_label(f).replace(";", ":") for f in frames]) + f" {count}")
+    return "\n".join(lines) + "\n"
+
+def to_speedscope(result: Dict[str, Any], name: str = "fairplay-nil-api") -> Dict[str, Any]:
+    """speedscope sampled-profile JSON, one profile per thread"""
+    frame_index: Dict[Frame, int] = {}
+    frames: List[Dict[str, Any]] = []
+    profiles: Dict[str, Dict[str, Any]] = {}
+    for stack, count in result["stacks"].items():
+        thread, stack_frames = stack[0], stack[1:]
+        indices = []
+        for frame in stack_frames:
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+            indices.append(frame_index[frame])
+        profile = profiles.setdefault(thread, {
+            "type": "sampled",
+            "name": thread,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": round(result["duration"], 6),
+            "samples": [],
+            "weights": [],
+        })
+        profile["samples"].append(indices)
+        profile["weights"].append(round(count * result["interval"], 6))
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "fairplay-nil-profiler",
+        "shared": {"frames": frames},
+        "profiles": list(profiles.values()),
+    }
+
+# Global profiler instance
+sampling_profiler = SamplingProfiler()
@@ -0,0 +1,226 @@
+"""
+Typed Metric Registry for FairPlay NIL
+Counter/gauge/histogram families keyed by label tuples, exported with real Prometheus labels
+"""
+
+import time
+import threading
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.monitoring.histogram import Histogram, format_labels
+
+logger = logging.getLogger(__name__)
+
+LabelKey = Tuple[str, ...]
+
+def _label_key(label_values: Sequence[Any]) -> LabelKey:
+    return tuple(v if isinstance(v, str) else str(v) for v in label_values)
+
+class CounterChild:
+    """Counter bound to one label set; keep a reference on hot paths to skip the lookup"""
+
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self._value += amount
+
+    def get(self) -> float:
+        return self._value
+
+class GaugeChild:
+    """Gauge bound to one label set"""
+
+    __slots__ = ("_value", "updated_at", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self.updated_at = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+            self.updated_at = time.time()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+            self.updated_at = time.time()
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def get(self) -> float:
+        return self._value
+
+class _MetricFamily:
+    """A named metric with declared label names and one child per label set"""
+
+    type_name = ""
+    child_class: Any = None
+
+    def __init__(self, name: str, description: str = "", label_names: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._children: Dict[LabelKey, Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *label_values: Any) -> Any:
+        """Get (or create) the child handle for a label set"""
+        key = _label_key(label_values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self.child_class())
+        return child
+
+    def children(self) -> Dict[LabelKey, Any]:
+        with self._lock:
+            return dict(self._children)
+
+    def values(self) -> Dict[LabelKey, float]:
+        """Current value of every label set"""
+        return {key: child.get() for key, child in self.children().items()}
+
+    def total(self) -> float:
+        return sum(self.values().values())
+
+    def to_prometheus(self) -> List[str]:
+        """Render as Prometheus text format lines"""
+        lines = [
+            f"# HELP {self.name} {self.description or self.name}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for key, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{format_labels(self.label_names, key)} {value}")
+        return lines
+
+class Counter(_MetricFamily):
+    """Monotonic counter family"""
+
+    type_name = "counter"
+    child_class = CounterChild
+
+    def inc(self, amount: float = 1.0, label_values: Sequence[Any] = ()):
+        self.labels(*label_values).inc(amount)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"series": [[list(key), value] for key, value in self.values().items()]}
+
+    def merge_snapshot(self, snapshot: Dict[str, Any]):
+        """Add another worker's counter values"""
+        for key, value in snapshot.get("series", []):
+            self.labels(*key).inc(value)
+
+class Gauge(_MetricFamily):
+    """Gauge family; merges keep the most recent write per label set"""
+
+    type_name = "gauge"
+    child_class = GaugeChild
+
+    def set(self, value: float, label_values: Sequence[Any] = ()):
+        self.labels(*label_values).set(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "series": [[list(key), child.get(), child.updated_at] for key, child in self.children().items()]
+        }
+
+    def merge_snapshot(self, snapshot: Dict[str, Any]):
+        for key, value, updated_at in snapshot.get("series", []):
+            child = self.labels(*key)
+            with child._lock:
+                if updated_at >= child.updated_at:
+                    child._value = value
+                    child.updated_at = updated_at
+
+class MetricsRegistry:
+    """Declares metric families once and exports all of them"""
+
+    _family_types = {"counter": Counter, "gauge": Gauge, "histogram": Histogram}
+
+    def __init__(self):
+        self._families: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, family_type: str, name: str, description: str,
+                  label_names: Sequence[str], **kwargs) -> Any:
+        family = self._families.get(name)
+        if family is None:
+            with self._lock:
+                family = self._families.get(name)
+                if family is None:
+                    family = self._family_types[family_type](
+                        name, description=description, label_names=tuple(label_names), **kwargs
+                    )
+                    self._families[name] = family
+        if family.type_name != family_type or family.label_names != tuple(label_names):
+            raise ValueError(
+                f"Metric {name} already registered as {family.type_name} with labels {family.label_names}"
+            )
+        return family
+
+    def counter(self, name: str, description: str = "", label_names: Sequence[str] = ()) -> Counter:
+        """Declare (or fetch) a counter family"""
+        return self._register("counter", name, description, label_names)
+
+    def gauge(self, name: str, description: str = "", label_names: Sequence[str] = ()) -> Gauge:
+        """Declare (or fetch) a gauge family"""
+        return self._register("gauge", name, description, label_names)
+
+    def histogram(self, name: str, description: str = "", label_names: Sequence[str] = (),
+                  buckets: Optional[Sequence[float]] = None) -> Histogram:
+        """Declare (or fetch) a histogram family"""
+        return self._register("histogram", name, description, label_names, buckets=buckets)
+
+    def get(self, name: str) -> Optional[Any]:
+        return self._families.get(name)
+
+    def families(self) -> List[Any]:
+        with self._lock:
+            return list(self._families.values())
+
+    def to_prometheus(self) -> List[str]:
+        """Render every registered family"""
+        lines: List[str] = []
+        for family in self.families():
+            lines.extend(family.to_prometheus())
+            lines.append("")
+        return lines
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable state of every family, with enough metadata to re-declare it"""
+        return {
+            family.name: {
+                "type": family.type_name,
+                "description": family.description,
+                "label_names": list(family.label_names),
+                "data": family.snapshot(),
+            }
+            for family in self.families()
+        }
+
+    def merge_snapshot(self, snapshot: Dict[str, Any]):
+        """Merge another registry's snapshot, declaring families this one has not seen"""
+        for name, entry in snapshot.items():
+            kwargs = {}
+            if entry.get("type") == "histogram":
+                kwargs["buckets"] = entry.get("data", {}).get("buckets")
+            try:
+                family = self._register(entry["type"], name, entry.get("description", ""),
+                                        entry.get("label_names", []), **kwargs)
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Skipping metric {name} snapshot: {e}")
+                continue
+            family.merge_snapshot(entry.get("data", {}))
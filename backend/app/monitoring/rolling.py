@@ -0,0 +1,146 @@
+"""
+Rolling Request Windows for FairPlay NIL
+Time-bucketed ring buffers giving O(buckets) request rate, error rate and latency reads
+"""
+
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+class RollingWindowConfig:
+    """Rolling window layout"""
+
+    # Per-second slots cover the short windows, per-minute slots cover the hour
+    SECOND_SLOTS = 300
+    MINUTE_SLOTS = 60
+
+    # Reported windows in seconds
+    WINDOWS = {"1m": 60, "5m": 300, "1h": 3600}
+
+class RingBuffer:
+    """Fixed ring of time slots, each holding request count, error count and duration sum.
+
+    A slot is reused once its epoch falls out of the ring, so writes are O(1)
+    and memory is constant. Minute slots also keep a status code breakdown.
+    """
+
+    __slots__ = ("slot_seconds", "num_slots", "track_status", "_epochs", "_counts",
+                 "_errors", "_durations", "_statuses")
+
+    def __init__(self, slot_seconds: int, num_slots: int, track_status: bool = False):
+        self.slot_seconds = slot_seconds
+        self.num_slots = num_slots
+        self.track_status = track_status
+        self._epochs = [-1] * num_slots
+        self._counts = [0] * num_slots
+        self._errors = [0] * num_slots
+        self._durations = [0.0] * num_slots
+        self._statuses: List[Optional[Dict[int, int]]] = [None] * num_slots
+
+    def _slot(self, epoch: int) -> int:
+        """Index for ``epoch``, clearing the slot if it still holds an older epoch"""
+        index = epoch % self.num_slots
+        if self._epochs[index] != epoch:
+            self._epochs[index] = epoch
+            self._counts[index] = 0
+            self._errors[index] = 0
+            self._durations[index] = 0.0
+            self._statuses[index] = {} if self.track_status else None
+        return index
+
+    def add(self, now: float, duration: float, status_code: int):
+        index = self._slot(int(now // self.slot_seconds))
+        self._counts[index] += 1
+        self._durations[index] += duration
+        if status_code >= 400:
+            self._errors[index] += 1
+        if self.track_status:
+            statuses = self._statuses[index]
+            statuses[status_code] = statuses.get(status_code, 0) + 1
+
+    def totals(self, now: float, window_seconds: int) -> Dict[str, Any]:
+        """Sum the slots covering the last ``window_seconds`` (current slot included)"""
+        current = int(now // self.slot_seconds)
+        slots = min(self.num_slots, max(1, math.ceil(window_seconds / self.slot_seconds)))
+        count = errors = 0
+        duration = 0.0
+        statuses: Dict[int, int] = {}
+        for epoch in range(current - slots + 1, current + 1):
+            index = epoch % self.num_slots
+            if self._epochs[index] != epoch:
+                continue
+            count += self._counts[index]
+            errors += self._errors[index]
+            duration += self._durations[index]
+            if self.track_status:
+                for status_code, status_count in self._statuses[index].items():
+                    statuses[status_code] = statuses.get(status_code, 0) + status_count
+        return {"count": count, "errors": errors, "duration": duration, "statuses": statuses}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable live slots for cross-worker aggregation"""
+        return {
+            "slots": [
+                [self._epochs[i], self._counts[i], self._errors[i], self._durations[i],
+                 {str(k): v for k, v in (self._statuses[i] or {}).items()}]
+                for i in range(self.num_slots) if self._epochs[i] >= 0
+            ]
+        }
+
+    def merge_dict(self, data: Dict[str, Any]):
+        """Add another ring's slots; slots older than what this ring holds are dropped"""
+        for epoch, count, errors, duration, statuses in data.get("slots", []):
+            index = epoch % self.num_slots
+            if self._epochs[index] > epoch:
+                continue
+            index = self._slot(epoch)
+            self._counts[index] += count
+            self._errors[index] += errors
+            self._durations[index] += duration
+            if self.track_status:
+                slot_statuses = self._statuses[index]
+                for status_code, status_count in statuses.items():
+                    slot_statuses[int(status_code)] = slot_statuses.get(int(status_code), 0) + status_count
+
+class RequestWindows:
+    """Rolling 1m/5m/1h request statistics for one endpoint"""
+
+    __slots__ = ("seconds", "minutes")
+
+    def __init__(self):
+        config = RollingWindowConfig
+        self.seconds = RingBuffer(1, config.SECOND_SLOTS)
+        self.minutes = RingBuffer(60, config.MINUTE_SLOTS, track_status=True)
+
+    def record(self, duration: float, status_code: int, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        self.seconds.add(now, duration, status_code)
+        self.minutes.add(now, duration, status_code)
+
+    def window(self, window_seconds: int, now: Optional[float] = None) -> Dict[str, Any]:
+        """Totals for a window, read from the finest ring that covers it"""
+        now = time.time() if now is None else now
+        ring = self.seconds if window_seconds <= self.seconds.num_slots else self.minutes
+        return ring.totals(now, window_seconds)
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """Request rate, error rate and average latency for every configured window"""
+        now = time.time() if now is None else now
+        result = {}
+        for name, window_seconds in RollingWindowConfig.WINDOWS.items():
+            totals = self.window(window_seconds, now)
+            count = totals["count"]
+            result[name] = {
+                "requests": count,
+                "requests_per_minute": round(count / (window_seconds / 60), 2),
+                "error_rate": round(totals["errors"] / count * 100, 2) if count else 0.0,
+                "average_response_time": round(totals["duration"] / count * 1000, 2) if count else 0.0,
+            }
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"seconds": self.seconds.to_dict(), "minutes": self.minutes.to_dict()}
+
+    def merge_dict(self, data: Dict[str, Any]):
+        self.seconds.merge_dict(data.get("seconds", {}))
+        self.minutes.merge_dict(data.get("minutes", {}))
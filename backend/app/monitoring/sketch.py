@@ -0,0 +1,148 @@
+"""
+Streaming Quantile Sketches for FairPlay NIL
+DDSketch-style log-bucketed counts for percentiles with bounded relative error
+"""
+
+import os
+import math
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class SketchConfig:
+    """Quantile sketch configuration"""
+
+    # Relative error guarantee for quantile queries (0.01 = within 1%)
+    RELATIVE_ACCURACY = float(os.getenv("METRICS_SKETCH_ACCURACY", "0.01"))
+
+    # Upper bound on bins per sketch; the lowest bins are collapsed beyond this
+    MAX_BINS = int(os.getenv("METRICS_SKETCH_MAX_BINS", "2048"))
+
+    # Values at or below this are counted in the zero bucket
+    MIN_INDEXABLE_VALUE = 1e-9
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative-error guarantees (DDSketch).
+
+    Each value is counted in the bin ``ceil(log(value) / log(gamma))``, so
+    adding is O(1), memory is bounded by ``max_bins`` and a quantile query
+    walks the bins instead of sorting raw samples. Two sketches with the
+    same accuracy merge exactly by adding their bin counts. Not thread-safe;
+    callers guard updates with their own lock.
+    """
+
+    __slots__ = ("relative_accuracy", "max_bins", "_gamma", "_log_gamma",
+                 "bins", "zero_count", "count", "sum", "min", "max")
+
+    def __init__(self, relative_accuracy: Optional[float] = None, max_bins: Optional[int] = None):
+        self.relative_accuracy = relative_accuracy or SketchConfig.RELATIVE_ACCURACY
+        self.max_bins = max_bins or SketchConfig.MAX_BINS
+        self._gamma = (1 + self.relative_accuracy) / (1 - self.relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        """Record one value (negative values are treated as zero)"""
+        if value > SketchConfig.MIN_INDEXABLE_VALUE:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            bins = self.bins
+            if key in bins:
+                bins[key] += 1
+            else:
+                bins[key] = 1
+                if len(bins) > self.max_bins:
+                    self._collapse()
+        else:
+            self.zero_count += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def _collapse(self):
+        """Fold the lowest bins together so the upper quantiles keep full accuracy"""
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_bins + 1
+        target = keys[excess]
+        for key in keys[:excess]:
+            self.bins[target] += self.bins.pop(key)
+
+    def _value(self, key: int) -> float:
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile (0 <= q <= 1); None if the sketch is empty"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return max(self.min, 0.0)
+        seen = self.zero_count
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                # Clamp to the exact extremes so p0/p100 are never outside the data
+                return min(max(self._value(key), self.min), self.max)
+        return self.max
+
+    def merge(self, other: "QuantileSketch"):
+        """Add another sketch's counts into this one (accuracies must match)"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def copy(self) -> "QuantileSketch":
+        """Independent copy, e.g. to query outside the owner's lock"""
+        clone = QuantileSketch(self.relative_accuracy, self.max_bins)
+        clone.merge(self)
+        return clone
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state for cross-worker aggregation"""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "bins": {str(key): count for key, count in self.bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        """Rebuild a sketch from ``to_dict`` output"""
+        sketch = cls(data.get("relative_accuracy"))
+        sketch.bins = {int(key): count for key, count in data.get("bins", {}).items()}
+        sketch.zero_count = data.get("zero_count", 0)
+        sketch.count = data.get("count", 0)
+        sketch.sum = data.get("sum", 0.0)
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+    def percentiles_ms(self) -> Dict[str, float]:
+        """p50/p95/p99 in milliseconds, the shape the performance endpoints report"""
+        if self.count == 0:
+            return {}
+        return {
+            f"p{p}": round(self.quantile(p / 100.0) * 1000, 2)
+            for p in (50, 95, 99)
+        }
@@ -0,0 +1,301 @@
+"""
+SLO Tracking for FairPlay NIL
+Per-route latency and availability objectives with error budgets and multi-window burn rates
+"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.monitoring.lane import monitoring_lane
+from app.monitoring.metrics import metrics_collector
+from app.monitoring.multiprocess import metrics_store
+from app.monitoring.rolling import RingBuffer
+
+logger = logging.getLogger(__name__)
+
+class SLOConfig:
+    """SLO tracking configuration"""
+
+    # Optional JSON file of SLOs ({"slos": [...]}) replacing the defaults
+    SLO_FILE = os.getenv("SLO_FILE", "")
+
+    # Error budget accounting period
+    PERIOD_DAYS = int(os.getenv("SLO_PERIOD_DAYS", "30"))
+
+    # How often burn rates are recomputed into gauges for the alert rules
+    UPDATE_INTERVAL_SECONDS = float(os.getenv("SLO_UPDATE_INTERVAL", "15"))
+
+    # Burn rate windows, read from per-minute slots
+    WINDOWS = {"5m": 300, "30m": 1800, "1h": 3600, "6h": 21600}
+
+    # Multi-window policies: (long window, short window, burn rate threshold).
+    # Both windows must burn faster than the threshold, so a policy fires quickly
+    # on a real incident and stops as soon as the short window recovers.
+    # 14.4x over 1h spends 2% of a 30 day budget; 6x over 6h spends 5%.
+    POLICIES = {
+        "fast": ("1h", "5m", 14.4),
+        "slow": ("6h", "30m", 6.0),
+    }
+
+    KINDS = ("latency", "availability")
+
+@dataclass
+class SLO:
+    """One service level objective for a route template.
+
+    ``availability``: ``target`` of requests do not return 5xx.
+    ``latency``: ``target`` of requests complete within ``threshold_ms``
+    (p95 < 300ms is ``target=0.95, threshold_ms=300``).
+    """
+    name: str
+    route: str
+    kind: str
+    target: float
+    threshold_ms: Optional[float] = None
+    method: Optional[str] = None
+
+    def __post_init__(self):
+        if self.kind not in SLOConfig.KINDS:
+            raise ValueError(f"SLO {self.name}: unknown kind {self.kind!r}")
+        if not 0 < self.target < 1:
+            raise ValueError(f"SLO {self.name}: target must be between 0 and 1")
+        if self.kind == "latency" and not self.threshold_ms:
+            raise ValueError(f"SLO {self.name}: latency SLOs need threshold_ms")
+        if self.method:
+            self.method = self.method.upper()
+        self._threshold_seconds = (self.threshold_ms or 0) / 1000
+
+    @property
+    def error_budget(self) -> float:
+        return 1 - self.target
+
+    @property
+    def objective(self) -> str:
+        if self.kind == "latency":
+            return f"{self.target:.4g} of requests under {self.threshold_ms:g}ms"
+        return f"{self.target:.4g} of requests without a 5xx"
+
+    def is_good(self, status_code: int, duration: float) -> bool:
+        if self.kind == "availability":
+            return status_code < 500
+        return duration <= self._threshold_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "route": self.route,
+            "method": self.method,
+            "kind": self.kind,
+            "target": self.target,
+            "threshold_ms": self.threshold_ms,
+            "objective": self.objective,
+        }
+
+DEFAULT_SLOS: List[Dict[str, Any]] = [
+    {"name": "deals_latency", "route": "/api/deals", "method": "GET", "kind": "latency",
+     "target": 0.95, "threshold_ms": 300},
+    {"name": "deals_availability", "route": "/api/deals", "kind": "availability", "target": 0.999},
+    {"name": "profile_latency", "route": "/api/profile", "method": "GET", "kind": "latency",
+     "target": 0.95, "threshold_ms": 300},
+    {"name": "profile_availability", "route": "/api/profile", "kind": "availability", "target": 0.999},
+]
+
+def load_slos(path: str = "") -> List[SLO]:
+    """SLOs from a JSON file (a list, or an object with an ``slos`` list), else the defaults"""
+    if not path:
+        definitions = DEFAULT_SLOS
+    else:
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Cannot read SLOs from {path}: {e}")
+        definitions = data.get("slos", []) if isinstance(data, dict) else data
+    slos = []
+    for definition in definitions:
+        try:
+            slos.append(SLO(**definition))
+        except TypeError as e:
+            raise ValueError(f"Invalid SLO {definition.get('name', '?')}: {e}")
+    names = [slo.name for slo in slos]
+    if len(names) != len(set(names)):
+        raise ValueError("SLO names must be unique")
+    return slos
+
+class SLOWindows:
+    """Good/bad event counts for one SLO: per-minute slots for burn rates, per-hour for the period"""
+
+    __slots__ = ("minutes", "hours")
+
+    def __init__(self):
+        config = SLOConfig
+        self.minutes = RingBuffer(60, max(config.WINDOWS.values()) // 60)
+        self.hours = RingBuffer(3600, config.PERIOD_DAYS * 24)
+
+    def record(self, now: float, good: bool):
+        # The ring's error count is the bad event count
+        status = 200 if good else 500
+        self.minutes.add(now, 0.0, status)
+        self.hours.add(now, 0.0, status)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"minutes": self.minutes.to_dict(), "hours": self.hours.to_dict()}
+
+    def merge_dict(self, data: Dict[str, Any]):
+        self.minutes.merge_dict(data.get("minutes", {}))
+        self.hours.merge_dict(data.get("hours", {}))
+
+def _burn_rate(totals: Dict[str, Any], error_budget: float) -> float:
+    """Bad event fraction as a multiple of the allowed fraction (1.0 spends the budget exactly on time)"""
+    return totals["errors"] / totals["count"] / error_budget if totals["count"] else 0.0
+
+class SLOTracker:
+    """Counts good and bad events per SLO as requests complete.
+
+    ``record`` is a dict lookup on the route template plus O(1) ring writes for
+    each matching SLO; burn rates and budgets are computed only when read.
+    """
+
+    def __init__(self, slos: Optional[List[SLO]] = None):
+        self.config = SLOConfig()
+        self.slos: List[SLO] = []
+        self._by_route: Dict[str, List[SLO]] = {}
+        self._windows: Dict[str, SLOWindows] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.set_slos(slos if slos is not None else load_slos(self.config.SLO_FILE))
+
+    def set_slos(self, slos: List[SLO]):
+        by_route: Dict[str, List[SLO]] = {}
+        for slo in slos:
+            by_route.setdefault(slo.route, []).append(slo)
+        with self._lock:
+            self.slos = list(slos)
+            self._by_route = by_route
+            self._windows = {slo.name: self._windows.get(slo.name) or SLOWindows() for slo in slos}
+
+    def record(self, route: str, method: str, status_code: int, duration: float, now: Optional[float] = None):
+        """Count one completed request against the SLOs of its route template"""
+        slos = self._by_route.get(route)
+        if not slos:
+            return
+        now = time.time() if now is None else now
+        with self._lock:
+            for slo in slos:
+                if slo.method is None or slo.method == method:
+                    self._windows[slo.name].record(now, slo.is_good(status_code, duration))
+
+    def get_status(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Per SLO: burn rate per window, multi-window policy state and the period's error budget"""
+        now = time.time() if now is None else now
+        period_seconds = self.config.PERIOD_DAYS * 86400
+        result = {}
+        with self._lock:
+            for slo in self.slos:
+                windows = self._windows[slo.name]
+                burn_rates = {}
+                window_stats = {}
+                for name, seconds in self.config.WINDOWS.items():
+                    totals = windows.minutes.totals(now, seconds)
+                    burn_rates[name] = _burn_rate(totals, slo.error_budget)
+                    window_stats[name] = {
+                        "requests": totals["count"],
+                        "bad": totals["errors"],
+                        "burn_rate": round(burn_rates[name], 3),
+                    }
+                policies = {}
+                for policy, (long_window, short_window, threshold) in self.config.POLICIES.items():
+                    burn_rate = min(burn_rates[long_window], burn_rates[short_window])
+                    policies[policy] = {
+                        "long_window": long_window,
+                        "short_window": short_window,
+                        "threshold": threshold,
+                        "burn_rate": round(burn_rate, 3),
+                        "burning": burn_rate >= threshold,
+                    }
+                period = windows.hours.totals(now, period_seconds)
+                count, bad = period["count"], period["errors"]
+                result[slo.name] = {
+                    **slo.to_dict(),
+                    "windows": window_stats,
+                    "policies": policies,
+                    "period": {
+                        "days": self.config.PERIOD_DAYS,
+                        "requests": count,
+                        "bad": bad,
+                        "compliance": round(1 - bad / count, 6) if count else 1.0,
+                        "error_budget_remaining": round(1 - bad / count / slo.error_budget, 4) if count else 1.0,
+                    },
+                }
+        return result
+
+    def update_gauges(self, status: Dict[str, Any]):
+        """Export burn rates and budgets so alert rules can fire on them"""
+        registry = metrics_collector.registry
+        burn_rate = registry.gauge("slo_burn_rate", "SLO error budget burn rate per window", ("slo", "window"))
+        policy_rate = registry.gauge(
+            "slo_multiwindow_burn_rate", "Lower of the long and short window burn rates of an SLO policy",
+            ("slo", "policy")
+        )
+        budget = registry.gauge(
+            "slo_error_budget_remaining", "Fraction of the period's SLO error budget left", ("slo",)
+        )
+        for name, slo_status in status.items():
+            for window, stats in slo_status["windows"].items():
+                burn_rate.labels(name, window).set(stats["burn_rate"])
+            for policy, stats in slo_status["policies"].items():
+                policy_rate.labels(name, policy).set(stats["burn_rate"])
+            budget.labels(name).set(slo_status["period"]["error_budget_remaining"])
+
+    def refresh(self) -> Dict[str, Any]:
+        """Status across all workers, also written to the gauges"""
+        status = metrics_store.aggregate("slo", local=self).get_status()
+        self.update_gauges(status)
+        return status
+
+    async def start(self):
+        """Refresh the SLO gauges every SLO_UPDATE_INTERVAL seconds"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                # The cross-worker read and merge runs in the monitoring lane, off the event loop
+                await monitoring_lane.run(self.refresh)
+            except Exception as e:
+                logger.warning(f"Failed to update SLO gauges: {e}")
+            await asyncio.sleep(self.config.UPDATE_INTERVAL_SECONDS)
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable event counts for cross-worker aggregation"""
+        with self._lock:
+            return {name: windows.to_dict() for name, windows in self._windows.items()}
+
+    def merge_snapshots(self, snapshots: List[Dict[str, Any]]) -> "SLOTracker":
+        """A tracker with this tracker's SLOs holding the summed counts of several snapshots"""
+        merged = SLOTracker(self.slos)
+        for snapshot in snapshots:
+            for name, data in snapshot.items():
+                if name in merged._windows:
+                    merged._windows[name].merge_dict(data)
+        return merged
+
+# Global SLO tracker instance
+slo_tracker = SLOTracker()
+metrics_store.register("slo", slo_tracker.snapshot, slo_tracker.merge_snapshots)
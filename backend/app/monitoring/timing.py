@@ -0,0 +1,66 @@
+"""
+Server-Timing accumulator for FairPlay NIL
+Collects per-request time spent in the database, cache, validation and rate limiter
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+class ServerTimingConfig:
+    """Server-Timing configuration"""
+
+    # On by default; set SERVER_TIMING_ENABLED=false to disable per environment
+    ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+    HEADER = "Server-Timing"
+
+class RequestTimings:
+    """Accumulated durations for a single request, keyed by metric name"""
+
+    __slots__ = ("durations", "counts")
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def add(self, name: str, duration: float):
+        self.durations[name] = self.durations.get(name, 0.0) + duration
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def to_header(self, total: Optional[float] = None) -> str:
+        """Format as a Server-Timing header value (durations in milliseconds)"""
+        entries: List[str] = [
+            f'{name};dur={duration * 1000:.1f};desc="{self.counts[name]}x"'
+            for name, duration in self.durations.items()
+        ]
+        if total is not None:
+            entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def start_request_timings() -> RequestTimings:
+    """Attach a fresh accumulator to the current request context"""
+    timings = RequestTimings()
+    _request_timings.set(timings)
+    return timings
+
+def record_timing(name: str, duration: float):
+    """Add a duration (seconds) to the current request's accumulator, if any"""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(name, duration)
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Time a block and add it to the current request's accumulator"""
+    if _request_timings.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, time.perf_counter() - start)
@@ -0,0 +1,366 @@
+"""
+Request Tracing for FairPlay NIL
+Lightweight span tracing with OpenTelemetry-compatible (OTLP/JSON) export
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+import logging
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+class TracingConfig:
+    """Tracing configuration loaded from the environment"""
+
+    ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "fairplay-nil-api")
+
+    # Export targets - OTLP/HTTP collector takes precedence over the file exporter
+    OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "")
+    FILE_PATH = os.getenv("TRACING_FILE_PATH", "")
+
+    # Tail sampling: errors and slow requests are always kept
+    SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "0.1"))
+    SLOW_THRESHOLD_MS = float(os.getenv("TRACING_SLOW_THRESHOLD_MS", "1000"))
+
+    # OTLP exporter batching
+    EXPORT_INTERVAL_SECONDS = 5.0
+    MAX_QUEUE_SIZE = 2048
+    MAX_SPANS_PER_TRACE = 512
+
+    REQUEST_ID_HEADER = "X-Request-ID"
+    # Client-supplied request IDs must match this; anything else is replaced by a generated ID
+    REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+class SpanKind(Enum):
+    """OTLP span kinds"""
+    INTERNAL = 1
+    SERVER = 2
+    CLIENT = 3
+
+class SpanStatus(Enum):
+    """OTLP span status codes"""
+    UNSET = 0
+    OK = 1
+    ERROR = 2
+
+@dataclass
+class Span:
+    """A single timed operation within a trace"""
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str]
+    name: str
+    kind: SpanKind = SpanKind.INTERNAL
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: SpanStatus = SpanStatus.UNSET
+    status_message: str = ""
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_exception(self, error: BaseException):
+        self.status = SpanStatus.ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns or time.time_ns()
+        return (end_ns - self.start_ns) / 1_000_000
+
+class _NoopSpan:
+    """Span stand-in used when tracing is disabled"""
+    trace_id = ""
+    span_id = ""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def record_exception(self, error: BaseException):
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+class _TraceBuffer:
+    """Spans collected for one request until the root span ends"""
+
+    def __init__(self, sampled: bool):
+        self.sampled = sampled
+        self.spans: List[Span] = []
+        self.has_error = False
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_current_trace: ContextVar[Optional[_TraceBuffer]] = ContextVar("current_trace", default=None)
+_request_id: ContextVar[str] = ContextVar("request_id", default="")
+
+def get_request_id() -> str:
+    """Get the request ID propagated for the current request"""
+    return _request_id.get()
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def spans_to_otlp(spans: List[Span], service_name: str) -> Dict[str, Any]:
+    """Encode spans as an OTLP/JSON ExportTraceServiceRequest"""
+    otlp_spans = []
+    for span in spans:
+        otlp_span = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": span.kind.value,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns or span.start_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+            "status": {"code": span.status.value, "message": span.status_message},
+        }
+        if span.parent_span_id:
+            otlp_span["parentSpanId"] = span.parent_span_id
+        otlp_spans.append(otlp_span)
+
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{"scope": {"name": "app.monitoring.tracing"}, "spans": otlp_spans}],
+        }]
+    }
+
+class SpanExporter:
+    """Base span exporter - receives each sampled trace once its root span ends"""
+
+    def export(self, spans: List[Span]):
+        raise NotImplementedError
+
+    async def start(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+class FileSpanExporter(SpanExporter):
+    """Append one OTLP/JSON document per line to a file (used in tests and local debugging)"""
+
+    def __init__(self, path: str, service_name: str = TracingConfig.SERVICE_NAME):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        line = json.dumps(spans_to_otlp(spans, self.service_name))
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+class OTLPHttpSpanExporter(SpanExporter):
+    """Batch spans and POST them as OTLP/JSON to a collector (e.g. http://localhost:4318)"""
+
+    def __init__(self, endpoint: str, service_name: str = TracingConfig.SERVICE_NAME,
+                 interval: float = TracingConfig.EXPORT_INTERVAL_SECONDS,
+                 max_queue_size: int = TracingConfig.MAX_QUEUE_SIZE):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.interval = interval
+        self._queue: Deque[Span] = deque(maxlen=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def export(self, spans: List[Span]):
+        # Bounded queue: oldest spans are dropped if the collector falls behind
+        self._queue.extend(spans)
+
+    async def start(self):
+        self._client = httpx.AsyncClient(timeout=5.0)
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self):
+        if not self._queue or not self._client:
+            return
+        spans = list(self._queue)
+        self._queue.clear()
+        try:
+            await self._client.post(self.url, json=spans_to_otlp(spans, self.service_name))
+        except Exception as e:
+            logger.warning(f"Failed to export {len(spans)} spans to {self.url}: {e}")
+
+    async def shutdown(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+class Tracer:
+    """Creates spans, tracks the active span per request and applies tail sampling"""
+
+    def __init__(self, config: Optional[TracingConfig] = None):
+        self.config = config or TracingConfig()
+        self.exporter: Optional[SpanExporter] = None
+        self.sample_rate = self.config.SAMPLE_RATE
+        self.slow_threshold_ms = self.config.SLOW_THRESHOLD_MS
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.ENABLED and self.exporter is not None
+
+    def configure(self, exporter: Optional[SpanExporter] = None, sample_rate: Optional[float] = None,
+                  slow_threshold_ms: Optional[float] = None):
+        """Set the exporter and sampling parameters"""
+        self.exporter = exporter
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if slow_threshold_ms is not None:
+            self.slow_threshold_ms = slow_threshold_ms
+
+    def configure_from_env(self):
+        """Pick the exporter from TracingConfig (OTLP collector, file, or none)"""
+        if self.config.OTLP_ENDPOINT:
+            self.configure(OTLPHttpSpanExporter(self.config.OTLP_ENDPOINT, self.config.SERVICE_NAME))
+        elif self.config.FILE_PATH:
+            self.configure(FileSpanExporter(self.config.FILE_PATH, self.config.SERVICE_NAME))
+        else:
+            self.configure(None)
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    @contextmanager
+    def start_trace(self, name: str, request_id: Optional[str] = None, traceparent: Optional[str] = None,
+                    attributes: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """Start the root span for a request and export the trace when it ends.
+
+        A client request ID is kept only if it is short and plain (it is logged
+        and echoed in a response header); otherwise a fresh one is generated.
+        """
+        if not request_id or not self.config.REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+        request_token = _request_id.set(request_id)
+
+        if not self.enabled:
+            try:
+                yield NOOP_SPAN
+            finally:
+                _request_id.reset(request_token)
+            return
+
+        trace_id, parent_span_id, parent_sampled = self._parse_traceparent(traceparent)
+        buffer = _TraceBuffer(sampled=parent_sampled)
+        trace_token = _current_trace.set(buffer)
+        root = Span(
+            trace_id=trace_id or uuid.uuid4().hex,
+            span_id=uuid.uuid4().hex[:16],
+            parent_span_id=parent_span_id,
+            name=name,
+            kind=SpanKind.SERVER,
+            attributes=dict(attributes or {}),
+        )
+        root.set_attribute("http.request_id", request_id)
+        span_token = _current_span.set(root)
+
+        try:
+            yield root
+        except BaseException as e:
+            root.record_exception(e)
+            raise
+        finally:
+            root.end_ns = time.time_ns()
+            buffer.spans.append(root)
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            _request_id.reset(request_token)
+            self._finish_trace(root, buffer)
+
+    @contextmanager
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                   kind: SpanKind = SpanKind.INTERNAL) -> Iterator[Any]:
+        """Start a child span of the active span (no-op outside a traced request)"""
+        buffer = _current_trace.get()
+        parent = _current_span.get()
+        if buffer is None or parent is None or len(buffer.spans) >= self.config.MAX_SPANS_PER_TRACE:
+            yield NOOP_SPAN
+            return
+
+        span = Span(
+            trace_id=parent.trace_id,
+            span_id=uuid.uuid4().hex[:16],
+            parent_span_id=parent.span_id,
+            name=name,
+            kind=kind,
+            attributes=dict(attributes or {}),
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            if span.status == SpanStatus.ERROR:
+                buffer.has_error = True
+            buffer.spans.append(span)
+            _current_span.reset(token)
+
+    def traceparent(self, span: Any) -> str:
+        """Format a W3C traceparent header for the given span"""
+        return f"00-{span.trace_id}-{span.span_id}-01"
+
+    def _parse_traceparent(self, header: Optional[str]) -> Tuple[Optional[str], Optional[str], bool]:
+        """Parse a W3C traceparent header into (trace_id, parent_span_id, sampled)"""
+        if not header:
+            return None, None, False
+        parts = header.strip().split("-")
+        if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+            return None, None, False
+        try:
+            sampled = bool(int(parts[3], 16) & 0x01)
+        except ValueError:
+            sampled = False
+        return parts[1], parts[2], sampled
+
+    def _finish_trace(self, root: Span, buffer: _TraceBuffer):
+        """Tail sampling: keep errors, slow requests and a random fraction of the rest"""
+        keep = (
+            buffer.sampled
+            or buffer.has_error
+            or root.status == SpanStatus.ERROR
+            or root.duration_ms >= self.slow_threshold_ms
+            or random.random() < self.sample_rate
+        )
+        if not keep or self.exporter is None:
+            return
+        try:
+            self.exporter.export(buffer.spans)
+        except Exception as e:
+            logger.warning(f"Span export failed: {e}")
+
+# Global tracer instance
+tracer = Tracer()
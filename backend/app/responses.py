@@ -0,0 +1,77 @@
+"""
+Response serialization for FairPlay NIL backend
+Provides an orjson-based default response class and a fast path for trusted database rows
+"""
+
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _orjson_default(value: Any) -> Any:
+    """Encode types orjson does not handle natively"""
+    if isinstance(value, BaseModel):
+        return value.dict()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+
+    Used as the application's default response class. orjson natively
+    encodes datetimes, UUIDs, enums and dataclasses, so payloads produced
+    by handlers serialize without a second pass through the stdlib encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS,
+        )
+
+
+@lru_cache(maxsize=None)
+def _model_field_names(model: Type[BaseModel]) -> Tuple[str, ...]:
+    """Get the declared field names of a response model (cached per model)"""
+    return tuple(model.__fields__.keys())
+
+
+def project_row(row: Dict[str, Any], model: Type[BaseModel]) -> Dict[str, Any]:
+    """Project a database row onto a response model's fields without validation.
+
+    Keeps the response shape identical to ``model(**row)`` (unknown columns
+    dropped, missing fields returned as null) while skipping pydantic
+    validation and ``jsonable_encoder``.
+    """
+    return {name: row.get(name) for name in _model_field_names(model)}
+
+
+def project_rows(rows: Iterable[Dict[str, Any]], model: Type[BaseModel]) -> List[Dict[str, Any]]:
+    """Project a list of database rows onto a response model's fields"""
+    names = _model_field_names(model)
+    return [{name: row.get(name) for name in names} for row in rows]
+
+
+def trusted_response(content: Any, model: Optional[Type[BaseModel]] = None,
+                     status_code: int = 200) -> FastJSONResponse:
+    """Build a response directly from data that came straight from Postgres.
+
+    Returning a Response instance bypasses FastAPI's ``response_model``
+    revalidation and ``jsonable_encoder``. Only use this for rows read from
+    or written to Supabase by the handler itself; anything assembled from
+    client input should still go through the response model.
+    """
+    if model is not None and isinstance(content, dict):
+        content = project_row(content, model)
+    return FastJSONResponse(content=content, status_code=status_code)
@@ -232,6 +232,84 @@ class DealResponse(DealUpdate):
     class Config:
         from_attributes = True
 
+class DealSummaryResponse(BaseModel):
+    """Deal columns needed to render a row of the deals table (no JSONB blobs)"""
+    id: int
+    user_id: uuid.UUID
+    created_at: datetime
+    status: str
+    status_labels: Optional[List[str]] = None
+    deal_type: Optional[str] = None
+    deal_nickname: Optional[str] = None
+    payor_name: Optional[str] = None
+    brand_partner: Optional[str] = None
+    compensation_cash: Optional[float] = None
+    fmv: Optional[float] = None
+    clearinghouse_result: Optional[str] = None
+    submission_type: Optional[str] = None
+
+class DealListResponse(BaseModel):
+    """Deal columns of the default deals list (what the frontend table and filters read)"""
+    id: int
+    user_id: uuid.UUID
+    created_at: datetime
+    status: str
+    status_labels: Optional[List[str]] = None
+    deal_type: Optional[str] = None
+    deal_nickname: Optional[str] = None
+    deal_terms_url: Optional[str] = None
+    deal_terms_file_name: Optional[str] = None
+    deal_terms_file_type: Optional[str] = None
+    deal_terms_file_size: Optional[int] = None
+    payor_name: Optional[str] = None
+    payor_type: Optional[str] = None
+    contact_name: Optional[str] = None
+    contact_email: Optional[str] = None
+    contact_phone: Optional[str] = None
+    activities: Optional[List[Dict[str, Any]]] = None
+    obligations: Optional[Dict[str, Any]] = None
+    grant_exclusivity: Optional[str] = None
+    uses_school_ip: Optional[bool] = None
+    licenses_nil: Optional[str] = None
+    compensation_cash: Optional[float] = None
+    compensation_goods: Optional[List[Dict[str, Any]]] = None
+    compensation_other: Optional[List[Dict[str, Any]]] = None
+    is_group_deal: Optional[bool] = None
+    is_paid_to_llc: Optional[bool] = None
+    athlete_social_media: Optional[List[Dict[str, Any]]] = None
+    social_media_confirmed: Optional[bool] = None
+    social_media_confirmed_at: Optional[datetime] = None
+    clearinghouse_prediction: Optional[Dict[str, Any]] = None
+    valuation_prediction: Optional[Dict[str, Any]] = None
+    brand_partner: Optional[str] = None
+    clearinghouse_result: Optional[str] = None
+    actual_compensation: Optional[float] = None
+    valuation_range: Optional[str] = None
+    fmv: Optional[float] = None
+
+class DealAnalyticsResponse(DealSummaryResponse):
+    """Summary plus the columns the analytics dashboard aggregates"""
+    payor_type: Optional[str] = None
+    payor_company_size: Optional[str] = None
+    payor_industries: Optional[List[str]] = None
+    deal_duration_total_months: Optional[int] = None
+    compensation_goods: Optional[List[Dict[str, Any]]] = None
+    compensation_other: Optional[List[Dict[str, Any]]] = None
+    actual_compensation: Optional[float] = None
+    valuation_range: Optional[str] = None
+    is_group_deal: Optional[bool] = None
+    is_paid_to_llc: Optional[bool] = None
+    uses_school_ip: Optional[bool] = None
+    grant_exclusivity: Optional[str] = None
+
+class DealBatchUpdateItem(BaseModel):
+    id: int
+    # Validated against DealUpdate per item, so one bad item does not reject the batch
+    changes: Dict[str, Any]
+
+class DealBatchUpdate(BaseModel):
+    items: List[DealBatchUpdateItem] = Field(..., min_items=1, max_items=100, description="Deals to update with their changes")
+
 class DealCreateResponse(BaseModel):
     id: int
     user_id: uuid.UUID
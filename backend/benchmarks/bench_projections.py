@@ -0,0 +1,87 @@
+"""
+Benchmark: deal list projections
+Measures the response payload and serialization time of a 100-deal page for
+each named projection and a sparse fieldset, relative to the full detail view.
+Rows are cut to the projection's columns, as Supabase returns them for its select string.
+Also compares the legacy per-row profile copy with a single ``included.profile`` block.
+
+Run from backend/:  python -m benchmarks.bench_projections
+"""
+
+import timeit
+
+from app.deal_projections import DEAL_PROFILE_FIELDS, PROJECTIONS, flatten_profile, resolve_projection
+from app.responses import FastJSONResponse
+from benchmarks.fixtures import make_deal_rows
+
+ITERATIONS = 200
+
+PROFILE = {
+    "full_name": "Jordan Smith", "university": "State University", "sports": ["Soccer", "Track"],
+    "division": "I", "gender": "female", "email": "jordan.smith@example.com", "phone": "555-123-4567",
+    "role": "athlete", "avatar_url": "https://storage.example.com/avatars/42.png",
+}
+
+
+def render_page(rows):
+    payload = {"deals": rows, "pagination": {"current_page": 1, "total_pages": 1}}
+    return FastJSONResponse(content=payload).body
+
+
+def _report(name, projection, rows, baseline_bytes=None):
+    page = projection.project_rows(rows)
+    size = len(render_page(page))
+    seconds = timeit.timeit(lambda: render_page(page), number=ITERATIONS) / ITERATIONS
+    reduction = f"{(1 - size / baseline_bytes) * 100:5.1f}% smaller" if baseline_bytes else "baseline"
+    print(f"{name:<24} {len(projection.columns):>3} cols {seconds * 1000:8.3f} ms/op {size:>10,} bytes  {reduction}")
+    return size
+
+
+def joined_page(rows):
+    # What the profiles!deals_user_id_fkey join returned: the profile nested in every row
+    return [{**row, "profiles": PROFILE} for row in rows]
+
+
+def flattened_response(joined):
+    deals = []
+    for row in joined:
+        deal = dict(row)
+        flatten_profile(deal, deal.pop("profiles"))
+        deals.append(deal)
+    return FastJSONResponse(content={"deals": deals, "pagination": {}}).body
+
+
+def included_response(rows):
+    included = {"profile": {name: PROFILE.get(name) for name in DEAL_PROFILE_FIELDS}}
+    return FastJSONResponse(content={"deals": rows, "pagination": {}, "included": included}).body
+
+
+def _report_profile(name, func, arg, baseline_bytes=None):
+    size = len(func(arg))
+    seconds = timeit.timeit(lambda: func(arg), number=ITERATIONS) / ITERATIONS
+    reduction = f"{(1 - size / baseline_bytes) * 100:5.1f}% smaller" if baseline_bytes else "baseline"
+    print(f"{name:<24} {seconds * 1000:8.3f} ms/op {size:>10,} bytes  {reduction}")
+    return size
+
+
+def main():
+    rows = make_deal_rows(100)
+
+    print(f"Deal list (100 rows), {ITERATIONS} iterations")
+    baseline = _report("detail", PROJECTIONS["detail"], rows)
+    _report("list (default)", PROJECTIONS["list"], rows, baseline)
+    _report("analytics", PROJECTIONS["analytics"], rows, baseline)
+    _report("summary", PROJECTIONS["summary"], rows, baseline)
+    _report("fields=status,fmv", resolve_projection(fields="status,fmv"), rows, baseline)
+
+    summary = PROJECTIONS["summary"].project_rows(rows)
+    joined = joined_page(summary)
+    query_bytes = len(FastJSONResponse(content=joined).body)
+    print(f"\nProfile per page (100 summary rows), {ITERATIONS} iterations")
+    print(f"query payload: {query_bytes:,} bytes joined vs {len(FastJSONResponse(content=summary).body):,} bytes without the join")
+    baseline = _report_profile("profile=flatten (join)", flattened_response, joined)
+    _report_profile("profile=included", included_response, summary, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: API response serialization
+Compares the previous path (model construction + response_model revalidation +
+jsonable_encoder + stdlib json) with the orjson trusted-row fast path.
+
+Run from backend/:  python -m benchmarks.bench_serialization
+"""
+
+import json
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+
+from app.responses import FastJSONResponse, project_row, project_rows
+from app.schemas import DealResponse
+from benchmarks.fixtures import make_deal_rows
+
+ITERATIONS = 50
+
+
+def legacy_detail(row):
+    # Handler builds the model, FastAPI revalidates it against response_model and encodes it
+    model = DealResponse(**row)
+    validated = DealResponse.validate(model)
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+
+def fast_detail(row):
+    return FastJSONResponse(content=project_row(row, DealResponse)).body
+
+
+def legacy_list(rows):
+    payload = {"deals": rows, "pagination": {"current_page": 1, "total_pages": 1}}
+    return json.dumps(jsonable_encoder(payload)).encode("utf-8")
+
+
+def fast_list(rows):
+    payload = {"deals": rows, "pagination": {"current_page": 1, "total_pages": 1}}
+    return FastJSONResponse(content=payload).body
+
+
+def fast_list_projected(rows):
+    payload = {"deals": project_rows(rows, DealResponse), "pagination": {"current_page": 1, "total_pages": 1}}
+    return FastJSONResponse(content=payload).body
+
+
+def _report(name, func, *args):
+    seconds = timeit.timeit(lambda: func(*args), number=ITERATIONS) / ITERATIONS
+    size = len(func(*args))
+    print(f"{name:<28} {seconds * 1000:9.3f} ms/op {size:>10,} bytes")
+    return seconds
+
+
+def main():
+    rows = make_deal_rows(100)
+
+    print(f"Deal detail (1 row), {ITERATIONS} iterations")
+    before = _report("legacy (model + encoder)", legacy_detail, rows[0])
+    after = _report("trusted row + orjson", fast_detail, rows[0])
+    print(f"speedup: {before / after:.1f}x\n")
+
+    print(f"Deal list (100 rows), {ITERATIONS} iterations")
+    before = _report("legacy (jsonable_encoder)", legacy_list, rows)
+    after = _report("orjson", fast_list, rows)
+    _report("orjson + projection", fast_list_projected, rows)
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark: SLO tracking overhead per request
+Compares the existing per-request metrics recording with the added SLO
+bookkeeping, for a route with SLOs and one without, plus the cost of
+computing burn rates.
+
+Run from backend/:  python -m benchmarks.bench_slo
+"""
+
+import time
+import timeit
+
+from app.monitoring.metrics import MetricsCollector
+from app.monitoring.slo import SLOTracker
+
+ITERATIONS = 200_000
+
+
+def _report(name, func, number=ITERATIONS):
+    seconds = timeit.timeit(func, number=number) / number
+    print(f"{name:<36} {seconds * 1e9:10.0f} ns/op")
+    return seconds
+
+
+def main():
+    collector = MetricsCollector()
+    tracker = SLOTracker()
+    now = time.time()
+
+    print(f"Per-request recording, {ITERATIONS:,} iterations")
+    baseline = _report(
+        "metrics (existing)",
+        lambda: collector.record_request_duration("/api/deals", "GET", 200, 0.05, "athlete"),
+    )
+    tracked = _report("SLO record, route with 2 SLOs", lambda: tracker.record("/api/deals", "GET", 200, 0.05, now))
+    untracked = _report("SLO record, route without SLOs", lambda: tracker.record("/api/schools", "GET", 200, 0.05, now))
+    print(f"overhead vs existing metrics: {tracked / baseline:.1%} (tracked), {untracked / baseline:.1%} (untracked)\n")
+
+    print("Burn rate computation (every SLO_UPDATE_INTERVAL seconds and on dashboard reads)")
+    _report(f"get_status, {len(tracker.slos)} SLOs", lambda: tracker.get_status(now), number=200)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Realistic deal payloads for backend benchmarks
+Rows mirror what Supabase returns for DEAL_SELECT_FIELDS, including the JSONB columns
+"""
+
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+
+def make_deal_row(index: int, user_id: str) -> Dict[str, Any]:
+    """Build one deal row shaped like a Supabase response"""
+    rng = random.Random(index)
+    created_at = datetime(2025, 1, 1) + timedelta(hours=index * 7)
+    return {
+        "id": 10_000 + index,
+        "user_id": user_id,
+        "status": rng.choice(["draft", "submitted", "active"]),
+        "status_labels": rng.choice([[], ["Active"], ["Accepted", "NIL Clearinghouse Approved"]]),
+        "created_at": created_at.isoformat() + "+00:00",
+        "deal_nickname": f"Deal {index}",
+        "deal_terms_url": f"https://storage.example.com/deals/{index}/terms.pdf",
+        "deal_terms_file_name": "terms.pdf",
+        "deal_terms_file_type": "pdf",
+        "deal_terms_file_size": 250_000 + index,
+        "deal_duration_years": 1,
+        "deal_duration_months": 6,
+        "deal_duration_total_months": 18,
+        "payor_name": f"Brand {index % 25}",
+        "payor_type": "business",
+        "contact_name": "Jordan Smith",
+        "contact_email": "jordan.smith@example.com",
+        "contact_phone": "555-123-4567",
+        "payor_company_size": "medium_business",
+        "payor_industries": ["apparel", "fitness"],
+        "activities": [
+            {
+                "activity_type": "social_media",
+                "details": {"platforms": ["instagram", "tiktok"], "posts": rng.randint(1, 10)},
+                "requirements": {"hashtags": ["#ad", "#partner"], "approval_required": True},
+                "deadlines": {"first_post": created_at.date().isoformat()},
+            },
+            {
+                "activity_type": "appearance",
+                "details": {"location": "Campus Bookstore", "hours": 2},
+                "requirements": None,
+                "deadlines": None,
+            },
+        ],
+        "obligations": {"exclusivity_period_days": 90, "notes": "Standard terms " * 10},
+        "grant_exclusivity": "no",
+        "uses_school_ip": False,
+        "licenses_nil": "yes",
+        "compensation_cash": float(rng.randint(100, 5000)),
+        "compensation_cash_schedule": "lump_sum",
+        "compensation_goods": [
+            {"description": "Shoes", "value": 150.0},
+            {"description": "Apparel package", "estimated_value": 300.0},
+        ],
+        "compensation_other": [
+            {"payment_type": "equity", "description": "Startup equity", "estimated_value": 500.0},
+        ],
+        "is_group_deal": False,
+        "is_paid_to_llc": False,
+        "athlete_social_media": [
+            {"platform": "instagram", "handle": "@athlete", "followers": 12_000, "verified": False},
+            {"platform": "tiktok", "handle": "@athlete.tt", "followers": 48_000, "verified": True},
+        ],
+        "social_media_confirmed": True,
+        "social_media_confirmed_at": created_at.isoformat() + "+00:00",
+        "deal_type": rng.choice(["simple", "clearinghouse", "valuation"]),
+        "clearinghouse_prediction": {
+            "prediction": "approved",
+            "confidence": 0.87,
+            "reasons": ["Payor verified", "Business purpose verified", "FMV within range"],
+            "payor_verification": {"verified": True, "sources": ["registry", "website"]},
+            "business_purpose_verification": {"verified": True, "notes": "Promotional activity"},
+            "fmv_analysis": {"low": 800, "high": 2400, "comparables": list(range(20))},
+            "predicted_at": created_at.isoformat(),
+        },
+        "valuation_prediction": {
+            "estimated_fmv": 1450.0,
+            "fmv_range": {"min": 900.0, "max": 2100.0},
+            "factors": {"followers": 60_000, "engagement": 0.042, "market": "regional"},
+            "social_media_score": 72.5,
+            "school_tier_multiplier": 1.2,
+            "sport_multiplier": 1.1,
+            "activity_multiplier": 0.95,
+            "predicted_at": created_at.isoformat(),
+        },
+        "brand_partner": f"Brand {index % 25}",
+        "clearinghouse_result": "approved",
+        "actual_compensation": 1200.0,
+        "valuation_range": "1000-5000",
+        "fmv": 0.0,
+        "submission_type": "finalized",
+    }
+
+
+def make_deal_rows(count: int = 100) -> List[Dict[str, Any]]:
+    """Build a page of deal rows for a single user"""
+    user_id = str(uuid.UUID(int=42))
+    return [make_deal_row(index, user_id) for index in range(count)]
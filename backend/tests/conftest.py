@@ -0,0 +1,73 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+try:
+    from backend.app.main import app
+    from backend.app.database import db
+    from backend.app.dependencies import get_user_id
+except ImportError:
+    # Handle import for different project structures
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from app.main import app
+    from app.database import db
+    from app.dependencies import get_user_id
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+class FakeQuery:
+    """PostgREST request builder stand-in that records each chained call"""
+
+    def __init__(self, table, data, error=None):
+        self.table = table
+        self.data = data
+        self.error = error
+        self.calls = []
+
+    def __getattr__(self, method):
+        def call(*args, **kwargs):
+            self.calls.append((method, args, kwargs))
+            return self
+        return call
+
+    def execute(self):
+        if self.error:
+            raise self.error
+        return SimpleNamespace(data=self.data, count=len(self.data))
+
+class FakePostgrest:
+    """Supabase client stand-in; every ``table()`` call starts a new recorded query"""
+
+    def __init__(self):
+        self.data = []
+        self.error = None
+        self.queries = []
+
+    def table(self, name):
+        query = FakeQuery(name, self.data, self.error)
+        self.queries.append(query)
+        return query
+
+@pytest.fixture
+def as_user():
+    """Authenticate API requests as USER_ID for the duration of a test"""
+    app.dependency_overrides[get_user_id] = lambda: USER_ID
+    yield USER_ID
+    app.dependency_overrides.pop(get_user_id, None)
+
+@pytest.fixture
+def patch_db(monkeypatch, as_user):
+    """Replace database methods by name, e.g. ``patch_db(insert_deals=fake_insert)``"""
+    def patch(**methods):
+        for name, method in methods.items():
+            monkeypatch.setattr(db, name, method)
+    return patch
+
+@pytest.fixture
+def postgrest(monkeypatch):
+    """Swap the Supabase client for a recording fake so real query construction can be asserted"""
+    fake = FakePostgrest()
+    monkeypatch.setattr(db, "_client", fake)
+    return fake
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+
+try:
+    from backend.app.monitoring.alert_rules import AlertRule, load_rules
+    from backend.app.monitoring.dashboard import AlertManager
+    from backend.app.monitoring.metrics import MetricsCollector
+    from backend.app.monitoring.multiprocess import MultiprocessMetricsStore
+    from backend.app.monitoring.registry import MetricsRegistry
+except ImportError:
+    # Handle import for different project structures
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from app.monitoring.alert_rules import AlertRule, load_rules
+    from app.monitoring.dashboard import AlertManager
+    from app.monitoring.metrics import MetricsCollector
+    from app.monitoring.multiprocess import MultiprocessMetricsStore
+    from app.monitoring.registry import MetricsRegistry
+
+def make_manager(*rules):
+    manager = AlertManager(registry=MetricsRegistry())
+    manager.rules = [AlertRule(**rule) for rule in rules]
+    return manager
+
+CPU_RULE = {
+    "name": "cpu", "source": "gauge", "metric": "system_cpu_percent",
+    "thresholds": {"warning": 80, "critical": 95}, "for_seconds": 60, "hysteresis": 5,
+    "service": "system", "title": "High CPU", "description": "CPU at {value:.0f}%"
+}
+
+class TestAlertRuleEngine:
+    """Test suite for declarative alert rules"""
+
+    def test_for_duration_delays_firing(self):
+        manager = make_manager(CPU_RULE)
+        cpu = manager.registry.gauge("system_cpu_percent").labels()
+
+        cpu.set(85)
+        assert manager.evaluate(now=1000) == []
+        assert manager.evaluate(now=1030) == []
+        fired = manager.evaluate(now=1060)
+
+        assert [(a.id, a.level.value) for a in fired] == [("cpu", "warning")]
+        assert fired[0].description == "CPU at 85%"
+        assert manager.get_alert_summary()["by_level"]["warning"] == 1
+
+    def test_condition_interrupted_resets_timer(self):
+        manager = make_manager(CPU_RULE)
+        cpu = manager.registry.gauge("system_cpu_percent").labels()
+
+        cpu.set(85)
+        manager.evaluate(now=1000)
+        cpu.set(50)
+        manager.evaluate(now=1030)
+        cpu.set(85)
+        assert manager.evaluate(now=1060) == []
+        assert len(manager.evaluate(now=1090)) == 0
+        assert len(manager.evaluate(now=1120)) == 1
+
+    def test_hysteresis_and_escalation(self):
+        manager = make_manager(CPU_RULE)
+        cpu = manager.registry.gauge("system_cpu_percent").labels()
+
+        cpu.set(97)
+        manager.evaluate(now=0)
+        fired = manager.evaluate(now=60)
+        assert [a.level.value for a in fired] == ["critical"]
+
+        # Inside the hysteresis band: stays critical
+        cpu.set(92)
+        assert manager.evaluate(now=70) == []
+        assert manager.active_alerts["cpu"].level.value == "critical"
+
+        # Below the band: de-escalates straight to warning (already held)
+        cpu.set(88)
+        fired = manager.evaluate(now=80)
+        assert [a.level.value for a in fired] == ["warning"]
+
+        # Between warning threshold and its band: stays active
+        cpu.set(78)
+        manager.evaluate(now=90)
+        assert "cpu" in manager.active_alerts
+
+        cpu.set(74)
+        manager.evaluate(now=100)
+        assert manager.active_alerts == {}
+        assert manager.get_alert_summary()["total_active"] == 0
+        assert [a.resolved for a in manager.alert_history] == [True, True]
+
+    def test_ratio_rule_per_label_with_minimum_traffic(self):
+        manager = make_manager({
+            "name": "error_rate", "source": "ratio", "metric": "http_errors_total",
+            "denominator": "http_requests_total", "by": ["endpoint"], "scale": 100,
+            "min_denominator": 20, "window_seconds": 300, "thresholds": {"warning": 5, "critical": 10},
+            "title": "High Error Rate on {endpoint}"
+        })
+        requests = manager.registry.counter("http_requests_total", label_names=("endpoint", "method"))
+        errors = manager.registry.counter("http_errors_total", label_names=("endpoint", "error_type"))
+        manager.evaluate(now=0)
+
+        requests.inc(40, ("/api/deals", "GET"))
+        requests.inc(60, ("/api/deals", "POST"))
+        errors.inc(7, ("/api/deals", "server_error"))
+        requests.inc(10, ("/api/profile", "GET"))
+        errors.inc(5, ("/api/profile", "server_error"))
+        fired = manager.evaluate(now=60)
+
+        # /api/profile has too little traffic to judge
+        assert [(a.title, a.level.value, a.metric_value) for a in fired] == [
+            ("High Error Rate on /api/deals", "warning", 7.0)
+        ]
+        assert fired[0].labels == {"endpoint": "/api/deals"}
+
+        # Only the last window counts once old samples age out
+        requests.inc(100, ("/api/deals", "GET"))
+        manager.evaluate(now=400)
+        assert manager.active_alerts == {}
+
+    def test_histogram_average(self):
+        manager = make_manager({
+            "name": "loop_lag", "source": "histogram_avg", "metric": "event_loop_lag_seconds",
+            "scale": 1000, "window_seconds": 60, "thresholds": {"warning": 100}
+        })
+        lag = manager.registry.histogram("event_loop_lag_seconds").labels()
+        lag.observe(0.01)
+        manager.evaluate(now=0)
+        lag.observe(0.2)
+        lag.observe(0.3)
+
+        fired = manager.evaluate(now=10)
+        assert fired[0].metric_value == 250.0
+
+    def test_evaluation_cost_is_recorded(self):
+        manager = make_manager(CPU_RULE)
+        manager.registry.gauge("system_cpu_percent").labels().set(10)
+        manager.evaluate(now=0)
+
+        assert manager.last_evaluation["rules"] == 1
+        assert manager.last_evaluation["series"] == 1
+        assert manager.get_rules()["rules"][0]["stats"]["series"] == 1
+        _, _, count = manager.registry.get("alert_rule_evaluation_seconds").series()[("cpu",)]
+        assert count == 1
+
+    def test_rules_see_every_worker(self, tmp_path):
+        """With multi-process metrics on, rules evaluate the merged series"""
+        stores = []
+        # The parent PID stands in for a second live worker
+        for pid in (os.getpid(), os.getppid()):
+            collector = MetricsCollector()
+            store = MultiprocessMetricsStore(directory=str(tmp_path), pid=pid)
+            store.register("metrics", collector.snapshot, MetricsCollector.merge_snapshots)
+            stores.append((collector, store))
+        (local, local_store), (other, other_store) = stores
+
+        manager = AlertManager(registry=local.registry, store=local_store)
+        manager.rules = [AlertRule(**{**CPU_RULE, "metric": "http_requests_total", "source": "gauge", "by": ["endpoint"],
+                                      "thresholds": {"warning": 2}, "for_seconds": 0})]
+        local.record_request_duration("/api/deals", "GET", 200, 0.1, "athlete")
+        for _ in range(2):
+            other.record_request_duration("/api/deals", "GET", 200, 0.1, "athlete")
+        other_store.flush()
+
+        threads = []
+        merge = manager._evaluation_registry
+
+        def tracked_merge():
+            threads.append(threading.current_thread())
+            return merge()
+
+        manager._evaluation_registry = tracked_merge
+        fired = asyncio.run(manager.evaluate_async(now=0))
+        assert [(a.level.value, a.metric_value) for a in fired] == [("warning", 3.0)]
+        # The snapshot files are read and merged in the monitoring lane, not on the event loop
+        assert threads and threads[0] is not threading.main_thread()
+
+class TestAlertRuleReload:
+    """Rules load from ALERT_RULES_FILE and reload without a restart"""
+
+    def test_invalid_rules_are_rejected(self, tmp_path):
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps({"rules": [{**CPU_RULE, "op": "!="}]}))
+        with pytest.raises(ValueError):
+            load_rules(str(path))
+        path.write_text(json.dumps([CPU_RULE, CPU_RULE]))
+        with pytest.raises(ValueError):
+            load_rules(str(path))
+
+    def test_file_changes_are_picked_up(self, tmp_path):
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps({"rules": [{**CPU_RULE, "for_seconds": 0}]}))
+        manager = make_manager()
+        manager.rules_config.RULES_FILE = str(path)
+        manager.reload_rules()
+        manager.registry.gauge("system_cpu_percent").labels().set(90)
+        assert len(manager.evaluate(now=0)) == 1
+
+        # A broken edit keeps the current rules
+        path.write_text("{not json")
+        os.utime(path, (1, 1))
+        manager.evaluate(now=10)
+        assert [rule.name for rule in manager.rules] == ["cpu"]
+
+        # Removing the rule resolves its alert
+        path.write_text(json.dumps({"rules": [{**CPU_RULE, "name": "cpu_strict", "thresholds": {"critical": 99}}]}))
+        os.utime(path, (2, 2))
+        manager.evaluate(now=20)
+        assert [rule.name for rule in manager.rules] == ["cpu_strict"]
+        assert manager.active_alerts == {}
+
+    def test_default_rules_are_valid(self):
+        assert {rule.name for rule in load_rules()} >= {"service_critical", "error_rate", "cache_hit_rate"}
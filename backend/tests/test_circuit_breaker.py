@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+try:
+    from backend.app.main import app
+    from backend.app.cache import CacheManager
+    from backend.app.monitoring.rolling import RingBuffer
+    from backend.app.circuit_breaker import (
+        CircuitBreaker, CircuitBreakerConfig, CircuitOpenError, CircuitState, redis_breaker, supabase_breaker
+    )
+except ImportError:
+    # Handle import for different project structures
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from app.main import app
+    from app.cache import CacheManager
+    from app.monitoring.rolling import RingBuffer
+    from app.circuit_breaker import (
+        CircuitBreaker, CircuitBreakerConfig, CircuitOpenError, CircuitState, redis_breaker, supabase_breaker
+    )
+
+client = TestClient(app)
+
+def make_breaker(**kwargs):
+    breaker = CircuitBreaker("test", latency_threshold=0.5, **kwargs)
+    breaker.config.MIN_CALLS = 4
+    breaker.config.ERROR_RATE_THRESHOLD = 0.5
+    breaker.config.OPEN_SECONDS = 30
+    return breaker
+
+def expire_cooldown(breaker):
+    breaker.opened_at -= breaker.config.OPEN_SECONDS + 1
+
+@pytest.fixture
+def reset_breakers():
+    yield
+    for breaker in (supabase_breaker, redis_breaker):
+        breaker.config = CircuitBreakerConfig()
+        breaker._window = RingBuffer(1, breaker.config.WINDOW_SECONDS)
+        breaker._half_open_calls = 0
+        breaker._transition(CircuitState.CLOSED)
+
+class TestCircuitBreaker:
+    """Test suite for dependency circuit breakers"""
+
+    def test_trips_on_error_rate_and_fails_fast(self):
+        breaker = make_breaker()
+        for success in (True, False, True, False):
+            breaker.record(success, 0.01)
+
+        assert breaker.state == CircuitState.OPEN
+        assert "error rate 50%" in breaker.last_trip_reason
+        with pytest.raises(CircuitOpenError) as excinfo:
+            with breaker.guard():
+                pytest.fail("call should not run while the breaker is open")
+        assert excinfo.value.status_code == 503
+        assert int(excinfo.value.headers["Retry-After"]) > 0
+        assert breaker.get_status()["rejected_total"] == 1
+
+    def test_trips_on_average_latency(self):
+        breaker = make_breaker()
+        for _ in range(4):
+            breaker.record(True, 0.6)
+
+        assert breaker.state == CircuitState.OPEN
+        assert "latency" in breaker.last_trip_reason
+
+    def test_needs_minimum_calls(self):
+        breaker = make_breaker()
+        for _ in range(3):
+            breaker.record(False, 0.01)
+
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_trial_closes_or_reopens(self):
+        breaker = make_breaker()
+        for _ in range(4):
+            breaker.record(False, 0.01)
+        expire_cooldown(breaker)
+
+        assert breaker.allow() is True
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow() is False  # one trial call at a time
+        breaker.record(False, 0.01)
+        assert breaker.state == CircuitState.OPEN
+
+        expire_cooldown(breaker)
+        with breaker.guard():
+            pass
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.get_status()["window_calls"] == 0
+
+    def test_ignored_errors_do_not_count(self):
+        breaker = make_breaker(is_failure=lambda error: not isinstance(error, KeyError))
+        for _ in range(4):
+            with pytest.raises(KeyError):
+                with breaker.guard():
+                    raise KeyError("constraint")
+
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_supabase_request_errors_are_not_outages(self):
+        class APIError(Exception):
+            def __init__(self, code):
+                self.code = code
+
+        assert supabase_breaker.is_failure(APIError("23505")) is False
+        assert supabase_breaker.is_failure(APIError("PGRST116")) is False
+        assert supabase_breaker.is_failure(ConnectionError("refused")) is True
+
+class TestCacheCircuitBreaker:
+    """Cache operations skip Redis while its breaker is open"""
+
+    def test_open_breaker_short_circuits_redis(self, reset_breakers):
+        class FailingRedis:
+            calls = 0
+
+            async def get(self, key):
+                FailingRedis.calls += 1
+                raise ConnectionError("redis down")
+
+        manager = CacheManager()
+        manager.redis_client = FailingRedis()
+        redis_breaker.config.MIN_CALLS = 4
+
+        async def scenario():
+            for _ in range(10):
+                assert await manager.get("profile", "user") is None
+
+        asyncio.run(scenario())
+
+        assert redis_breaker.state == CircuitState.OPEN
+        assert FailingRedis.calls == 4
+        assert manager._stats["errors"] == 4
+        assert manager._stats["misses"] == 6
+
+class TestProbeEndpoints:
+    """Liveness and readiness endpoints"""
+
+    def test_liveness(self):
+        response = client.get("/health/live")
+        assert response.status_code == 200
+        assert response.json()["status"] == "alive"
+
+    def test_readiness_follows_breakers(self, reset_breakers):
+        assert client.get("/health/ready").json()["status"] == "ready"
+
+        redis_breaker._transition(CircuitState.OPEN, "test")
+        response = client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "degraded"
+
+        supabase_breaker._transition(CircuitState.OPEN, "test")
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["dependencies"]["supabase"]["state"] == "open"
@@ -0,0 +1,147 @@
+import asyncio
+
+import orjson
+
+try:
+    from backend.app.monitoring.dashboard_stream import DashboardStream, merge_patch
+except ImportError:
+    # Handle import for different project structures
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from app.monitoring.dashboard_stream import DashboardStream, merge_patch
+
+class FakeDashboard:
+    """Returns queued payloads and counts how often the dashboard is built"""
+
+    def __init__(self, *payloads):
+        self.payloads = list(payloads)
+        self.calls = 0
+
+    async def get_dashboard_data(self, force_refresh: bool = False):
+        self.calls += 1
+        return self.payloads[min(self.calls, len(self.payloads)) - 1]
+
+def parse(message: bytes):
+    fields = dict(line.split(": ", 1) for line in message.decode().strip().split("\n"))
+    return int(fields["id"]), fields["event"], orjson.loads(fields["data"])
+
+async def next_event(stream_iter):
+    return parse(await asyncio.wait_for(stream_iter.__anext__(), timeout=1))
+
+class TestMergePatch:
+    """Test suite for dashboard deltas"""
+
+    def test_nested_changes_and_removals(self):
+        old = {"a": 1, "nested": {"x": 1, "y": [1, 2], "gone": True}, "same": {"k": "v"}}
+        new = {"a": 1, "nested": {"x": 2, "y": [1, 2, 3]}, "same": {"k": "v"}, "added": {}}
+
+        assert merge_patch(old, new) == {"nested": {"x": 2, "y": [1, 2, 3], "gone": None}, "added": {}}
+        assert merge_patch(new, new) == {}
+
+class TestDashboardStream:
+    """Test suite for the SSE dashboard stream"""
+
+    def test_subscribers_get_snapshot_then_deltas(self):
+        dashboard = FakeDashboard(
+            {"timestamp": "t1", "alerts": {"total": 0}, "score": 100},
+            {"timestamp": "t2", "alerts": {"total": 1}, "score": 100},
+        )
+        stream = DashboardStream(dashboard)
+
+        async def scenario():
+            first, second = stream.subscribe(), stream.subscribe()
+            assert (await first.__anext__()).startswith(b"retry: ")
+            assert (await second.__anext__()).startswith(b"retry: ")
+
+            await stream.publish()
+            await stream.publish()
+
+            events = [await next_event(first), await next_event(first), await next_event(second)]
+            await first.aclose()
+            await second.aclose()
+            return events
+
+        (v1, kind1, data1), (v2, kind2, data2), (_, kind3, _) = asyncio.run(scenario())
+
+        assert (v1, kind1) == (1, "snapshot") and data1["score"] == 100
+        assert (v2, kind2) == (2, "delta")
+        assert data2 == {"timestamp": "t2", "alerts": {"total": 1}}
+        assert kind3 == "snapshot"
+        # Built once per tick regardless of subscriber count
+        assert dashboard.calls == 2
+        assert stream.subscriber_count == 0
+
+    def test_late_subscriber_starts_from_current_snapshot(self):
+        stream = DashboardStream(FakeDashboard({"score": 90}))
+
+        async def scenario():
+            await stream.publish()
+            late = stream.subscribe()
+            await late.__anext__()
+            event = await next_event(late)
+            await late.aclose()
+            return event
+
+        assert asyncio.run(scenario()) == (1, "snapshot", {"score": 90})
+
+    def test_slow_subscriber_is_resynced(self):
+        """A subscriber that overflows its queue restarts from a snapshot and catches up"""
+        payloads = [{"n": i} for i in range(30)]
+        stream = DashboardStream(FakeDashboard(*payloads))
+        stream.config.QUEUE_SIZE = 4
+
+        async def scenario():
+            slow = stream.subscribe()
+            await slow.__anext__()
+            for _ in payloads:
+                await stream.publish()
+            queued = next(iter(stream._subscribers)).qsize()
+            events = [await next_event(slow) for _ in range(queued)]
+            await slow.aclose()
+            return events
+
+        events = asyncio.run(scenario())
+        assert events[0][1] == "snapshot"
+        state = {}
+        for _, kind, data in events:
+            state = data if kind == "snapshot" else {**state, **data}
+        assert state == {"n": 29}
+        assert events[-1][0] == 30
+
+    def test_stop_ends_open_streams(self):
+        stream = DashboardStream(FakeDashboard({"score": 100}))
+        stream.config.INTERVAL_SECONDS = 0.01
+
+        async def scenario():
+            await stream.start()
+            subscriber = stream.subscribe()
+            await subscriber.__anext__()
+            await next_event(subscriber)
+            await stream.stop()
+            return [message async for message in subscriber]
+
+        assert asyncio.run(scenario()) == []
+        assert stream.subscriber_count == 0
+
+    def test_slots_are_reserved_before_streaming(self):
+        """The cap holds for connects whose streams have not started yet"""
+        stream = DashboardStream(FakeDashboard({"score": 100}))
+        stream.config.MAX_SUBSCRIBERS = 2
+
+        async def scenario():
+            await stream.publish()
+            slots = [stream.try_reserve() for _ in range(3)]
+            assert slots[2] is None and stream.subscriber_count == 2
+
+            subscriber = stream.subscribe(slots[0])
+            await subscriber.__anext__()
+            event = await next_event(subscriber)
+            await subscriber.aclose()
+            # A reserved stream that never started is freed by release
+            stream.release(slots[1])
+            return event
+
+        assert asyncio.run(scenario()) == (1, "snapshot", {"score": 100})
+        assert stream.subscriber_count == 0
+        assert stream.try_reserve() is not None
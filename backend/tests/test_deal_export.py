@@ -0,0 +1,124 @@
+import asyncio
+import csv
+import io
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+try:
+    from backend.app.main import app
+    from backend.app.database import db
+    from backend.app.deal_export import DealExportConfig, csv_rows, iter_deal_pages, stream_export
+except ImportError:
+    # Handle import for different project structures
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from app.main import app
+    from app.database import db
+    from app.deal_export import DealExportConfig, csv_rows, iter_deal_pages, stream_export
+
+from conftest import USER_ID
+
+client = TestClient(app)
+
+class FakeDeals:
+    """In-memory keyset pages, recording each page request"""
+
+    def __init__(self, count):
+        self.rows = [{"id": i, "user_id": USER_ID, "status": "draft", "deal_type": "simple",
+                      "deal_nickname": f"deal, {i}", "compensation_cash": i,
+                      "compensation_goods": [{"value": 1}], "status_labels": ["Active"]}
+                     for i in range(1, count + 1)]
+        self.calls = []
+
+    async def fetch_page(self, after_id, limit):
+        self.calls.append(after_id)
+        return [row for row in self.rows if after_id is None or row["id"] > after_id][:limit]
+
+    async def get_deals_after(self, user_id, fields, after_id, limit, status=None, deal_type=None):
+        return await self.fetch_page(after_id, limit)
+
+@pytest.fixture
+def deals(patch_db, monkeypatch):
+    fake = FakeDeals(5)
+    patch_db(get_deals_after=fake.get_deals_after)
+    monkeypatch.setattr(DealExportConfig, "PAGE_SIZE", 2)
+    return fake
+
+class TestDealExportPipeline:
+    """Test suite for keyset paging and serialization"""
+
+    def test_keyset_pages_follow_last_id(self):
+        fake = FakeDeals(5)
+
+        async def collect():
+            return [[row["id"] for row in page] async for page in iter_deal_pages(fake.fetch_page, 2)]
+
+        assert asyncio.run(collect()) == [[1, 2], [3, 4], [5]]
+        assert fake.calls == [None, 2, 4]
+
+    def test_pages_are_fetched_on_demand(self):
+        """Nothing beyond the page being sent is read, so a slow client throttles the reads"""
+        fake = FakeDeals(10)
+
+        async def first_two_chunks():
+            stream = stream_export("ndjson", ["id"], iter_deal_pages(fake.fetch_page, 2))
+            chunks = [await stream.__anext__(), await stream.__anext__()]
+            await stream.aclose()
+            return chunks
+
+        chunks = asyncio.run(first_two_chunks())
+        assert chunks[1] == b'{"id":3}\n{"id":4}\n'
+        assert fake.calls == [None, 2]
+
+    def test_csv_neutralizes_formulas(self):
+        row = {"id": 1, "deal_nickname": "=HYPERLINK(\"http://x\")", "payor_name": "@SUM(A1)",
+               "contact_phone": "+1 555", "brand_partner": "\tTab", "compensation_cash": -5.0, "contact_name": "Ann"}
+        fields = list(row)
+        cells = next(csv.reader(io.StringIO(csv_rows(fields, [row]).decode())))
+
+        assert cells == ["1", "'=HYPERLINK(\"http://x\")", "'@SUM(A1)", "'+1 555", "'\tTab", "-5.0", "Ann"]
+
+    def test_page_query_seeks_past_last_id(self, postgrest):
+        postgrest.data = [{"id": 5}]
+        page = asyncio.run(db.get_deals_after(USER_ID, "id,status", 4, 2, status="active"))
+
+        assert page == [{"id": 5}]
+        [query] = postgrest.queries
+        assert query.table == "deals"
+        assert query.calls == [
+            ("select", ("id,status",), {}), ("eq", ("user_id", USER_ID), {}), ("gt", ("id", 4), {}),
+            ("eq", ("status", "active"), {}), ("order", ("id",), {}), ("limit", (2,), {}),
+        ]
+
+    def test_first_page_has_no_seek(self, postgrest):
+        asyncio.run(db.get_deals_after(USER_ID, "id", None, 500))
+
+        assert [call[0] for call in postgrest.queries[0].calls] == ["select", "eq", "order", "limit"]
+
+class TestDealExportEndpoint:
+    """Test suite for GET /api/deals/export"""
+
+    def test_csv_export_flattens_json_columns(self, deals):
+        response = client.get("/api/deals/export")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="deals.csv"' in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig"))))
+        assert [row["id"] for row in rows] == ["1", "2", "3", "4", "5"]
+        assert rows[0]["deal_nickname"] == "deal, 1"
+        assert json.loads(rows[0]["compensation_goods"]) == [{"value": 1}]
+        assert rows[0]["fmv"] == "2.0"
+        assert rows[0]["contact_email"] == ""
+        assert deals.calls == [None, 2, 4]
+
+    def test_ndjson_export(self, deals):
+        response = client.get("/api/deals/export?format=ndjson")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 5
+        assert lines[4]["status_labels"] == ["Active"]
+        assert lines[4]["fmv"] == 6.0
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from postgrest import ReturnMethod
+
+try:
+    from backend.app.main import app
+    from backend.app.api import deals as deals_api
+    from backend.app.circuit_breaker import CircuitOpenError
+    from backend.app.database import db
+    from backend.app.deal_import import DealImportConfig, ImportFormatError, ImportRegistry, iter_records
+except ImportError:
+    # Handle import for different project structures
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from app.main import app
+    from app.api import deals as deals_api
+    from app.circuit_breaker import CircuitOpenError
+    from app.database import db
+    from app.deal_import import DealImportConfig, ImportFormatError, ImportRegistry, iter_records
+
+from conftest import USER_ID
+
+client = TestClient(app)
+
+CSV_BODY = (
+    "﻿deal_nickname,payor_name,compensation_cash,compensation_goods,status_labels\r\n"
+    'Shoe deal,Acme,500,"[{""value"": 250}]","[""Active""]"\r\n'
+    '"Camp, summer",Beta,100,,\r\n'
+    'Bad labels,Gamma,10,,"[""Nope""]"\r\n'
+    '"Multi\nline",Delta,,,\r\n'
+)
+
+async def collect(file_format, chunks):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+    return [record async for record in iter_records(file_format, stream())]
+
+class InsertedChunks(list):
+    """Inserted chunks in order, plus the users whose deal cache was invalidated"""
+
+    def __init__(self):
+        super().__init__()
+        self.invalidated = []
+
+    async def insert_deals(self, rows):
+        self.append([dict(row) for row in rows])
+        return len(rows)
+
+    async def invalidate_deal_cache(self, user_id):
+        self.invalidated.append(user_id)
+        return 0
+
+class SharedCache:
+    """Dict-backed stand-in for the Redis cache shared by the workers"""
+
+    def __init__(self):
+        self.entries = {}
+
+    async def get(self, key_type, identifier=""):
+        return self.entries.get((key_type, identifier))
+
+    async def set(self, key_type, data, identifier="", ttl=None):
+        self.entries[(key_type, identifier)] = json.loads(json.dumps(data))
+        return True
+
+@pytest.fixture
+def inserted(patch_db, monkeypatch):
+    chunks = InsertedChunks()
+    patch_db(insert_deals=chunks.insert_deals, invalidate_deal_cache=chunks.invalidate_deal_cache)
+    monkeypatch.setattr(DealImportConfig, "CHUNK_SIZE", 2)
+    return chunks
+
+class TestDealImportParsing:
+    """Test suite for incremental CSV/NDJSON parsing"""
+
+    def test_csv_split_across_tiny_chunks(self):
+        data = CSV_BODY.encode()
+        records = asyncio.run(collect("csv", [data[i:i + 3] for i in range(0, len(data), 3)]))
+
+        assert [number for number, _, _ in records] == [1, 2, 3, 4]
+        assert records[0][1]["compensation_goods"] == [{"value": 250}]
+        assert records[1][1] == {"deal_nickname": "Camp, summer", "payor_name": "Beta", "compensation_cash": "100"}
+        assert records[3][1]["deal_nickname"] == "Multi\nline"
+
+    def test_ndjson_reports_bad_lines(self):
+        body = b'{"deal_nickname": "a"}\n\nnot json\n[1]\n{"deal_nickname": "b"}'
+        records = asyncio.run(collect("ndjson", [body]))
+
+        assert [(n, r, e is not None) for n, r, e in records] == [
+            (1, {"deal_nickname": "a"}, False), (2, {}, True), (3, {}, True), (4, {"deal_nickname": "b"}, False)
+        ]
+
+    def test_registry_is_scoped_per_user(self):
+        registry = ImportRegistry()
+        mine = registry.create("user-a", "csv", "job")
+        theirs = registry.create("user-b", "csv", "job")
+
+        assert registry.get("job", "user-a") is mine
+        assert registry.get("job", "user-b") is theirs
+        with pytest.raises(ValueError):
+            registry.create("user-a", "csv", "job")
+
+    def test_trimming_keeps_running_imports(self, monkeypatch):
+        monkeypatch.setattr(DealImportConfig, "MAX_TRACKED_IMPORTS", 2)
+        registry = ImportRegistry()
+        running = registry.create("user-a", "csv", "running")
+        registry.create("user-a", "csv", "done").finish()
+        registry.create("user-a", "csv", "new")
+
+        assert registry.get("running", "user-a") is running
+        assert registry.get("done", "user-a") is None
+
+    def test_unterminated_quote_aborts(self):
+        with pytest.raises(ImportFormatError):
+            asyncio.run(collect("csv", [b'a,b\n"open,1\n']))
+
+    def test_insert_is_one_minimal_request(self, postgrest):
+        rows = [{"deal_nickname": "a"}, {"deal_nickname": "b", "compensation_cash": 5}]
+
+        assert asyncio.run(db.insert_deals(rows)) == 2
+        [query] = postgrest.queries
+        assert query.table == "deals"
+        # No representation is sent back, and missing columns keep their defaults instead of NULL
+        assert query.calls == [("insert", (rows,), {"returning": ReturnMethod.minimal, "default_to_null": False})]
+
+class TestDealImportEndpoint:
+    """Test suite for POST /api/deals/import"""
+
+    def test_csv_import_in_chunks(self, inserted):
+        response = client.post("/api/deals/import", content=CSV_BODY.encode(), headers={"Content-Type": "text/csv"})
+
+        assert response.status_code == 200
+        summary = response.json()
+        assert (summary["rows"], summary["inserted"], summary["failed"]) == (4, 3, 1)
+        assert summary["errors"][0]["row"] == 3
+        assert [len(chunk) for chunk in inserted] == [2, 1]
+        assert inserted.invalidated == [USER_ID]
+
+        first = inserted[0][0]
+        assert first["user_id"] == USER_ID
+        assert (first["status"], first["deal_type"], first["fmv"]) == ("draft", "simple", 750.0)
+
+    def test_ndjson_import_and_progress(self, inserted):
+        body = "\n".join(json.dumps({"deal_nickname": f"deal {i}", "compensation_cash": i}) for i in range(5))
+        response = client.post("/api/deals/import?format=ndjson&import_id=job-1", content=body.encode())
+
+        assert response.json()["inserted"] == 5
+        progress = client.get("/api/deals/import/job-1").json()
+        assert (progress["status"], progress["chunks"], progress["rows"]) == ("completed", 3, 5)
+
+    def test_progress_readable_from_another_worker(self, inserted, monkeypatch):
+        shared = SharedCache()
+        monkeypatch.setattr(db, "cache_manager", shared)
+        client.post("/api/deals/import?import_id=job-3", content=CSV_BODY.encode(), headers={"Content-Type": "text/csv"})
+
+        # A poll landing on a worker that did not run the import
+        monkeypatch.setattr(deals_api, "import_registry", ImportRegistry())
+        progress = client.get("/api/deals/import/job-3").json()
+
+        assert (progress["status"], progress["inserted"]) == ("completed", 3)
+        monkeypatch.setattr(db, "cache_manager", None)
+        assert client.get("/api/deals/import/job-3").status_code == 404
+
+    def test_unknown_format_rejected(self, inserted):
+        response = client.post("/api/deals/import", content=b"x", headers={"Content-Type": "application/pdf"})
+
+        assert response.status_code == 415
+
+    def test_circuit_open_while_aborting_marks_import_failed(self, inserted, monkeypatch):
+        async def breaker_open(rows):
+            raise CircuitOpenError("supabase", 30)
+
+        monkeypatch.setattr(db, "insert_deals", breaker_open)
+        body = b'deal_nickname\nfine\n"unterminated\n'
+        response = client.post("/api/deals/import?import_id=job-2", content=body, headers={"Content-Type": "text/csv"})
+
+        assert response.status_code == 503
+        progress = client.get("/api/deals/import/job-2").json()
+        assert (progress["status"], progress["detail"]) == ("failed", "Database unavailable")
+
+    @pytest.mark.parametrize("query", ["format=xml", "import_id=../../evil%20x"])
+    def test_invalid_query_rejected(self, inserted, query):
+        response = client.post(f"/api/deals/import?{query}", content=b"a\n1", headers={"Content-Type": "text/csv"})
+
+        assert response.status_code == 422
+        assert inserted == [] and inserted.invalidated == []
@@ -0,0 +1,176 @@
+import asyncio
+import os
+from fnmatch import fnmatchcase as fnmatch
+
+import pytest
+from fastapi.testclient import TestClient
+
+try:
+    from backend.app.main import app
+    from backend.app.cache import CacheManager
+    from backend.app.database import db
+    from backend.app.deal_projections import DEAL_COLUMNS, resolve_projection
+except ImportError:
+    # Handle import for different project structures
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from app.main import app
+    from app.cache import CacheManager
+    from app.database import db
+    from app.deal_projections import DEAL_COLUMNS, resolve_projection
+
+from conftest import USER_ID
+
+client = TestClient(app)
+
+class FakeDeals:
+    """In-memory stand-in for the batched deal queries, counting round trips"""
+
+    def __init__(self, rows):
+        self.rows = {row["id"]: row for row in rows}
+        self.reads = []
+        self.writes = []
+
+    async def get_deals_by_ids(self, user_id, deal_ids, fields):
+        self.reads.append((list(deal_ids), fields))
+        return {deal_id: dict(self.rows[deal_id]) for deal_id in deal_ids if deal_id in self.rows}
+
+    async def update_deals_with_cache_invalidation(self, user_id, updates):
+        self.writes.append(updates)
+        updated = {}
+        for deal_ids, update_data in updates:
+            for deal_id in deal_ids:
+                self.rows[deal_id].update(update_data)
+                updated[deal_id] = dict(self.rows[deal_id])
+        return updated, {}
+
+def make_row(deal_id, **fields):
+    return {"id": deal_id, "user_id": USER_ID, "status": "draft", "deal_type": "simple",
+            "created_at": "2026-01-01T00:00:00", **fields}
+
+class FakeCache:
+    """Always-missing query cache that records the keys read and the patterns invalidated"""
+
+    def __init__(self):
+        self.keys = []
+        self.invalidated = []
+
+    async def get(self, key_type, identifier=""):
+        self.keys.append(CacheManager()._generate_cache_key(key_type, identifier))
+        return None
+
+    async def set(self, key_type, data, identifier="", ttl=None):
+        return True
+
+    async def invalidate_pattern(self, pattern):
+        self.invalidated.append(pattern)
+        return 0
+
+@pytest.fixture
+def deals(patch_db):
+    fake = FakeDeals([make_row(1), make_row(2), make_row(3, compensation_cash=100)])
+    patch_db(get_deals_by_ids=fake.get_deals_by_ids,
+             update_deals_with_cache_invalidation=fake.update_deals_with_cache_invalidation)
+    return fake
+
+@pytest.fixture
+def cache(monkeypatch):
+    fake = FakeCache()
+    monkeypatch.setattr(db, "cache_manager", fake)
+    return fake
+
+class TestDealsBatchQueries:
+    """Test suite for the batched PostgREST queries behind the endpoint"""
+
+    def test_read_is_one_in_filter_scoped_to_user(self, postgrest):
+        postgrest.data = [make_row(1), make_row(2)]
+        rows = asyncio.run(db.get_deals_by_ids(USER_ID, [1, 2], "id,status"))
+
+        assert list(rows) == [1, 2]
+        [query] = postgrest.queries
+        assert query.table == "deals"
+        assert query.calls == [("select", ("id,status",), {}), ("in_", ("id", [1, 2]), {}),
+                               ("eq", ("user_id", USER_ID), {})]
+
+    def test_each_group_is_one_scoped_update_then_one_invalidation(self, postgrest, cache):
+        postgrest.data = [make_row(1), make_row(2)]
+        updated, failed = asyncio.run(db.update_deals_with_cache_invalidation(
+            USER_ID, [([1, 2], {"status": "active"}), ([3], {"status": "draft"})]
+        ))
+
+        assert [query.calls for query in postgrest.queries] == [
+            [("update", ({"status": "active"},), {}), ("in_", ("id", [1, 2]), {}), ("eq", ("user_id", USER_ID), {})],
+            [("update", ({"status": "draft"},), {}), ("in_", ("id", [3]), {}), ("eq", ("user_id", USER_ID), {})],
+        ]
+        assert list(updated) == [1, 2]
+        assert failed == {3: "Deal update failed"}
+        # Once per user, covering the keys the deal list is cached under
+        assert cache.invalidated == [f"fairplay_cache:query:user_{USER_ID}_*",
+                                     f"fairplay_cache:query:deals_with_profile:{USER_ID}:*"]
+
+    @pytest.mark.parametrize("query", [
+        {},
+        # Sparse fieldsets made the key long enough for the cache to hash it whole
+        {"fields": resolve_projection(fields=",".join(DEAL_COLUMNS)).select,
+         "projection": resolve_projection(fields=",".join(DEAL_COLUMNS)).cache_key, "status": "active"},
+    ])
+    def test_invalidation_covers_the_cached_list(self, postgrest, cache, query):
+        postgrest.data = [make_row(1)]
+        asyncio.run(db.get_deals_paginated_with_profile(USER_ID, **query))
+        asyncio.run(db.update_deals_with_cache_invalidation(USER_ID, [([1], {"status": "active"})]))
+
+        [list_key] = cache.keys
+        assert any(fnmatch(list_key, pattern) for pattern in cache.invalidated)
+
+    def test_nothing_updated_leaves_cache_alone(self, postgrest, cache):
+        asyncio.run(db.update_deals_with_cache_invalidation(USER_ID, [([9], {"status": "active"})]))
+
+        assert cache.invalidated == []
+
+class TestDealsBatchUpdate:
+    """Test suite for PATCH /api/deals/batch"""
+
+    def test_identical_changes_share_one_write(self, deals):
+        response = client.patch("/api/deals/batch", json={"items": [
+            {"id": 1, "changes": {"status_labels": ["Active"]}},
+            {"id": 2, "changes": {"status_labels": ["Active"]}},
+        ]})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["updated"], body["failed"]) == (2, 0)
+        assert [r["deal"]["status_labels"] for r in body["results"]] == [["Active"], ["Active"]]
+        assert len(deals.reads) == 1
+        assert len(deals.writes) == 1 and deals.writes[0][0][0] == [1, 2]
+
+    def test_per_item_errors_do_not_fail_the_batch(self, deals):
+        response = client.patch("/api/deals/batch", json={"items": [
+            {"id": 1, "changes": {"status_labels": ["Bogus"]}},
+            {"id": 99, "changes": {"status": "active"}},
+            {"id": 2, "changes": {}},
+            {"id": 3, "changes": {"status": "active"}},
+            {"id": 3, "changes": {"status": "draft"}},
+        ]})
+
+        results = response.json()["results"]
+        assert [(r["id"], r["status"], r.get("status_code")) for r in results] == [
+            (1, "error", 422), (99, "error", 404), (2, "error", 400), (3, "updated", None), (3, "error", 400)
+        ]
+
+    def test_fmv_recomputed_from_one_pre_read(self, deals):
+        response = client.patch("/api/deals/batch", json={"items": [
+            {"id": 2, "changes": {"compensation_cash": 50}},
+            {"id": 3, "changes": {"compensation_goods": [{"value": 25}]}},
+        ]})
+
+        results = response.json()["results"]
+        assert [r["deal"]["fmv"] for r in results] == [50.0, 125.0]
+        assert len(deals.reads) == 1 and "compensation_cash" in deals.reads[0][1]
+        # Different FMVs mean different payloads, so one write each
+        assert len(deals.writes[0]) == 2
+
+    def test_batch_size_is_capped(self, deals):
+        items = [{"id": i, "changes": {"status": "active"}} for i in range(101)]
+
+        assert client.patch("/api/deals/batch", json={"items": items}).status_code == 422
+        assert client.patch("/api/deals/batch", json={"items": []}).status_code == 422
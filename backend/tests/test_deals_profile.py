@@ -0,0 +1,73 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+try:
+    from backend.app.main import app
+    from backend.app.deal_projections import flatten_profile
+except ImportError:
+    # Handle import for different project structures
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from app.main import app
+    from app.deal_projections import flatten_profile
+
+from conftest import USER_ID
+
+client = TestClient(app)
+
+PROFILE = {
+    "id": USER_ID, "full_name": "Sam Lee", "university": "State", "sports": ["Soccer", "Track"],
+    "division": "I", "gender": "female", "email": "sam@example.com", "phone": "555-0100",
+    "role": "athlete", "avatar_url": None, "social_media_completed": True,
+}
+
+@pytest.fixture
+def deals(patch_db):
+    calls = {"list": [], "profile": 0}
+
+    async def fake_list(**kwargs):
+        calls["list"].append(kwargs)
+        return {"deals": [{"id": i, "deal_nickname": f"deal {i}", "fmv": 1.0} for i in range(3)], "pagination": {}}
+
+    async def fake_profile(user_id):
+        calls["profile"] += 1
+        return dict(PROFILE)
+
+    patch_db(get_deals_paginated_with_profile=fake_list, get_profile_cached=fake_profile)
+    return calls
+
+class TestDealsIncludedProfile:
+    """Test suite for the profile block of GET /api/deals"""
+
+    def test_included_profile_sent_once(self, deals):
+        body = client.get("/api/deals?view=summary&profile=included").json()
+
+        assert body["included"]["profile"]["full_name"] == "Sam Lee"
+        assert "social_media_completed" not in body["included"]["profile"]
+        assert "school" not in body["deals"][0]
+        assert deals["profile"] == 1
+        assert deals["list"][0]["join_profile"] is False
+
+    def test_legacy_flatten_is_default(self, deals):
+        body = client.get("/api/deals").json()
+
+        deal = body["deals"][2]
+        assert "included" not in body
+        assert (deal["athlete_name"], deal["school"], deal["sport"]) == ("Sam Lee", "State", "Soccer, Track")
+        assert deal["description"] == "deal 2"
+        assert deals["list"][0]["join_profile"] is False
+
+    @pytest.mark.parametrize("query", ["view=summary", "fields=status,fmv", "view=detail"])
+    def test_explicit_projection_is_not_flattened(self, deals, query):
+        body = client.get(f"/api/deals?{query}").json()
+
+        assert "school" not in body["deals"][0] and "athlete_name" not in body["deals"][0]
+        assert deals["profile"] == 0
+
+    def test_flatten_without_profile_uses_defaults(self):
+        deal = {"deal_nickname": "x"}
+        flatten_profile(deal, {})
+
+        assert (deal["school"], deal["sports"], deal["description"]) == ("", [], "x")
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+
+try:
+    from backend.app.monitoring.health import HealthChecker, HealthResult, HealthStatus, SystemHealthMonitor
+    from backend.app.monitoring.metrics import metrics_collector
+except ImportError:
+    # Handle import for different project structures
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from app.monitoring.health import HealthChecker, HealthResult, HealthStatus, SystemHealthMonitor
+    from app.monitoring.metrics import metrics_collector
+
+def make_monitor(intervals, timeout=1.0):
+    monitor = SystemHealthMonitor()
+    monitor.config.INTERVALS = intervals
+    monitor.config.TIMEOUT_SECONDS = timeout
+    calls = {name: 0 for name in intervals}
+
+    def probe(name, delay=0.0):
+        async def check():
+            calls[name] += 1
+            await asyncio.sleep(delay)
+            return HealthResult(service=name, status=HealthStatus.HEALTHY, response_time_ms=1.0, message="ok")
+        return check
+
+    monitor._checks = {name: probe(name) for name in intervals}
+    return monitor, calls, probe
+
+class TestHealthProbeScheduler:
+    """Test suite for background health probes with cached results"""
+
+    def test_endpoints_read_cached_results(self):
+        """Once the scheduler has run, reads do not trigger probes"""
+        monitor, calls, _ = make_monitor({"database": 60, "system": 60})
+
+        async def scenario():
+            await monitor.start()
+            await asyncio.sleep(0.05)
+            first = await monitor.get_comprehensive_health()
+            second = await monitor.get_comprehensive_health()
+            await monitor.stop()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+
+        assert calls == {"database": 1, "system": 1}
+        assert second["cached"] is True
+        assert second["services"]["database"]["age_seconds"] >= 0
+        assert second["services"]["database"]["stale"] is False
+        assert len(monitor.get_health_history()) == 1
+
+    def test_probes_rerun_on_their_own_interval(self):
+        """A short-interval probe runs repeatedly while a long one runs once"""
+        monitor, calls, _ = make_monitor({"database": 0.5, "system": 60})
+
+        async def scenario():
+            await monitor.start()
+            await asyncio.sleep(1.2)
+            await monitor.stop()
+
+        asyncio.run(scenario())
+
+        assert calls["database"] >= 2
+        assert calls["system"] == 1
+
+    def test_history_records_only_probed_services(self):
+        """Cached results are not re-counted in history and trends every round"""
+        monitor, calls, _ = make_monitor({"database": 0.5, "system": 60})
+
+        async def scenario():
+            await monitor.start()
+            await asyncio.sleep(1.2)
+            await monitor.stop()
+
+        asyncio.run(scenario())
+
+        history = monitor.get_health_history(limit=100)
+        assert len(history) == calls["database"]
+        assert sum("system" in entry["services"] for entry in history) == 1
+        trends = monitor.get_health_trends()["service_trends"]
+        assert trends["system"]["total_checks"] == 1
+        assert trends["database"]["total_checks"] == calls["database"]
+
+    def test_slow_probe_times_out_as_critical(self):
+        """A probe exceeding the timeout is reported critical"""
+        monitor, _, probe = make_monitor({"redis": 60}, timeout=0.05)
+        monitor._checks["redis"] = probe("redis", delay=1.0)
+
+        health = asyncio.run(monitor.get_comprehensive_health())
+
+        assert health["overall_status"] == "critical"
+        assert "timed out" in health["services"]["redis"]["message"]
+
+    def test_results_are_exported_as_gauges(self):
+        """Probe results land in the registry for alert rules to read"""
+        monitor, _, _ = make_monitor({"redis": 60}, timeout=0.05)
+        monitor._checks["redis"] = lambda: asyncio.sleep(1)
+
+        asyncio.run(monitor.run_checks())
+
+        registry = metrics_collector.registry
+        assert registry.get("health_check_status").labels("redis").get() == 3
+        assert registry.get("health_check_response_time_ms").labels("redis").get() >= 50
+
+    def test_without_scheduler_checks_run_inline(self):
+        """Without start(), each call probes (the previous behaviour)"""
+        monitor, calls, _ = make_monitor({"database": 60})
+
+        asyncio.run(monitor.get_comprehensive_health())
+        asyncio.run(monitor.get_comprehensive_health())
+
+        assert calls["database"] == 2
+
+    def test_system_sampling_runs_off_the_event_loop(self, monkeypatch):
+        """Blocking psutil reads happen in a worker thread"""
+        threads = []
+
+        def fake_sample():
+            threads.append(threading.current_thread())
+            memory = type("Memory", (), {"percent": 10.0, "available": 1024 ** 3})()
+            disk = type("Disk", (), {"percent": 10.0, "free": 1024 ** 3})()
+            return 5.0, memory, disk, 10
+
+        monkeypatch.setattr(HealthChecker, "_sample_system_resources", staticmethod(fake_sample))
+
+        result = asyncio.run(HealthChecker().check_system_resources())
+
+        assert result.status == HealthStatus.HEALTHY
+        assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,97 @@
+import pytest
+from fastapi.testclient import TestClient
+
+try:
+    from backend.app.main import app
+    from backend.app.monitoring.memory import MemoryProfiler, SnapshotNotFoundError, TracingNotStartedError
+    from backend.app.monitoring.metrics import metrics_collector
+except ImportError:
+    # Handle import for different project structures
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from app.main import app
+    from app.monitoring.memory import MemoryProfiler, SnapshotNotFoundError, TracingNotStartedError
+    from app.monitoring.metrics import metrics_collector
+
+client = TestClient(app)
+ADMIN = {"X-Admin-Token": "secret"}
+
+def allocate_growth():
+    return [bytearray(1024) for _ in range(2000)]
+
+@pytest.fixture
+def profiler():
+    profiler = MemoryProfiler()
+    yield profiler
+    profiler.stop_tracing()
+
+class TestMemoryProfiler:
+    """Test suite for tracemalloc snapshot diffs"""
+
+    def test_diff_points_at_growing_line(self, profiler):
+        """The allocation site of new objects tops the diff"""
+        profiler.start_tracing()
+        profiler.take_snapshot("before")
+        retained = allocate_growth()
+        profiler.take_snapshot("after")
+
+        diff = profiler.compare("before", "after", top=5)
+
+        assert diff["top"][0]["file"].endswith("test_memory_profiler.py")
+        assert diff["top"][0]["size_diff_bytes"] >= 2000 * 1024
+        assert len(retained) == 2000
+
+    def test_snapshot_requires_tracing(self, profiler):
+        """Snapshots cannot be taken while tracemalloc is off"""
+        with pytest.raises(TracingNotStartedError):
+            profiler.take_snapshot("before")
+
+    def test_unknown_snapshot(self, profiler):
+        """Diffs against unknown names fail clearly"""
+        profiler.start_tracing()
+        profiler.take_snapshot("before")
+        with pytest.raises(SnapshotNotFoundError):
+            profiler.compare("before", "missing")
+
+    def test_snapshots_are_bounded(self, profiler):
+        """Only the most recent MAX_SNAPSHOTS snapshots are kept"""
+        profiler.start_tracing()
+        for i in range(profiler.config.MAX_SNAPSHOTS + 2):
+            profiler.take_snapshot(f"s{i}")
+
+        names = [s["name"] for s in profiler.list_snapshots()]
+        assert len(names) == profiler.config.MAX_SNAPSHOTS
+        assert names[0] == "s2"
+
+    def test_gauges_exported(self, profiler):
+        """RSS and heap gauges reach the metrics registry"""
+        values = profiler.update_gauges()
+
+        assert values["rss_bytes"] > 0
+        rss = metrics_collector.registry.get("process_resident_memory_bytes").values()
+        assert max(rss.values()) > 0
+
+class TestMemoryEndpoints:
+    """Test suite for the admin memory routes"""
+
+    def test_snapshot_diff_flow(self, monkeypatch):
+        """Start, snapshot twice, diff and stop through the API"""
+        monkeypatch.setenv("ADMIN_API_TOKEN", "secret")
+        try:
+            assert client.post("/monitoring/memory/start", headers=ADMIN).json()["tracing"] is True
+            assert client.post("/monitoring/memory/snapshots/a", headers=ADMIN).status_code == 200
+            assert client.post("/monitoring/memory/snapshots/b", headers=ADMIN).status_code == 200
+
+            response = client.get("/monitoring/memory/diff?base=a&target=b&top=3", headers=ADMIN)
+            assert response.status_code == 200
+            assert len(response.json()["top"]) <= 3
+            assert client.get("/monitoring/memory/diff?base=a&target=zz", headers=ADMIN).status_code == 404
+            assert client.get("/monitoring/memory/diff?base=a&target=b&group_by=bogus", headers=ADMIN).status_code == 422
+        finally:
+            client.post("/monitoring/memory/stop", headers=ADMIN)
+
+    def test_requires_admin(self, monkeypatch):
+        """Memory routes are admin-only"""
+        monkeypatch.setenv("ADMIN_API_TOKEN", "secret")
+        assert client.post("/monitoring/memory/start").status_code == 403
@@ -0,0 +1,374 @@
+import asyncio
+import os
+import time
+import pytest
+
+try:
+    from backend.app import cache as cache_module
+    from backend.app.monitoring.histogram import Histogram
+    from backend.app.monitoring.metrics import MetricsCollector, PrometheusExporter
+    from backend.app.monitoring.sketch import QuantileSketch
+    from backend.app.monitoring.rolling import RequestWindows
+    from backend.app.monitoring.registry import MetricsRegistry
+    from backend.app.monitoring.hyperloglog import HyperLogLog, ActiveUserWindows
+except ImportError:
+    # Handle import for different project structures
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from app import cache as cache_module
+    from app.monitoring.histogram import Histogram
+    from app.monitoring.metrics import MetricsCollector, PrometheusExporter
+    from app.monitoring.sketch import QuantileSketch
+    from app.monitoring.rolling import RequestWindows
+    from app.monitoring.registry import MetricsRegistry
+    from app.monitoring.hyperloglog import HyperLogLog, ActiveUserWindows
+
+class TestHistogram:
+    """Test suite for fixed-bucket histograms"""
+
+    def test_memory_is_constant_per_label_set(self):
+        """Many observations only update the existing bucket array"""
+        histogram = Histogram("latency_seconds", ("endpoint",), buckets=(0.1, 1.0))
+        for i in range(10_000):
+            histogram.observe((i % 20) / 10, ("/api/deals",))
+
+        series = histogram.series()
+        assert len(series) == 1
+        counts, total, count = series[("/api/deals",)]
+        assert len(counts) == 3
+        assert count == 10_000
+        assert sum(counts) == 10_000
+
+    def test_bucket_boundaries_are_inclusive(self):
+        """A value equal to an upper bound lands in that bucket (le semantics)"""
+        histogram = Histogram("latency_seconds", (), buckets=(0.1, 1.0))
+        histogram.observe(0.1)
+        histogram.observe(1.0)
+        histogram.observe(5.0)
+
+        counts, total, count = histogram.series()[()]
+        assert counts == [1, 1, 1]
+        assert total == 6.1
+
+    def test_prometheus_output_is_cumulative(self):
+        """Exported buckets are cumulative and end with +Inf, _sum and _count"""
+        histogram = Histogram("latency_seconds", ("endpoint",), "Latency", buckets=(0.1, 1.0))
+        histogram.observe(0.05, ("/a",))
+        histogram.observe(0.5, ("/a",))
+        histogram.observe(2.0, ("/a",))
+
+        lines = histogram.to_prometheus()
+        assert "# TYPE latency_seconds histogram" in lines
+        assert 'latency_seconds_bucket{endpoint="/a",le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{endpoint="/a",le="1.0"} 2' in lines
+        assert 'latency_seconds_bucket{endpoint="/a",le="+Inf"} 3' in lines
+        assert 'latency_seconds_sum{endpoint="/a"} 2.55' in lines
+        assert 'latency_seconds_count{endpoint="/a"} 3' in lines
+
+    def test_label_values_are_escaped(self):
+        """Quotes and backslashes in label values are escaped"""
+        histogram = Histogram("latency_seconds", ("endpoint",), buckets=(1.0,))
+        histogram.observe(0.5, ('/a"b\\c',))
+
+        assert any('endpoint="/a\\"b\\\\c"' in line for line in histogram.to_prometheus())
+
+    def test_snapshots_merge_bucketwise(self):
+        """Merging adds bucket counts, sums and counts"""
+        first = Histogram("latency_seconds", ("endpoint",), buckets=(0.1, 1.0))
+        second = Histogram("latency_seconds", ("endpoint",), buckets=(0.1, 1.0))
+        first.observe(0.05, ("/a",))
+        second.observe(0.5, ("/a",))
+        second.observe(0.5, ("/b",))
+
+        first.merge_snapshot(second.snapshot())
+
+        series = first.series()
+        assert series[("/a",)] == ([1, 1, 0], 0.55, 2)
+        assert series[("/b",)] == ([0, 1, 0], 0.5, 1)
+
+class TestMetricsCollectorHistograms:
+    """Test suite for the collector's request/query histograms"""
+
+    def test_request_durations_exported_as_histogram(self):
+        """Recorded requests appear as _bucket/_sum/_count series"""
+        collector = MetricsCollector()
+        for _ in range(3):
+            collector.record_request_duration("/api/deals", "GET", 200, 0.02, "athlete")
+        collector.record_database_query("get_deals", 0.3, True)
+
+        text = PrometheusExporter(collector).generate_prometheus_metrics()
+
+        labels = 'endpoint="/api/deals",method="GET",status_code="200",user_role="athlete"'
+        assert f"http_request_duration_seconds_count{{{labels}}} 3" in text
+        assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in text
+        assert 'database_query_duration_seconds_count{query_type="get_deals",status="success"} 1' in text
+
+class FakeRedis:
+    """Async Redis stand-in holding one key"""
+
+    def __init__(self, key, value):
+        self.store = {key: value}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+
+class TestCacheOperationMetrics:
+    """Cache reads feed the counter the cache_hit_rate rule reads"""
+
+    def test_reads_are_counted_by_result(self, monkeypatch):
+        collector = MetricsCollector()
+        monkeypatch.setattr(cache_module, "metrics_collector", collector)
+        manager = cache_module.CacheManager()
+        manager.redis_client = FakeRedis("fairplay_cache:query:hit", b'{"a": 1}')
+
+        async def scenario():
+            await manager.get("query", "hit")
+            await manager.get("query", "miss")
+            await manager.set("query", {"b": 2}, "other")
+
+        asyncio.run(scenario())
+
+        assert collector.registry.get("cache_operations_total").values() == {("get", "hit"): 1, ("get", "miss"): 1}
+        assert collector.get_performance_metrics()["cache_metrics"]["hit_rate"] == 50.0
+
+class TestQuantileSketch:
+    """Test suite for streaming quantile sketches"""
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Estimates stay within the configured relative error of the exact quantile"""
+        values = [i / 1000 for i in range(1, 10_001)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        for q in (0.5, 0.95, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            assert abs(sketch.quantile(q) - exact) <= exact * 0.01 + 1e-12
+
+    def test_merged_sketch_matches_single_sketch(self):
+        """Merging per-worker sketches equals sketching the combined stream"""
+        combined = QuantileSketch(relative_accuracy=0.02)
+        parts = [QuantileSketch(relative_accuracy=0.02) for _ in range(3)]
+        for i in range(3000):
+            value = (i % 97 + 1) / 100
+            combined.add(value)
+            parts[i % 3].add(value)
+
+        merged = QuantileSketch(relative_accuracy=0.02)
+        for part in parts:
+            merged.merge(QuantileSketch.from_dict(part.to_dict()))
+
+        assert merged.count == combined.count
+        for q in (0.5, 0.95, 0.99):
+            assert merged.quantile(q) == combined.quantile(q)
+
+    def test_bins_are_bounded(self):
+        """Bin count never exceeds max_bins and upper quantiles stay accurate"""
+        sketch = QuantileSketch(relative_accuracy=0.01, max_bins=64)
+        for i in range(1, 100_000, 7):
+            sketch.add(i / 1000)
+
+        assert len(sketch.bins) <= 64
+        assert abs(sketch.quantile(0.99) - 99.0) <= 99.0 * 0.02
+
+    def test_mismatched_accuracy_cannot_merge(self):
+        """Sketches with different accuracy refuse to merge"""
+        with pytest.raises(ValueError):
+            QuantileSketch(relative_accuracy=0.01).merge(QuantileSketch(relative_accuracy=0.05))
+
+    def test_performance_metrics_report_per_route_and_query_percentiles(self):
+        """Collector percentiles come from sketches, overall and per label"""
+        collector = MetricsCollector()
+        for i in range(100):
+            collector.record_request_duration("/api/deals", "GET", 200, 0.01 * (i + 1))
+        collector.record_database_query("get_deals", 0.05, True)
+
+        metrics = collector.get_performance_metrics()
+
+        assert set(metrics["response_time_percentiles"]) == {"p50", "p95", "p99"}
+        assert abs(metrics["response_time_percentiles"]["p50"] - 500) <= 10
+        assert "/api/deals" in metrics["endpoint_response_time_percentiles"]
+        assert abs(metrics["query_time_percentiles"]["get_deals"]["p99"] - 50) <= 1
+
+class TestRollingWindows:
+    """Test suite for ring-buffer request windows"""
+
+    def test_windows_count_only_recent_requests(self):
+        """Each window only includes requests inside its time span"""
+        windows = RequestWindows()
+        now = 1_000_000.0
+        windows.record(0.1, 200, now - 3000)   # inside 1h only
+        windows.record(0.2, 500, now - 200)    # inside 5m and 1h
+        windows.record(0.3, 200, now - 10)     # inside every window
+
+        summary = windows.summary(now)
+
+        assert summary["1m"]["requests"] == 1
+        assert summary["5m"]["requests"] == 2
+        assert summary["5m"]["error_rate"] == 50.0
+        assert summary["1h"]["requests"] == 3
+        assert summary["1h"]["average_response_time"] == 200.0
+
+    def test_slots_expire_when_reused(self):
+        """Old slots are cleared rather than accumulated once the ring wraps"""
+        windows = RequestWindows()
+        now = 1_000_000.0
+        windows.record(0.1, 200, now - 7200)
+        windows.record(0.1, 200, now)
+
+        assert windows.window(3600, now)["count"] == 1
+        assert windows.window(60, now + 120)["count"] == 0
+
+    def test_windows_merge_by_slot(self):
+        """Merging adds matching slots and keeps the status breakdown"""
+        now = time.time()
+        first, second = RequestWindows(), RequestWindows()
+        first.record(0.1, 200, now)
+        second.record(0.3, 404, now)
+
+        first.merge_dict(second.to_dict())
+
+        hour = first.window(3600, now)
+        assert hour["count"] == 2
+        assert hour["errors"] == 1
+        assert hour["statuses"] == {200: 1, 404: 1}
+
+    def test_request_metrics_read_from_windows(self):
+        """Collector request metrics keep their shape and add per-window stats"""
+        collector = MetricsCollector()
+        collector.record_request_duration("/api/deals", "GET", 200, 0.1)
+        collector.record_request_duration("/api/deals", "GET", 500, 0.3)
+
+        metrics = collector.get_request_metrics()
+
+        assert metrics["requests_per_minute"]["/api/deals"] == 2
+        assert metrics["requests_per_hour"]["/api/deals"] == 2
+        assert metrics["average_response_time"]["/api/deals"] == 200.0
+        assert metrics["error_rates"]["/api/deals"] == 50.0
+        assert metrics["status_code_distribution"] == {200: 1, 500: 1}
+        assert set(metrics["windows"]["/api/deals"]) == {"1m", "5m", "1h"}
+
+class TestMetricsRegistry:
+    """Test suite for the typed metric registry"""
+
+    def test_bound_children_share_state(self):
+        """A pre-bound child and a fresh labels() lookup update the same series"""
+        registry = MetricsRegistry()
+        counter = registry.counter("jobs_total", "Jobs", ("queue",))
+        bound = counter.labels("emails")
+
+        bound.inc()
+        counter.labels("emails").inc(2)
+
+        assert counter.values() == {("emails",): 3.0}
+
+    def test_redeclaring_with_different_labels_fails(self):
+        """A family name maps to one type and label set"""
+        registry = MetricsRegistry()
+        registry.counter("jobs_total", label_names=("queue",))
+
+        assert registry.counter("jobs_total", label_names=("queue",)) is registry.get("jobs_total")
+        with pytest.raises(ValueError):
+            registry.gauge("jobs_total", label_names=("queue",))
+        with pytest.raises(ValueError):
+            registry.counter("jobs_total").labels()
+
+    def test_all_families_exported_with_labels(self):
+        """Counters, gauges and histograms are rendered with real label sets"""
+        registry = MetricsRegistry()
+        registry.counter("jobs_total", "Jobs", ("queue",)).labels("emails").inc()
+        registry.gauge("queue_depth", "Depth", ("queue",)).labels("emails").set(4)
+        registry.histogram("job_seconds", "Job time", ("queue",), buckets=(1.0,)).labels("emails").observe(0.5)
+
+        lines = registry.to_prometheus()
+
+        assert "# TYPE jobs_total counter" in lines
+        assert 'jobs_total{queue="emails"} 1.0' in lines
+        assert 'queue_depth{queue="emails"} 4' in lines
+        assert 'job_seconds_count{queue="emails"} 1' in lines
+
+    def test_snapshot_merge_declares_unknown_families(self):
+        """Merging re-creates families seen only in another worker"""
+        source = MetricsRegistry()
+        source.counter("jobs_total", "Jobs", ("queue",)).labels("emails").inc(5)
+        target = MetricsRegistry()
+        target.counter("jobs_total", "Jobs", ("queue",)).labels("emails").inc(1)
+        source.gauge("queue_depth").set(3)
+
+        target.merge_snapshot(source.snapshot())
+
+        assert target.get("jobs_total").values() == {("emails",): 6.0}
+        assert target.get("queue_depth").labels().get() == 3
+
+    def test_collector_dynamic_counters_are_exported(self):
+        """increment_counter/set_gauge metrics now reach the Prometheus output"""
+        collector = MetricsCollector()
+        collector.increment_counter("deals_created_total", labels={"deal_type": "social"})
+        collector.set_gauge("queue_depth", 2, labels={"queue": "emails"})
+        collector.record_error_rate("/api/deals", "client_error", "athlete")
+
+        text = PrometheusExporter(collector).generate_prometheus_metrics()
+
+        assert 'deals_created_total{deal_type="social"} 1.0' in text
+        assert 'queue_depth{queue="emails"} 2' in text
+        assert 'http_errors_total{endpoint="/api/deals",error_type="client_error",user_role="athlete"} 1.0' in text
+        assert collector.get_performance_metrics()["total_errors"] == 1
+
+class TestHyperLogLog:
+    """Test suite for HyperLogLog active-user estimation"""
+
+    def test_estimate_within_error_bound(self):
+        """Estimates stay within a few standard errors of the true count"""
+        sketch = HyperLogLog(precision=12)
+        for i in range(20_000):
+            sketch.add(f"user-{i}")
+            sketch.add(f"user-{i}")  # duplicates do not change the estimate
+
+        assert abs(sketch.count() - 20_000) <= 20_000 * 0.05
+        assert len(sketch.registers) == 4096
+
+    def test_small_cardinalities_are_exact_enough(self):
+        """Linear counting keeps small counts close to exact"""
+        sketch = HyperLogLog(precision=12)
+        for i in range(25):
+            sketch.add(f"user-{i}")
+
+        assert sketch.count() == 25
+
+    def test_merge_is_a_union(self):
+        """Merging sketches counts overlapping users once"""
+        first, second = HyperLogLog(precision=10), HyperLogLog(precision=10)
+        for i in range(500):
+            first.add(f"user-{i}")
+        for i in range(250, 750):
+            second.add(f"user-{i}")
+
+        first.merge(HyperLogLog.from_dict(second.to_dict()))
+
+        assert abs(first.count() - 750) <= 750 * 0.1
+
+    def test_windows_expire_old_users(self):
+        """Each window only counts users seen inside it"""
+        windows = ActiveUserWindows(precision=10)
+        now = 1_000_000 * 3600.0
+        windows.add("early", now - 7200)
+        windows.add("recent", now - 1800)
+        windows.add("current", now - 10)
+
+        assert windows.counts(now) == {"5m": 1, "1h": 2, "24h": 3}
+
+    def test_collector_active_users_merge_across_workers(self):
+        """Worker snapshots union their active-user sketches"""
+        first, second = MetricsCollector(), MetricsCollector()
+        first.record_user_activity("user-1", "athlete", "request")
+        second.record_user_activity("user-1", "athlete", "request")
+        second.record_user_activity("user-2", "brand", "request")
+
+        merged = MetricsCollector.merge_snapshots([first.snapshot(), second.snapshot()])
+        user_metrics = merged.get_user_metrics()
+
+        assert user_metrics["active_users"] == {"5m": 2, "1h": 2, "24h": 2}
+        assert 'active_users_estimate{window="24h"} 2' in PrometheusExporter(merged).generate_prometheus_metrics()
@@ -0,0 +1,73 @@
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+try:
+    from backend.app.responses import FastJSONResponse, project_row, trusted_response
+    from backend.app.schemas import DealResponse
+except ImportError:
+    # Handle import for different project structures
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from app.responses import FastJSONResponse, project_row, trusted_response
+    from app.schemas import DealResponse
+
+DEAL_ROW = {
+    "id": 1,
+    "user_id": "00000000-0000-0000-0000-00000000002a",
+    "status": "draft",
+    "created_at": "2025-01-01T00:00:00+00:00",
+    "deal_type": "simple",
+    "compensation_cash": 500.0,
+    "unexpected_column": "dropped",
+}
+
+
+class TestFastJSONResponse:
+    """Test suite for the orjson response class"""
+
+    def test_renders_native_and_fallback_types(self):
+        """datetime/UUID are native to orjson; Decimal, sets and int keys use the fallbacks"""
+        content = {
+            "when": datetime(2025, 1, 1, 12, 0, 0),
+            "id": uuid.UUID(int=1),
+            "amount": Decimal("12.50"),
+            "tags": {"a"},
+            "status_codes": {200: 3},
+        }
+        body = json.loads(FastJSONResponse(content=content).body)
+
+        assert body["when"] == "2025-01-01T12:00:00"
+        assert body["id"] == str(uuid.UUID(int=1))
+        assert body["amount"] == 12.5
+        assert body["tags"] == ["a"]
+        assert body["status_codes"] == {"200": 3}
+
+
+class TestTrustedRows:
+    """Test suite for the trusted-row fast path"""
+
+    def test_project_row_matches_model_shape(self):
+        """Projection keeps exactly the response model's fields"""
+        projected = project_row(DEAL_ROW, DealResponse)
+
+        assert set(projected) == set(DealResponse.__fields__)
+        assert "unexpected_column" not in projected
+        assert projected["deal_nickname"] is None
+        assert projected["compensation_cash"] == 500.0
+
+    def test_trusted_response_matches_validated_model(self):
+        """Fast path output is equivalent to validating through the model"""
+        fast = json.loads(trusted_response(DEAL_ROW, DealResponse).body)
+        legacy = json.loads(DealResponse(**DEAL_ROW).json())
+
+        assert fast == legacy
+
+    def test_trusted_response_without_model(self):
+        """Payloads without a model are serialized as-is"""
+        response = trusted_response({"deals": [], "pagination": {}}, status_code=201)
+
+        assert response.status_code == 201
+        assert json.loads(response.body) == {"deals": [], "pagination": {}}
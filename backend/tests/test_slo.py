@@ -0,0 +1,149 @@
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+try:
+    from backend.app.main import app
+    from backend.app.monitoring.alert_rules import load_rules
+    from backend.app.monitoring.dashboard import AlertManager
+    from backend.app.monitoring.metrics import metrics_collector
+    from backend.app.monitoring.slo import SLO, SLOTracker, load_slos
+except ImportError:
+    # Handle import for different project structures
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from app.main import app
+    from app.monitoring.alert_rules import load_rules
+    from app.monitoring.dashboard import AlertManager
+    from app.monitoring.metrics import metrics_collector
+    from app.monitoring.slo import SLO, SLOTracker, load_slos
+
+client = TestClient(app)
+
+NOW = 1_700_000_000.0
+
+def make_tracker():
+    return SLOTracker([
+        SLO(name="deals_latency", route="/api/deals", method="GET", kind="latency", target=0.95, threshold_ms=300),
+        SLO(name="deals_availability", route="/api/deals", kind="availability", target=0.999),
+    ])
+
+def record(tracker, count, status_code=200, duration=0.05, now=NOW, method="GET"):
+    for _ in range(count):
+        tracker.record("/api/deals", method, status_code, duration, now=now)
+
+class TestSLOTracker:
+    """Test suite for SLO accounting and burn rates"""
+
+    def test_latency_burn_rate(self):
+        tracker = make_tracker()
+        record(tracker, 90)
+        record(tracker, 10, duration=0.5)
+
+        window = tracker.get_status(now=NOW)["deals_latency"]["windows"]["5m"]
+
+        # 10% slow against a 5% budget burns at 2x
+        assert window == {"requests": 100, "bad": 10, "burn_rate": 2.0}
+
+    def test_availability_counts_only_5xx(self):
+        tracker = make_tracker()
+        record(tracker, 997)
+        record(tracker, 2, status_code=404)
+        record(tracker, 1, status_code=503)
+
+        status = tracker.get_status(now=NOW)["deals_availability"]
+
+        assert status["windows"]["1h"]["bad"] == 1
+        assert status["windows"]["1h"]["burn_rate"] == pytest.approx(1.0)
+        assert status["period"]["compliance"] == pytest.approx(0.999)
+        assert status["period"]["error_budget_remaining"] == pytest.approx(0.0)
+
+    def test_method_and_route_filters(self):
+        tracker = make_tracker()
+        record(tracker, 5, method="POST", duration=1.0)
+        tracker.record("/api/profile", "GET", 500, 1.0, now=NOW)
+
+        status = tracker.get_status(now=NOW)
+
+        assert status["deals_latency"]["windows"]["5m"]["requests"] == 0
+        assert status["deals_availability"]["windows"]["5m"]["requests"] == 5
+
+    def test_policy_needs_both_windows_burning(self):
+        tracker = make_tracker()
+        # An outage 30 minutes ago, healthy since
+        record(tracker, 100, status_code=500, now=NOW - 1800)
+        record(tracker, 100, now=NOW)
+
+        fast = tracker.get_status(now=NOW)["deals_availability"]["policies"]["fast"]
+        assert fast["burn_rate"] == 0
+        assert not fast["burning"]
+
+        record(tracker, 100, status_code=500, now=NOW)
+        fast = tracker.get_status(now=NOW)["deals_availability"]["policies"]["fast"]
+        assert fast["burning"]
+
+    def test_merge_snapshots_sums_workers(self):
+        first, second = make_tracker(), make_tracker()
+        record(first, 10, status_code=500)
+        record(second, 30)
+
+        merged = first.merge_snapshots([first.snapshot(), json.loads(json.dumps(second.snapshot()))])
+        window = merged.get_status(now=NOW)["deals_availability"]["windows"]["5m"]
+
+        assert (window["requests"], window["bad"]) == (40, 10)
+
+    def test_load_slos_validates(self, tmp_path):
+        path = tmp_path / "slos.json"
+        path.write_text(json.dumps({"slos": [{"name": "x", "route": "/api/deals", "kind": "latency", "target": 0.9}]}))
+
+        with pytest.raises(ValueError, match="threshold_ms"):
+            load_slos(str(path))
+        assert [slo.name for slo in load_slos()][:2] == ["deals_latency", "deals_availability"]
+
+    def test_fast_burn_fires_alert(self):
+        tracker = SLOTracker([SLO(name="test_slo_alert", route="/api/test", kind="availability", target=0.99)])
+        for _ in range(50):
+            tracker.record("/api/test", "GET", 500, 0.01, now=NOW)
+        tracker.update_gauges(tracker.get_status(now=NOW))
+
+        manager = AlertManager(registry=metrics_collector.registry)
+        manager.rules = [rule for rule in load_rules() if rule.name.startswith("slo_")]
+        fired = manager.evaluate(now=NOW)
+
+        ids = {alert.id: alert.level.value for alert in fired}
+        assert ids["slo_fast_burn|slo=test_slo_alert"] == "critical"
+        assert ids["slo_slow_burn|slo=test_slo_alert"] == "warning"
+
+    def test_background_refresh_runs_in_the_lane(self, monkeypatch):
+        tracker = make_tracker()
+        tracker.config.UPDATE_INTERVAL_SECONDS = 60
+        threads = []
+        refresh = tracker.refresh
+
+        def tracked_refresh():
+            threads.append(threading.current_thread())
+            return refresh()
+
+        monkeypatch.setattr(tracker, "refresh", tracked_refresh)
+
+        async def scenario():
+            await tracker.start()
+            await asyncio.sleep(0.05)
+            await tracker.stop()
+
+        asyncio.run(scenario())
+
+        assert threads and threads[0] is not threading.main_thread()
+        assert tracker._task is None
+
+    def test_slo_endpoint(self):
+        response = client.get("/monitoring/slo")
+
+        assert response.status_code == 200
+        slos = response.json()["slos"]
+        assert slos["profile_availability"]["objective"] == "0.999 of requests without a 5xx"
+        assert set(slos["deals_latency"]["policies"]) == {"fast", "slow"}
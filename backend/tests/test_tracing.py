@@ -0,0 +1,125 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+
+try:
+    from backend.app.main import app
+    from backend.app.monitoring.tracing import Tracer, FileSpanExporter, tracer
+except ImportError:
+    # Handle import for different project structures
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from app.main import app
+    from app.monitoring.tracing import Tracer, FileSpanExporter, tracer
+
+client = TestClient(app)
+
+def read_traces(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def exported_spans(document):
+    return document["resourceSpans"][0]["scopeSpans"][0]["spans"]
+
+class TestTracer:
+    """Test suite for span creation and tail sampling"""
+
+    def setup_method(self):
+        self.tracer = Tracer()
+
+    def test_child_spans_share_trace_and_parent(self, tmp_path):
+        """Nested spans are exported under the root span's trace"""
+        path = tmp_path / "spans.jsonl"
+        self.tracer.configure(FileSpanExporter(str(path)), sample_rate=1.0)
+
+        with self.tracer.start_trace("GET /api/deals", request_id="req-1") as root:
+            with self.tracer.start_span("db.query", {"db.query_type": "get_deals"}):
+                with self.tracer.start_span("cache.get"):
+                    pass
+
+        spans = {s["name"]: s for s in exported_spans(read_traces(path)[0])}
+        assert set(spans) == {"GET /api/deals", "db.query", "cache.get"}
+        assert {s["traceId"] for s in spans.values()} == {root.trace_id}
+        assert spans["db.query"]["parentSpanId"] == root.span_id
+        assert spans["cache.get"]["parentSpanId"] == spans["db.query"]["spanId"]
+
+    def test_sampling_drops_fast_successful_traces(self, tmp_path):
+        """With a zero sample rate only errors and slow traces are kept"""
+        path = tmp_path / "spans.jsonl"
+        self.tracer.configure(FileSpanExporter(str(path)), sample_rate=0.0, slow_threshold_ms=10_000)
+
+        with self.tracer.start_trace("GET /fast"):
+            pass
+        with pytest.raises(ValueError):
+            with self.tracer.start_trace("GET /broken"):
+                with self.tracer.start_span("db.query"):
+                    raise ValueError("boom")
+
+        traces = read_traces(path) if path.exists() else []
+        assert len(traces) == 1
+        names = {s["name"] for s in exported_spans(traces[0])}
+        assert names == {"GET /broken", "db.query"}
+
+    def test_slow_traces_always_kept(self, tmp_path):
+        """Traces over the slow threshold are exported regardless of sample rate"""
+        path = tmp_path / "spans.jsonl"
+        self.tracer.configure(FileSpanExporter(str(path)), sample_rate=0.0, slow_threshold_ms=0)
+
+        with self.tracer.start_trace("GET /slow"):
+            pass
+
+        assert len(read_traces(path)) == 1
+
+    def test_incoming_traceparent_is_continued(self, tmp_path):
+        """A W3C traceparent header continues the caller's trace"""
+        path = tmp_path / "spans.jsonl"
+        self.tracer.configure(FileSpanExporter(str(path)), sample_rate=0.0)
+        traceparent = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+        with self.tracer.start_trace("GET /", traceparent=traceparent) as root:
+            pass
+
+        assert root.trace_id == "0af7651916cd43dd8448eb211c80319c"
+        assert root.parent_span_id == "b7ad6b7169203331"
+        assert len(read_traces(path)) == 1
+
+    def test_spans_outside_a_trace_are_noops(self):
+        """start_span without an active trace does not fail or export"""
+        with self.tracer.start_span("orphan") as span:
+            span.set_attribute("ignored", True)
+
+class TestTracingMiddleware:
+    """Test suite for request ID propagation through the app"""
+
+    def test_request_id_is_propagated(self, tmp_path):
+        """Incoming X-Request-ID is echoed back and recorded on the root span"""
+        path = tmp_path / "spans.jsonl"
+        previous = (tracer.exporter, tracer.sample_rate)
+        tracer.configure(FileSpanExporter(str(path)), sample_rate=1.0)
+        try:
+            response = client.get("/", headers={"X-Request-ID": "abc123"})
+        finally:
+            tracer.configure(previous[0], sample_rate=previous[1])
+
+        assert response.headers["X-Request-ID"] == "abc123"
+        assert response.headers["traceparent"].startswith("00-")
+        spans = exported_spans(read_traces(path)[0])
+        root = next(s for s in spans if "parentSpanId" not in s)
+        attributes = {a["key"]: a["value"] for a in root["attributes"]}
+        assert attributes["http.request_id"] == {"stringValue": "abc123"}
+        assert {"middleware.metrics", "middleware.rate_limit", "middleware.error_handling"} <= {s["name"] for s in spans}
+
+    def test_request_id_generated_when_missing(self):
+        """A request ID is generated when the client does not send one"""
+        response = client.get("/")
+
+        assert response.headers.get("X-Request-ID")
+
+    @pytest.mark.parametrize("request_id", ["x" * 65, "a b", "<script>", "id;drop"])
+    def test_unsafe_request_id_replaced(self, request_id):
+        """Over-long or non-plain request IDs are not echoed back"""
+        response = client.get("/", headers={"X-Request-ID": request_id})
+
+        echoed = response.headers["X-Request-ID"]
+        assert echoed != request_id and len(echoed) == 32